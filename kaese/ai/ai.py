@@ -1,6 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import List, Union
 
 from kaese.gameboard.gameboard import GameBoard
 from kaese.gameboard.move import Move
@@ -37,3 +37,46 @@ class AI(ABC):
     def get_next_move(self, game_board: GameBoard, player: int) -> Move:
         """Calculate next move."""
         pass
+
+    def get_next_moves(self, game_boards: List[GameBoard]) -> List[Move]:
+        """
+        Calculate the next move on many game boards, each for the player to move on the board.
+
+        The default calls get_next_move() for every board. AIs can override it to share work between the boards, e.g.
+        for self-play with many games at once.
+
+        Args:
+            game_boards (List[GameBoard]): The game boards, the games must not have ended.
+
+        Returns:
+            List[Move]: The next move on every game board.
+        """
+        return [self.get_next_move(game_board, game_board.current_player) for game_board in game_boards]
+
+    def notify_move(self, game_board: GameBoard, move: Move) -> None:
+        """
+        Called after a move of any player has been made on the game board, see AISession.
+
+        AIs that keep state between their moves can update it here, the default does nothing.
+
+        Args:
+            game_board (GameBoard): The game board, after the move.
+            move (Move): The move.
+
+        Returns:
+            Void
+        """
+        pass
+
+    def notify_take_back(self, game_board: GameBoard, move: Move) -> None:
+        """
+        Called after a move has been taken back on the game board, e.g. with the history navigation, see AISession.
+
+        Args:
+            game_board (GameBoard): The game board, after the move has been taken back.
+            move (Move): The move.
+
+        Returns:
+            Void
+        """
+        pass
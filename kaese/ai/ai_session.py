@@ -0,0 +1,133 @@
+from typing import Any, Dict, Optional, Type, Union
+
+from kaese.ai.ai import AI
+from kaese.ai.ai_exception import AIException
+from kaese.ai.better_ai import BetterAI
+from kaese.ai.cluster_ai import ClusterAI
+from kaese.ai.normal_ai import NormalAI
+from kaese.ai.random_ai import RandomAI
+from kaese.ai.simple_ai import SimpleAI
+from kaese.ai.stupid_ai import StupidAI
+from kaese.ai.tree_ai import TreeAI
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+
+class AISession:
+    """
+    The AIs of both players of one game.
+
+    The session keeps one AI instance per player as long as the player_ai of the player does not change, so the
+    caches of the AIs (e.g. the transposition table of TreeAI, the cluster cache of ClusterAI) are kept between the
+    moves. Every move made on the gameboard and every move taken back (e.g. with the history navigation of the GUI)
+    has to be passed to notify_move() and notify_take_back(), which pass it on to the AIs of both players.
+
+    ai_classes holds the AIs that can be selected for a player in the GUI and in the savegames.
+
+    Attributes:
+        verbose (Union[bool, int]): Verbosity level of the AIs.
+        ai_kwargs (Dict[str, Dict[str, Any]]): Additional arguments for the constructors, by name of the AI.
+        ais (Dict[int, AI]): The AI instance of each player.
+    """
+
+    ai_classes: Dict[str, Type[AI]] = {
+        "StupidAI": StupidAI,
+        "RandomAI": RandomAI,
+        "SimpleAI": SimpleAI,
+        "NormalAI": NormalAI,
+        "BetterAI": BetterAI,
+        "ClusterAI": ClusterAI,
+        "TreeAI": TreeAI
+    }
+
+    verbose: Union[bool, int]
+    ai_kwargs: Dict[str, Dict[str, Any]]
+    ais: Dict[int, AI]
+
+    def __init__(
+            self,
+            verbose: Union[bool, int] = False,
+            ai_kwargs: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Args:
+            verbose (Union[bool, int]): Verbosity level of the AIs.
+            ai_kwargs (Optional[Dict[str, Dict[str, Any]]]): Additional arguments for the constructors, by name of
+                the AI, e.g. {"TreeAI": {"time_budget": 2.0}}.
+        """
+        self.verbose = verbose
+        self.ai_kwargs = ai_kwargs if ai_kwargs is not None else {}
+        self.ais = {}
+
+    def get_ai(self, player: int, player_ai: str) -> AI:
+        """
+        Get the AI instance of a player, a new one if the player has none or another AI yet.
+
+        Args:
+            player (int): The player (1 or 2).
+            player_ai (str): The name of the AI, e.g. "ClusterAI".
+
+        Returns:
+            AI: The AI instance.
+        """
+        ai = self.ais.get(player)
+        if ai is None or ai.__class__.__name__ != player_ai:
+            if player_ai not in self.ai_classes:
+                raise AIException("AISession: AI '%s' is not supported" % player_ai)
+            ai = self.ai_classes[player_ai](self.verbose, **self.ai_kwargs.get(player_ai, {}))
+            self.ais[player] = ai
+        return ai
+
+    def discard(self, ai: AI) -> None:
+        """
+        Remove an AI instance from the session, the next get_ai() call of its player creates a new one.
+
+        This is needed if the instance can not be used anymore, e.g. a TreeAI whose search has been killed, but is
+        still running in its thread.
+
+        Args:
+            ai (AI): The AI instance.
+
+        Returns:
+            None
+        """
+        for player, player_ai in list(self.ais.items()):
+            if player_ai is ai:
+                del self.ais[player]
+
+    def reset(self) -> None:
+        """
+        Remove all AI instances, e.g. for a new game.
+
+        Returns:
+            None
+        """
+        self.ais = {}
+
+    def notify_move(self, gb: GameBoard, move: Move) -> None:
+        """
+        Pass a move that has been made on the gameboard to the AIs of both players.
+
+        Args:
+            gb (GameBoard): The gameboard, after the move.
+            move (Move): The move.
+
+        Returns:
+            None
+        """
+        for ai in list(self.ais.values()):
+            ai.notify_move(gb, move)
+
+    def notify_take_back(self, gb: GameBoard, move: Move) -> None:
+        """
+        Pass a move that has been taken back on the gameboard to the AIs of both players.
+
+        Args:
+            gb (GameBoard): The gameboard, after the move has been taken back.
+            move (Move): The move.
+
+        Returns:
+            None
+        """
+        for ai in list(self.ais.values()):
+            ai.notify_take_back(gb, move)
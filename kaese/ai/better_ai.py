@@ -2,8 +2,9 @@ from typing import Dict, List, Optional
 import random
 import logging
 from kaese.ai.ai import AI
+from kaese.ai import line_masks
 from kaese.ai.ai_exception import AIException
-from kaese.ai.normal_ai import NormalAI
+from kaese.ai.position_features import PositionFeatures, get_position_features, get_position_features_batch
 from kaese.ai.random_ai import RandomAI
 from kaese.ai.simple_ai import SimpleAI
 from kaese.gameboard.move import Move
@@ -18,6 +19,9 @@ class BetterAI(AI):
     that will allow the opponent to take just one field. Else, it selects a random valid move.
 
     It inherits from the AI class.
+
+    With NumPy installed, the lines are classified with whole-array operations, see kaese.ai.line_masks. The lists of
+    lines are kept per position, see PositionFeatures.
     """
 
     def get_next_move(self, gb: GameBoard, player: int) -> Move:
@@ -41,17 +45,67 @@ class BetterAI(AI):
         if capture_field_move:
             return capture_field_move
 
-        surroundings_count_matrix = NormalAI.get_field_with_count_of_surroundings(gb)
+        features = get_position_features(gb)
+        surroundings_count_matrix = features.side_counts
 
         # TODO versuche möglichst viele einser-cluster zu bauen
 
         # before using "any valid move" search for moves where surroundings<2
-        move = BetterAI.get_better_moves(gb, player, surroundings_count_matrix, player_ai)
+        move = BetterAI.get_better_moves(gb, player, surroundings_count_matrix, player_ai, features)
         if move:
             return move
 
         # try to give the opponent only 1 field!
-        # TODO in eigene methode auslagern und tests für schreiben
+        valid_moves = features.get_single_box_sacrifices()
+        if len(valid_moves) > 0:
+            logging.info("%s: giving opponent only 1 field, (%d possible moves left)" % (
+                player_ai, len(valid_moves)))
+            return line_masks.to_move(gb, random.choice(valid_moves), player, player_ai)
+
+        # Fallback: Use a random valid move
+        logging.info("%s: Using fallback (a random valid move)" % player_ai)
+        return RandomAI.get_random_valid_move(gb, player, player_ai)
+
+    def get_next_moves(self, game_boards: List[GameBoard]) -> List[Move]:
+        """
+        Calculates and returns the next move on many game boards, each for the player to move on the board.
+
+        The safe lines of all boards are classified together (see get_position_features_batch()), the moves are the
+        same as those of get_next_move() for the boards in the same order.
+
+        Args:
+            game_boards (List[GameBoard]): The game board objects.
+
+        Returns:
+            List[Move]: The next move on every game board.
+        """
+        moves = []
+        for gb, features in zip(game_boards, get_position_features_batch(game_boards)):
+            # Keep the features as the features of the last position, where get_next_move() finds them
+            get_position_features(gb, features)
+            moves.append(self.get_next_move(gb, gb.current_player))
+        return moves
+
+    @staticmethod
+    def get_single_box_sacrifice_moves(
+            gb: GameBoard,
+            player: int,
+            surroundings_count_matrix: List[List[int]],
+            player_ai: str = ""
+    ) -> List[Move]:
+        """
+        Generates a list of the moves that give the opponent only 1 field: the free lines of the boxes with 2 lines
+        around them, where the boxes on the other side of both free lines have less than 2 lines around them.
+
+        Args:
+            gb: A GameBoard object representing the game board.
+            player: An integer representing the player.
+            surroundings_count_matrix: Count of the surroundings of each box on the current game board.
+            player_ai: (Optional) A string representing the AI player.
+
+        Returns:
+            List[Move]: Both free lines of every such box.
+        """
         valid_moves = []
         for x in range(0, gb.size_x):
             for y in range(0, gb.size_y):
@@ -128,14 +182,7 @@ class BetterAI(AI):
                                 # links
                                 valid_moves.append(Move(x - 1, y, 0, player, player_ai))
                                 # logging.debug(x - 1, y, 1, "oben unten: links")
-        if len(valid_moves) > 0:
-            logging.info("%s: giving opponent only 1 field, (%d possible moves left)" % (
-                player_ai, len(valid_moves)))
-            return random.choice(valid_moves)
-
-        # Fallback: Use a random valid move
-        logging.info("%s: Using fallback (a random valid move)" % player_ai)
-        return RandomAI.get_random_valid_move(gb, player, player_ai)
+        return valid_moves
 
     @staticmethod
     def get_surroundings(gb: GameBoard, x: int, y: int) -> Dict[str, int]:
@@ -145,28 +192,28 @@ class BetterAI(AI):
         oben = 0
 
         if x + 1 < gb.size_x:
-            if gb.boxes[x][y].line_right > 0:
+            if gb.get_line(x, y, 0) > 0:
                 rechts = 1
         else:
             # rechter spielfeld rand
             rechts = 1
 
         if y + 1 < gb.size_y:
-            if gb.boxes[x][y].line_below > 0:
+            if gb.get_line(x, y, 1) > 0:
                 unten = 1
         else:
             # unterer spielfeld rand
             unten = 1
 
         if x > 0:
-            if gb.boxes[x - 1][y].line_right > 0:
+            if gb.get_line(x - 1, y, 0) > 0:
                 links = 1
         else:
             # linker spielfeld rand
             links = 1
 
         if y > 0:
-            if gb.boxes[x][y - 1].line_below > 0:
+            if gb.get_line(x, y - 1, 1) > 0:
                 oben = 1
         else:
             # oberer spielfeld rand
@@ -179,12 +226,23 @@ class BetterAI(AI):
             gb: GameBoard,
             player: int,
             surroundings_count_matrix: List[List[int]],
-            player_ai: str = ""
+            player_ai: str = "",
+            features: Optional[PositionFeatures] = None
     ) -> Optional[Move]:
-        """Returns Move or None. Some Foo with using 'better' moves close to other lines..."""
-        lists = BetterAI.get_better_moves_lists(gb, player, surroundings_count_matrix, player_ai)
-        better_moves = lists["better_moves"]
-        good_moves = lists["good_moves"]
+        """
+        Returns Move or None. Some Foo with using 'better' moves close to other lines...
+
+        Args:
+            gb: A GameBoard object representing the game board.
+            player: An integer representing the player.
+            surroundings_count_matrix: Count of the surroundings of each box on the current game board.
+            player_ai: (Optional) A string representing the AI player.
+            features: (Optional) The features of the position, if the calling AI has them already.
+
+        Returns:
+            Optional[Move]: A line that does not give a box to the opponent, None if there is none.
+        """
+        better_moves, good_moves = get_position_features(gb, features).get_safe_lines()
         if len(better_moves) > 0:
             logging.info(
                 "%s: Preventing closeable field for opponent, using 'better' move, (%d better, %d good moves left)"
@@ -192,11 +250,11 @@ class BetterAI(AI):
                     player_ai, len(better_moves), len(good_moves)
                 )
             )
-            return random.choice(better_moves)
+            return line_masks.to_move(gb, random.choice(better_moves), player, player_ai)
         if len(good_moves) > 0:
             logging.info("%s: preventing closeable field for opponent, (%d good moves left)" % (
                 player_ai, len(good_moves)))
-            return random.choice(good_moves)
+            return line_masks.to_move(gb, random.choice(good_moves), player, player_ai)
         return None
 
     @staticmethod
@@ -225,44 +283,44 @@ class BetterAI(AI):
             for y in range(0, gb.size_y):
                 # -- Right line
                 # if we are not at the right edge and line_right is still free
-                if x + 1 < gb.size_x and gb.boxes[x][y].line_right == 0:
+                if x + 1 < gb.size_x and gb.get_line(x, y, 0) == 0:
                     # Are both fields usable? Is this a move where I don't gift anything to the opponent?
                     if surroundings_count_matrix[x][y] < 2 and surroundings_count_matrix[x + 1][y] < 2:
                         good_moves.append(Move(x, y, 0, player, player_ai))
                         # right angle with bottom left of the current vertical line
-                        if gb.boxes[x][y].line_below:
+                        if gb.get_line(x, y, 1):
                             better_moves.append(Move(x, y, 0, player, player_ai))
                         # right angle with bottom right of the current vertical line
                         if x + 1 < gb.size_x:
-                            if gb.boxes[x + 1][y].line_below:
+                            if gb.get_line(x + 1, y, 1):
                                 better_moves.append(Move(x, y, 0, player, player_ai))
                         # right angle with top left of the current vertical line
                         if y > 0:
-                            if gb.boxes[x][y - 1].line_below:
+                            if gb.get_line(x, y - 1, 1):
                                 better_moves.append(Move(x, y, 0, player, player_ai))
                         # right angle with top right of the current vertical line
                         if y > 0 and x + 1 < gb.size_x:
-                            if gb.boxes[x + 1][y - 1].line_below:
+                            if gb.get_line(x + 1, y - 1, 1):
                                 better_moves.append(Move(x, y, 0, player, player_ai))
                 # -- Bottom line
                 # if we are not at the bottom edge and line_below is still free
-                if y + 1 < gb.size_y and gb.boxes[x][y].line_below == 0:
+                if y + 1 < gb.size_y and gb.get_line(x, y, 1) == 0:
                     # Are both fields usable? Is this a move where I don't gift anything to the opponent?
                     if surroundings_count_matrix[x][y] < 2 and surroundings_count_matrix[x][y + 1] < 2:
                         good_moves.append(Move(x, y, 1, player, player_ai))
                         # right angle with top right of the current horizontal line
-                        if gb.boxes[x][y].line_right:
+                        if gb.get_line(x, y, 0):
                             better_moves.append(Move(x, y, 1, player, player_ai))
                         # right angle with top left of the current horizontal line
                         if x > 0:
-                            if gb.boxes[x - 1][y].line_right:
+                            if gb.get_line(x - 1, y, 0):
                                 better_moves.append(Move(x, y, 1, player, player_ai))
                         # right angle with bottom right of the current horizontal line
                         if y + 1 < gb.size_y:
-                            if gb.boxes[x][y + 1].line_right:
+                            if gb.get_line(x, y + 1, 0):
                                 better_moves.append(Move(x, y, 1, player, player_ai))
                         # right angle with bottom left of the current horizontal line
                         if x > 0 and y + 1 < gb.size_y:
-                            if gb.boxes[x - 1][y + 1].line_right:
+                            if gb.get_line(x - 1, y + 1, 0):
                                 better_moves.append(Move(x, y, 1, player, player_ai))
         return {"better_moves": better_moves, "good_moves": good_moves}
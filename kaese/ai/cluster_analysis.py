@@ -0,0 +1,284 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from kaese.gameboard.gameboard import GameBoard
+
+# Kinds of clusters
+CHAIN: int = 0  # ends at boxes with less or more than two free lines
+LOOP: int = 1  # closed, every box has two free lines
+
+
+class Cluster:
+    """
+    A chain or loop of boxes with exactly two free lines (two "sides" drawn), found by get_clusters().
+
+    Whoever draws one of its lines gives all its boxes to the opponent. The boxes at the ends of a chain (junctions)
+    are not part of it, they have three or four free lines (or one free line, if the box can be captured). Both ends
+    can be the same box, e.g. for a chain that starts and ends at the same junction.
+
+    Attributes:
+        kind (int): CHAIN or LOOP.
+        boxes (List[int]): The box numbers (see EdgeTable) in the order of the walk through the cluster.
+        edges (List[int]): The edge numbers of the free lines in the same order. The line edges[i] is in front of
+            boxes[i]. A chain of n boxes has n + 1 lines, a loop of n boxes has n lines.
+        ends (Tuple[int, int]): The box numbers at the ends of a chain, in front of the first and behind the last
+            box, (-1, -1) for loops.
+    """
+    kind: int
+    boxes: List[int]
+    edges: List[int]
+    ends: Tuple[int, int]
+
+    def __init__(self, kind: int, boxes: List[int], edges: List[int], ends: Tuple[int, int] = (-1, -1)) -> None:
+        self.kind = kind
+        self.boxes = boxes
+        self.edges = edges
+        self.ends = ends
+
+    @property
+    def size(self) -> int:
+        """
+        :return: The number of boxes of the cluster.
+        :rtype: int
+        """
+        return len(self.boxes)
+
+    def get_opening_edge(self) -> int:
+        """
+        Get the line to draw to give the cluster to the opponent.
+
+        Chains of two boxes are opened in the middle, so the opponent can not take one box and give back the other
+        one to keep control (double-dealing move). All other clusters are opened at their first line.
+
+        :return: The edge number of the line.
+        :rtype: int
+        """
+        if self.kind == CHAIN and len(self.boxes) == 2:
+            return self.edges[1]
+        return self.edges[0]
+
+
+def get_cluster(gb: GameBoard, start: int) -> Cluster:
+    """
+    Find the chain or loop of a box with exactly two free lines.
+
+    The walk follows both free lines of the box until it reaches a box with a different number of free lines (a
+    chain) or comes back to the box (a loop). It takes linear time in the size of the cluster and does not need
+    recursion, also for long chains on large boards.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :param start: The box number of a box with two free lines.
+    :type start: int
+    :return: The cluster of the box.
+    :rtype: Cluster
+    """
+    size_y = gb.size_y
+    surroundings = gb.surroundings
+    adjacent_boxes = gb.edge_table.adjacent_boxes
+    box_edges = gb.edge_table.box_edges
+    free_line_positions = gb.free_line_positions
+
+    def walk(edge_nr: int) -> Tuple[int, List[int], List[int]]:
+        # Follow the boxes with two free lines, return the box at the end, the boxes and the edges on the way
+        boxes = []
+        edges = [edge_nr]
+        box_1, box_2 = adjacent_boxes[edge_nr]
+        box_nr = box_2 if box_1 == start else box_1
+        while box_nr != start and surroundings[box_nr // size_y][box_nr % size_y] == 2:
+            boxes.append(box_nr)
+            for next_edge in box_edges[box_nr]:
+                if next_edge != edge_nr and free_line_positions[next_edge] >= 0:
+                    edge_nr = next_edge
+                    break
+            edges.append(edge_nr)
+            box_1, box_2 = adjacent_boxes[edge_nr]
+            box_nr = box_2 if box_1 == box_nr else box_1
+        return box_nr, boxes, edges
+
+    edge_1, edge_2 = [edge for edge in box_edges[start] if free_line_positions[edge] >= 0]
+    end_1, boxes_1, edges_1 = walk(edge_1)
+    if end_1 == start:
+        # The last line leads back to the first box, it is in front of it
+        return Cluster(LOOP, [start] + boxes_1, edges_1[-1:] + edges_1[:-1])
+    end_2, boxes_2, edges_2 = walk(edge_2)
+    return Cluster(CHAIN, boxes_1[::-1] + [start] + boxes_2, edges_1[::-1] + edges_2, (end_1, end_2))
+
+
+def get_clusters(gb: GameBoard) -> List[Cluster]:
+    """
+    Decompose all boxes with exactly two free lines into chains and loops.
+
+    Every such box is visited once: get_cluster() is called for the first box that is not part of a cluster yet. So
+    the analysis takes linear time, see ClusterCache for the incremental update of the clusters during a game.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: The chains and loops.
+    :rtype: List[Cluster]
+    """
+    size_y = gb.size_y
+    surroundings = gb.surroundings
+    in_cluster = bytearray(gb.size_x * size_y)
+    clusters = []
+    for start in range(len(in_cluster)):
+        if in_cluster[start] or surroundings[start // size_y][start % size_y] != 2:
+            continue
+        cluster = get_cluster(gb, start)
+        for box_nr in cluster.boxes:
+            in_cluster[box_nr] = 1
+        clusters.append(cluster)
+    return clusters
+
+
+class ClusterCache:
+    """
+    The clusters of one game, updated from the lines that have changed since the last update.
+
+    Drawing (or taking back) a line only changes the clusters of the two boxes next to the line and of their
+    neighbours (the chains that end at the boxes). These clusters are removed and the boxes are walked again with
+    get_cluster(), all other clusters are kept. The changed lines are found by comparing the free lines with the
+    free lines of the last update, so the cache also follows moves that are taken back, e.g. with the history
+    navigation of the GUI. update_line() skips the comparison if the changed line is known. If too many lines have
+    changed (e.g. the cache is used for another game), the clusters are built from scratch.
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        line_hash (int): GameBoard.line_hash at the last update.
+        free_lines (Set[int]): The edge numbers of the free lines at the last update.
+        box_clusters (List[Optional[Cluster]]): Per box number, the cluster of the box, None if the box does not
+            have two free lines.
+        clusters (Dict[int, Cluster]): All clusters, by id().
+        rebuild_ratio (float): Build the clusters from scratch if more than this part of all lines has changed.
+    """
+    size_x: int
+    size_y: int
+    line_hash: int
+    free_lines: Set[int]
+    box_clusters: List[Optional[Cluster]]
+    clusters: Dict[int, Cluster]
+    rebuild_ratio: float = 0.25
+
+    def __init__(self, gb: GameBoard) -> None:
+        """
+        :param gb: The gameboard, the clusters of its position are built from scratch.
+        :type gb: GameBoard
+        """
+        self.size_x = gb.size_x
+        self.size_y = gb.size_y
+        self.rebuild(gb)
+
+    def rebuild(self, gb: GameBoard) -> None:
+        """
+        Build the clusters of the position from scratch.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :return: None
+        """
+        self.line_hash = gb.line_hash
+        self.free_lines = set(gb.free_lines)
+        self.box_clusters = [None] * (self.size_x * self.size_y)
+        self.clusters = {}
+        for cluster in get_clusters(gb):
+            self.add(cluster)
+
+    def add(self, cluster: Cluster) -> None:
+        """
+        :param cluster: The cluster to add.
+        :type cluster: Cluster
+        :return: None
+        """
+        self.clusters[id(cluster)] = cluster
+        box_clusters = self.box_clusters
+        for box_nr in cluster.boxes:
+            box_clusters[box_nr] = cluster
+
+    def remove(self, cluster: Cluster) -> None:
+        """
+        :param cluster: The cluster to remove.
+        :type cluster: Cluster
+        :return: None
+        """
+        del self.clusters[id(cluster)]
+        box_clusters = self.box_clusters
+        for box_nr in cluster.boxes:
+            box_clusters[box_nr] = None
+
+    def update(self, gb: GameBoard) -> List[Cluster]:
+        """
+        Update the clusters to the position of the gameboard.
+
+        :param gb: The gameboard, it must have the size of the cache.
+        :type gb: GameBoard
+        :return: The chains and loops of the position.
+        :rtype: List[Cluster]
+        """
+        if gb.line_hash != self.line_hash:
+            free_lines = set(gb.free_lines)
+            changed_lines = free_lines.symmetric_difference(self.free_lines)
+            if len(changed_lines) > self.rebuild_ratio * len(gb.edge_table.edges):
+                self.rebuild(gb)
+            else:
+                self.line_hash = gb.line_hash
+                self.free_lines = free_lines
+                self.update_boxes(gb, changed_lines)
+        return list(self.clusters.values())
+
+    def update_line(self, gb: GameBoard, edge: int) -> None:
+        """
+        Update the clusters after one line has been drawn or taken back, e.g. for AI.notify_move(). Only the boxes
+        next to the line are walked again, the free lines are not compared.
+
+        If the cache is not at the position before the line, the free lines are compared, see update().
+
+        :param gb: The gameboard, after the line has been drawn or taken back.
+        :type gb: GameBoard
+        :param edge: The edge number of the line.
+        :type edge: int
+        :return: None
+        """
+        if gb.line_hash ^ gb.zobrist.lines[edge] != self.line_hash:
+            self.update(gb)
+            return
+        self.line_hash = gb.line_hash
+        if gb.free_line_positions[edge] >= 0:
+            self.free_lines.add(edge)
+        else:
+            self.free_lines.discard(edge)
+        self.update_boxes(gb, {edge})
+
+    def update_boxes(self, gb: GameBoard, changed_lines: Set[int]) -> None:
+        """
+        Walk the clusters of the boxes next to the changed lines and of their neighbours again.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :param changed_lines: The edge numbers of the lines that have been drawn or taken back.
+        :type changed_lines: Set[int]
+        :return: None
+        """
+        adjacent_boxes = gb.edge_table.adjacent_boxes
+        box_edges = gb.edge_table.box_edges
+        box_clusters = self.box_clusters
+        boxes = set()
+        for edge in changed_lines:
+            boxes.update(adjacent_boxes[edge])
+        # The neighbours of the boxes can be the ends of a chain that changes
+        free_line_positions = gb.free_line_positions
+        neighbours = set()
+        for box_nr in boxes:
+            for edge in box_edges[box_nr]:
+                if free_line_positions[edge] >= 0 or edge in changed_lines:
+                    neighbours.update(adjacent_boxes[edge])
+        for box_nr in neighbours:
+            cluster = box_clusters[box_nr]
+            if cluster is not None:
+                self.remove(cluster)
+                boxes.update(cluster.boxes)
+
+        size_y = self.size_y
+        surroundings = gb.surroundings
+        for box_nr in boxes:
+            if box_clusters[box_nr] is None and surroundings[box_nr // size_y][box_nr % size_y] == 2:
+                self.add(get_cluster(gb, box_nr))
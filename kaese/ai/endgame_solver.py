@@ -0,0 +1,599 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+from kaese.ai.ai_exception import AIException
+from kaese.gameboard.gameboard import GameBoard
+
+# Larger than the value of any position
+infinity = 1000000
+
+# Key of an endgame position: the sorted lengths of the loops and the sorted chains (junction_1, junction_2, length)
+EndgameKey = Tuple[Tuple[int, ...], Tuple[Tuple[int, int, int], ...]]
+# The lengths of the loops and the chains of a position before the junctions are labelled for the key
+EndgameComponents = Tuple[List[int], List[Tuple[int, int, int]]]
+# A loop (its length) or a chain (junction_1, junction_2, length) of a key
+EndgameComponent = Union[int, Tuple[int, int, int]]
+
+
+def get_canonical_key(loops: List[int], chains: List[Tuple[int, int, int]]) -> Tuple[EndgameKey, Dict[int, int]]:
+    """
+    Build the key of a position with junction labels that do not depend on the box numbers of the junctions, so
+    positions with the same structure of chains and loops share one entry in the cache of EndgameSolver.
+
+    Every junction gets a class from the lengths of its chains, refined twice with the classes of its neighbours (this
+    separates almost all junctions that are not symmetric, the key is valid for any labelling anyway). The chains
+    are sorted by the classes of their ends and their length, and the junctions are numbered 0, 1, 2, ... in the order
+    of their first appearance in the sorted chains.
+
+    :param loops: The lengths of the loops.
+    :type loops: List[int]
+    :param chains: The chains (junction_1, junction_2, length).
+    :type chains: List[Tuple[int, int, int]]
+    :return: Tuple of the key and the new label of every junction.
+    :rtype: Tuple[EndgameKey, Dict[int, int]]
+    """
+    neighbours: Dict[int, List[Tuple[int, int]]] = {}
+    for junction_1, junction_2, length in chains:
+        neighbours.setdefault(junction_1, []).append((length, junction_2))
+        neighbours.setdefault(junction_2, []).append((length, junction_1))
+    classes = dict.fromkeys(neighbours, 0)
+    count = 1
+    for _ in range(3):
+        signatures = {
+            junction: (classes[junction], tuple(sorted((length, classes[other]) for length, other in incident)))
+            for junction, incident in neighbours.items()
+        }
+        numbers = {signature: number for number, signature in enumerate(sorted(set(signatures.values())))}
+        classes = {junction: numbers[signature] for junction, signature in signatures.items()}
+        if len(numbers) == count:
+            break
+        count = len(numbers)
+
+    labels: Dict[int, int] = {}
+    for junction_1, junction_2, length in sorted(
+            chains, key=lambda c: (min(classes[c[0]], classes[c[1]]), max(classes[c[0]], classes[c[1]]), c[2])):
+        for junction in (junction_1, junction_2) if classes[junction_1] <= classes[junction_2] \
+                else (junction_2, junction_1):
+            if junction not in labels:
+                labels[junction] = len(labels)
+    key_chains = []
+    for junction_1, junction_2, length in chains:
+        label_1, label_2 = labels[junction_1], labels[junction_2]
+        key_chains.append((min(label_1, label_2), max(label_1, label_2), length))
+    return (tuple(sorted(loops)), tuple(sorted(key_chains))), labels
+
+
+class EndgamePosition:
+    """
+    A loony endgame position, decomposed into loops and chains by EndgameSolver.get_position().
+
+    Attributes:
+        loops (List[List[int]]): Per loop, the edge numbers of its lines. A loop of n boxes has n lines.
+        chains (List[Tuple[int, int, List[int]]]): Per chain, the box numbers of the junctions at its ends (the
+            smaller one first) and the edge numbers of its lines in the order from the first to the second junction.
+            A chain of n boxes has n + 1 lines.
+    """
+    loops: List[List[int]]
+    chains: List[Tuple[int, int, List[int]]]
+
+    def __init__(self) -> None:
+        self.loops = []
+        self.chains = []
+
+    def get_key(self) -> EndgameKey:
+        """
+        :return: The key of the position for EndgameSolver.solve(), see get_canonical_key().
+        :rtype: EndgameKey
+        """
+        return self.get_key_and_labels()[0]
+
+    def get_key_and_labels(self) -> Tuple[EndgameKey, Dict[int, int]]:
+        """
+        :return: Tuple of the key of the position and the label of every junction (by box number) in the key.
+        :rtype: Tuple[EndgameKey, Dict[int, int]]
+        """
+        return get_canonical_key(
+            [len(edges) for edges in self.loops],
+            [(junction_1, junction_2, len(edges) - 1) for junction_1, junction_2, edges in self.chains]
+        )
+
+
+class EndgameSolver:
+    """
+    Solver for the loony endgame of dots and boxes.
+
+    A position is a loony endgame if no box can be captured and every free line gives a box to the opponent. As the
+    border of the gameboard counts as drawn, every free line then belongs to either a loop (boxes with two free lines
+    each, forming a cycle) or a chain of such boxes between two junctions (boxes with three or four free lines).
+
+    Opening a loop or a chain hands its boxes to the opponent, who either takes all of them and has to open the next
+    component, or keeps control: takes all but two boxes of a chain (all but four of a loop) and gives the rest back
+    with a double-dealing move, so that the other player has to open the next component. Opening a chain of up to two
+    boxes in the middle prevents the double-dealing move. When a chain has been taken, the junctions at its ends lose a
+    line: a junction with two lines left joins its two chains (or becomes a loop), a junction with one line left is
+    taken together with its last chain.
+
+    solve() computes the value of such a position (boxes of the player to move minus boxes of the opponent, counting
+    only the boxes that are not owned yet) with a memoised search over the lengths of the loops and the chains between
+    the junctions. Of the loops only the smallest one is ever opened, so positions that only consist of loops are
+    solved in linear time. The cache is kept between calls, a search that needs more than max_nodes new positions is
+    aborted.
+
+    Attributes:
+        max_nodes (int): Maximum number of positions solved by one call of get_best_edge() or get_value().
+        nodes (int): Number of positions solved by the last call of get_best_edge() or get_value().
+        cache (Dict[EndgameKey, Tuple[int, int]]): The lower and upper bound of the value of the searched positions.
+        value (Optional[int]): The value of the position of the last call of get_best_edge() for the player to move,
+            None if it could not be solved.
+    """
+    max_cache_size: int = 1000000
+
+    max_nodes: int
+    nodes: int
+    cache: Dict[EndgameKey, Tuple[int, int]]
+    value: Optional[int]
+
+    def __init__(self, max_nodes: int = 5000) -> None:
+        """
+        :param max_nodes: Maximum number of positions solved by one call of get_best_edge() or get_value().
+        :type max_nodes: int
+        """
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.cache = {}
+        self.value = None
+
+    @staticmethod
+    def get_position(gb: GameBoard) -> Optional[EndgamePosition]:
+        """
+        Decompose a loony endgame position into loops and chains.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :return: The position or None if the game has ended, a box can be captured or a free line does not give a box
+            to the opponent.
+        :rtype: Optional[EndgamePosition]
+        """
+        if gb.capturable_boxes or not gb.free_lines:
+            return None
+        size_y = gb.size_y
+        surroundings = gb.surroundings
+        adjacent_boxes = gb.edge_table.adjacent_boxes
+        box_edges = gb.edge_table.box_edges
+        free_line_positions = gb.free_line_positions
+
+        def get_degree(box_nr: int) -> int:
+            return 4 - surroundings[box_nr // size_y][box_nr % size_y]
+
+        def get_other_box(edge_nr: int, box_nr: int) -> int:
+            box_1, box_2 = adjacent_boxes[edge_nr]
+            return box_2 if box_1 == box_nr else box_1
+
+        def walk(box_nr: int, edge_nr: int) -> Tuple[int, List[int]]:
+            # Follow the boxes with two free lines, return the last box and the edges on the way
+            edges = [edge_nr]
+            visited.add(edge_nr)
+            box_nr = get_other_box(edge_nr, box_nr)
+            while get_degree(box_nr) == 2 and box_nr != start:
+                for next_edge in box_edges[box_nr]:
+                    if free_line_positions[next_edge] >= 0 and next_edge != edge_nr:
+                        edge_nr = next_edge
+                        break
+                edges.append(edge_nr)
+                visited.add(edge_nr)
+                box_nr = get_other_box(edge_nr, box_nr)
+            return box_nr, edges
+
+        junctions = []
+        for edge in gb.free_lines:
+            box_1, box_2 = adjacent_boxes[edge]
+            degree_1 = get_degree(box_1)
+            degree_2 = get_degree(box_2)
+            if degree_1 >= 3 and degree_2 >= 3:
+                # A safe line, the game has not reached the loony endgame yet
+                return None
+            if degree_1 >= 3:
+                junctions.append(box_1)
+            if degree_2 >= 3:
+                junctions.append(box_2)
+
+        position = EndgamePosition()
+        visited = set()
+        for start in junctions:
+            for edge in box_edges[start]:
+                if free_line_positions[edge] >= 0 and edge not in visited:
+                    end, edges = walk(start, edge)
+                    if end < start:
+                        position.chains.append((end, start, edges[::-1]))
+                    else:
+                        position.chains.append((start, end, edges))
+        for edge in gb.free_lines:
+            if edge not in visited:
+                start = adjacent_boxes[edge][0]
+                position.loops.append(walk(start, edge)[1])
+        return position
+
+    @staticmethod
+    def release_junction(loops: List[int], chains: List[Tuple[int, int, int]], junction: int) -> Tuple[int, bool]:
+        """
+        Update the loops and chains after a junction has lost lines.
+
+        :param loops: The lengths of the loops, changed in place.
+        :type loops: List[int]
+        :param chains: The chains (junction_1, junction_2, length), changed in place.
+        :type chains: List[Tuple[int, int, int]]
+        :param junction: The box number of the junction.
+        :type junction: int
+        :return: Tuple of the number of boxes that are taken with the junction and True if the capturing ends at a box
+            that can not be captured.
+        :rtype: Tuple[int, bool]
+        """
+        incident = [chain for chain in chains if chain[0] == junction or chain[1] == junction]
+        degree = sum(2 if chain[0] == chain[1] else 1 for chain in incident)
+        if degree >= 3:
+            return 0, True
+        if degree == 2:
+            if len(incident) == 1:
+                chains.remove(incident[0])
+                loops.append(incident[0][2] + 1)
+            else:
+                chain_1, chain_2 = incident
+                chains.remove(chain_1)
+                chains.remove(chain_2)
+                end_1 = chain_1[1] if chain_1[0] == junction else chain_1[0]
+                end_2 = chain_2[1] if chain_2[0] == junction else chain_2[0]
+                chains.append((min(end_1, end_2), max(end_1, end_2), chain_1[2] + chain_2[2] + 1))
+            return 0, True
+        if degree == 1:
+            # The junction can be captured, the capturing continues along its last chain
+            chain = incident[0]
+            chains.remove(chain)
+            end = chain[1] if chain[0] == junction else chain[0]
+            boxes, live = EndgameSolver.release_junction(loops, chains, end)
+            return 1 + chain[2] + boxes, live
+        return 1, False
+
+    def open_chain(
+            self,
+            key: EndgameKey,
+            chain: Tuple[int, int, int]
+    ) -> Tuple[EndgameComponents, int, Optional[int]]:
+        """
+        Open a chain.
+
+        :param key: The key of the position.
+        :type key: EndgameKey
+        :param chain: The chain (junction_1, junction_2, length).
+        :type chain: Tuple[int, int, int]
+        :return: Tuple of the loops and chains after the chain has been taken, the number of boxes taken and the
+            index of the line to draw to prevent a double-dealing move (in the order from junction_1 to junction_2),
+            None if the opponent can keep control anyway.
+        :rtype: Tuple[EndgameComponents, int, Optional[int]]
+        """
+        loops = list(key[0])
+        chains = list(key[1])
+        chains.remove(chain)
+        junction_1, junction_2, length = chain
+        boxes_1, live_1 = self.release_junction(loops, chains, junction_1)
+        boxes_2, live_2 = 0, True
+        if junction_2 != junction_1 and any(junction_2 in (c[0], c[1]) for c in chains):
+            boxes_2, live_2 = self.release_junction(loops, chains, junction_2)
+        opening = None
+        for index in range(length + 1):
+            if ((index + boxes_1 < 2 or not live_1)
+                    and (length - index + boxes_2 < 2 or not live_2)):
+                opening = index
+                break
+        return (loops, chains), length + boxes_1 + boxes_2, opening
+
+    @staticmethod
+    def open_loop(key: EndgameKey, length: int) -> EndgameComponents:
+        """
+        :param key: The key of the position.
+        :type key: EndgameKey
+        :param length: The length of the loop to open.
+        :type length: int
+        :return: The loops and chains after the loop has been taken.
+        :rtype: EndgameComponents
+        """
+        loops = list(key[0])
+        loops.remove(length)
+        return loops, list(key[1])
+
+    def open_component(self, key: EndgameKey, component: EndgameComponent) -> EndgameComponents:
+        """
+        :param key: The key of the position.
+        :type key: EndgameKey
+        :param component: The loop or chain to open.
+        :type component: EndgameComponent
+        :return: The loops and chains after the boxes of the component have been taken.
+        :rtype: EndgameComponents
+        """
+        if isinstance(component, int):
+            return self.open_loop(key, component)
+        return self.open_chain(key, component)[0]
+
+    def get_move_value(
+            self,
+            boxes: int,
+            keep_control_cost: int,
+            key: EndgameKey,
+            component: EndgameComponent,
+            alpha: int = -infinity,
+            beta: int = infinity
+    ) -> int:
+        """
+        Compute the value of opening a component with an alpha-beta window, see solve().
+
+        If the opponent can keep control, the value is at most keep_control_cost - boxes (the opponent is indifferent
+        when the value of the child position is -keep_control_cost), so the child position is not searched if that
+        is not better than alpha. The child position and its key are only built if it is searched.
+
+        :param boxes: The number of boxes handed to the opponent.
+        :type boxes: int
+        :param keep_control_cost: The number of boxes the opponent has to give back to keep control, 0 if the opponent
+            can not keep control.
+        :type keep_control_cost: int
+        :param key: The key of the position.
+        :type key: EndgameKey
+        :param component: The loop or chain to open.
+        :type component: EndgameComponent
+        :param alpha: The value is only exact if it is greater than alpha, else it is an upper bound.
+        :type alpha: int
+        :param beta: The value is only exact if it is less than beta, else it is a lower bound.
+        :type beta: int
+        :return: The value of opening the component for the player to move.
+        :rtype: int
+        """
+        if not keep_control_cost:
+            child = get_canonical_key(*self.open_component(key, component))[0]
+            return -boxes - self.solve(child, -boxes - beta, -boxes - alpha)
+        if keep_control_cost - boxes <= alpha:
+            return keep_control_cost - boxes
+        # The opponent takes all boxes if the child value is above -keep_control_cost, else keeps control
+        low = alpha + boxes - 2 * keep_control_cost
+        high = -boxes - alpha
+        child_value = self.solve(get_canonical_key(*self.open_component(key, component))[0], low, high)
+        if child_value <= low:
+            return child_value + 2 * keep_control_cost - boxes
+        if child_value >= high:
+            return -boxes - child_value
+        return min(-boxes - child_value, child_value + 2 * keep_control_cost - boxes)
+
+    def get_moves(self, key: EndgameKey) -> List[Tuple[int, int, EndgameComponent]]:
+        """
+        :param key: The key of the position.
+        :type key: EndgameKey
+        :return: Per loop and chain to open, the number of boxes handed to the opponent, the number of boxes the
+            opponent has to give back to keep control (0 if the opponent can not keep control) and the component. The
+            components that the opponent can not keep control of come first, then the ones that hand over the fewest
+            boxes.
+        :rtype: List[Tuple[int, int, EndgameComponent]]
+        """
+        # Of the loops only the smallest one has to be opened, a larger loop hands over more boxes and leaves the same
+        # position with a smaller loop, which changes the value of the child by at most the difference of the lengths
+        moves: List[Tuple[int, int, EndgameComponent]] = [(key[0][0], 4, key[0][0])] if key[0] else []
+        degrees: Dict[int, int] = {}
+        for junction_1, junction_2, _ in key[1]:
+            degrees[junction_1] = degrees.get(junction_1, 0) + 1
+            degrees[junction_2] = degrees.get(junction_2, 0) + 1
+        for chain in set(key[1]):
+            junction_1, junction_2, length = chain
+            if junction_1 == junction_2:
+                remaining_1 = remaining_2 = degrees[junction_1] - 2
+            else:
+                remaining_1, remaining_2 = degrees[junction_1] - 1, degrees[junction_2] - 1
+            if remaining_1 >= 2 and remaining_2 >= 2:
+                # No junction is taken with the chain, only its own boxes are handed over
+                moves.append((length, 2 if length > 2 else 0, chain))
+            else:
+                _, boxes, opening = self.open_chain(key, chain)
+                moves.append((boxes, 2 if opening is None else 0, chain))
+        moves.sort(key=lambda move: (move[1] != 0, move[0] - move[1]))
+        return moves
+
+    def solve(self, key: EndgameKey, alpha: int = -infinity, beta: int = infinity) -> int:
+        """
+        Compute the value of a loony endgame position.
+
+        The search is an alpha-beta search (negamax, fail-soft), the cache keeps a lower and an upper bound of the
+        value of every searched position.
+
+        :param key: The key of the position, see EndgamePosition.get_key().
+        :type key: EndgameKey
+        :param alpha: The value is only exact if it is greater than alpha, else it is an upper bound.
+        :type alpha: int
+        :param beta: The value is only exact if it is less than beta, else it is a lower bound.
+        :type beta: int
+        :return: The boxes of the player to move minus the boxes of the opponent, if both play optimal.
+        :rtype: int
+        :raises AIException: If more than max_nodes positions have been solved since the last get_best_edge().
+        """
+        loops, chains = key
+        if not chains:
+            # Open the smallest loop first, solve from the last loop backwards
+            value = 0
+            for length in reversed(loops):
+                value = -max(length + value, length - 8 - value)
+            return value
+
+        lower, upper = self.cache.get(key, (-infinity, infinity))
+        if lower == upper or lower >= beta:
+            return lower
+        if upper <= alpha:
+            return upper
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise AIException("EndgameSolver: Too many positions (>%d)." % self.max_nodes)
+
+        value = -infinity
+        for boxes, keep_control_cost, component in self.get_moves(key):
+            value = max(value, self.get_move_value(boxes, keep_control_cost, key, component, max(alpha, value), beta))
+            if value >= beta:
+                break
+        if value <= alpha:
+            upper = value
+        elif value >= beta:
+            lower = value
+        else:
+            lower = upper = value
+        if len(self.cache) >= self.max_cache_size:
+            self.cache = {}
+        self.cache[key] = (lower, upper)
+        return value
+
+    def get_value(self, gb: GameBoard, max_nodes: Optional[int] = None) -> Optional[int]:
+        """
+        Compute the value of a loony endgame position in which no box can be captured, e.g. to end a playout early.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :param max_nodes: Maximum number of positions to solve for this call, default is max_nodes of the solver.
+        :type max_nodes: Optional[int]
+        :return: The boxes of the player to move minus the boxes of the opponent (of the boxes that are not owned
+            yet), if both play optimal. None if the position is no loony endgame or too many positions had to be
+            solved.
+        :rtype: Optional[int]
+        """
+        position = self.get_position(gb)
+        if position is None:
+            return None
+        self.nodes = 0
+        default_max_nodes = self.max_nodes
+        if max_nodes is not None:
+            self.max_nodes = max_nodes
+        try:
+            return self.solve(position.get_key())
+        except AIException:
+            return None
+        finally:
+            self.max_nodes = default_max_nodes
+
+    def get_best_edge(self, gb: GameBoard) -> Optional[int]:
+        """
+        Find the best line to draw in a loony endgame.
+
+        If boxes can be captured, the position after capturing all of them must be a loony endgame: the best line is
+        then either a capture or the double-dealing move that keeps control.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :return: The edge number of the line or None if the position is no loony endgame or too many positions had to
+            be solved.
+        :rtype: Optional[int]
+        """
+        self.nodes = 0
+        self.value = None
+        try:
+            if gb.capturable_boxes:
+                return self.get_best_capture_edge(gb)
+            return self.get_best_opening_edge(gb)
+        except AIException:
+            self.value = None
+            return None
+
+    def get_best_opening_edge(self, gb: GameBoard) -> Optional[int]:
+        """
+        Find the best loop or chain to open, see get_best_edge().
+
+        :param gb: The gameboard, no box can be captured.
+        :type gb: GameBoard
+        :return: The edge number of the line or None if the position is no loony endgame.
+        :rtype: Optional[int]
+        """
+        position = self.get_position(gb)
+        if position is None:
+            return None
+        key, labels = position.get_key_and_labels()
+        best_edge = None
+        if position.loops:
+            # Only the smallest loop has to be opened, see get_moves()
+            edges = min(position.loops, key=len)
+            self.value = self.get_move_value(len(edges), 4, key, len(edges))
+            best_edge = edges[0]
+        for junction_1, junction_2, edges in position.chains:
+            label_1, label_2 = labels[junction_1], labels[junction_2]
+            if label_1 > label_2:
+                # The key has the chain in the other direction
+                label_1, label_2, edges = label_2, label_1, edges[::-1]
+            chain = (label_1, label_2, len(edges) - 1)
+            _, boxes, opening = self.open_chain(key, chain)
+            value = self.get_move_value(boxes, 2 if opening is None else 0, key, chain, self.get_alpha())
+            if self.value is None or value > self.value:
+                self.value = value
+                best_edge = edges[opening or 0]
+        return best_edge
+
+    def get_alpha(self) -> int:
+        """
+        :return: The value of the best move found so far by get_best_opening_edge(), the other moves only have to be
+            searched for a better value.
+        :rtype: int
+        """
+        return self.value if self.value is not None else -infinity
+
+    def get_best_capture_edge(self, gb: GameBoard) -> Optional[int]:
+        """
+        Decide between taking all boxes and keeping control, see get_best_edge().
+
+        All boxes are captured on a copy of the gameboard, once for every capturable box as the start of the boxes
+        that are captured last. If the last boxes are the end of a chain or a loop, the player can give them back.
+
+        :param gb: The gameboard, at least one box can be captured.
+        :type gb: GameBoard
+        :return: The edge number of the line or None if the position after capturing all boxes is no loony endgame.
+        :rtype: Optional[int]
+        """
+        board = gb.clone_for_search()
+        adjacent_boxes = board.edge_table.adjacent_boxes
+        take_all_edge = None
+        child_value = None
+        best_double_deal = None
+        # Try every capturable box as the start of the boxes that are captured last
+        for last_box in list(board.capturable_boxes):
+            steps: List[Tuple[int, int, int]] = []  # (edge, captured boxes, number of the run)
+            run = 0
+            current = None
+            while board.capturable_boxes and board.winner == 0:
+                if current not in board.capturable_boxes:
+                    run += 1
+                    others = [box_nr for box_nr in board.capturable_boxes if box_nr != last_box]
+                    current = others[0] if others else last_box
+                edge = board.capturable_boxes[current]
+                steps.append((edge, board.apply(edge), run))
+                box_1, box_2 = adjacent_boxes[edge]
+                current = box_2 if box_1 == current else box_1
+
+            if child_value is None:
+                take_all_edge = steps[0][0]
+                if board.free_lines:
+                    position = self.get_position(board)
+                    if position is None:
+                        for _ in steps:
+                            board.undo()
+                        return None
+                    child_value = self.solve(position.get_key())
+                else:
+                    child_value = 0
+
+            # The last two boxes of a chain or the last four boxes of a loop can be given back
+            double_deal = None
+            if len(steps) >= 2 and steps[-1][1:] == (1, run) and steps[-2][1:] == (1, run):
+                double_deal = (2, len(steps) - 2, steps[-1][0])
+            elif len(steps) >= 3 and steps[-1][1:] == (2, run) and steps[-2][1:] == (1, run) \
+                    and steps[-3][1:] == (1, run):
+                double_deal = (4, len(steps) - 3, steps[-2][0])
+            for _ in steps:
+                board.undo()
+            if double_deal and (best_double_deal is None or double_deal[0] < best_double_deal[0]):
+                cost, index, edge = double_deal
+                best_double_deal = (cost, index, edge if index == 0 else steps[0][0])
+
+        total = sum(step[1] for step in steps)
+        self.value = total + child_value
+        if best_double_deal:
+            cost, _, edge = best_double_deal
+            value = total - 2 * cost - child_value
+            if value > self.value:
+                self.value = value
+                return edge
+        return take_all_edge
@@ -0,0 +1,258 @@
+from typing import Any, List, Tuple, Union
+
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+try:
+    import numpy
+except ImportError:
+    # NumPy is optional, BetterAI and NormalAI fall back to their loops over the gameboard
+    numpy = None
+
+# Use the NumPy functions in BetterAI and NormalAI, set it to False to use the loops (e.g. to compare both)
+USE_NUMPY: bool = numpy is not None
+
+
+def get_line_grids(gb: GameBoard) -> Tuple[Any, Any, Any]:
+    """
+    Get the lines of the gameboard as NumPy arrays with the shape (size_x, size_y).
+
+    The arrays of the lines are views of GameBoard.lines_right and GameBoard.lines_below, they are not copied.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: Tuple of the arrays right (True if the line right of the box is drawn), below (True if the line below
+        the box is drawn) and the side counts (the number of lines and borders around every box, the same as
+        GameBoard.surroundings).
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    shape = (gb.size_x, gb.size_y)
+    right = numpy.frombuffer(gb.lines_right, dtype=numpy.uint8).reshape(shape) != 0
+    below = numpy.frombuffer(gb.lines_below, dtype=numpy.uint8).reshape(shape) != 0
+    return right, below, get_side_counts(right, below)
+
+
+def get_line_grids_batch(boards: List[GameBoard]) -> Tuple[Any, Any, Any]:
+    """
+    Get the lines of many gameboards of the same size as NumPy arrays with the shape (len(boards), size_x, size_y).
+
+    :param boards: The gameboards, all of the same size.
+    :type boards: List[GameBoard]
+    :return: Tuple of the arrays right, below and the side counts, see get_line_grids().
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    shape = (len(boards), boards[0].size_x, boards[0].size_y)
+    right = numpy.frombuffer(b"".join([gb.lines_right for gb in boards]), dtype=numpy.uint8).reshape(shape) != 0
+    below = numpy.frombuffer(b"".join([gb.lines_below for gb in boards]), dtype=numpy.uint8).reshape(shape) != 0
+    return right, below, get_side_counts(right, below)
+
+
+def get_side_counts(right: Any, below: Any) -> Any:
+    """
+    :param right: The lines right of the boxes, the last two axes are x and y.
+    :type right: numpy.ndarray
+    :param below: The lines below the boxes, the last two axes are x and y.
+    :type below: numpy.ndarray
+    :return: The number of lines and borders around every box.
+    :rtype: numpy.ndarray
+    """
+    side_counts = numpy.zeros(right.shape, dtype=numpy.int8)
+    side_counts += right
+    side_counts += below
+    side_counts[..., 1:, :] += right[..., :-1, :]
+    side_counts[..., :, 1:] += below[..., :, :-1]
+    # The border of the gameboard
+    side_counts[..., -1, :] += ~right[..., -1, :]
+    side_counts[..., :, -1] += ~below[..., :, -1]
+    side_counts[..., 0, :] += 1
+    side_counts[..., :, 0] += 1
+    return side_counts
+
+
+def get_safe_masks(side_counts: Any, right: Any, below: Any) -> Tuple[Any, Any]:
+    """
+    Get the free lines that do not give a box to the opponent (the "good moves" of BetterAI).
+
+    :param side_counts: The side counts, see get_line_grids().
+    :type side_counts: numpy.ndarray
+    :param right: The lines right of the boxes, see get_line_grids().
+    :type right: numpy.ndarray
+    :param below: The lines below the boxes, see get_line_grids().
+    :type below: numpy.ndarray
+    :return: Tuple of the masks of the safe lines right of and below the boxes.
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    open_boxes = side_counts < 2
+    safe_right = numpy.zeros(right.shape, dtype=bool)
+    safe_right[..., :-1, :] = ~right[..., :-1, :] & open_boxes[..., :-1, :] & open_boxes[..., 1:, :]
+    safe_below = numpy.zeros(below.shape, dtype=bool)
+    safe_below[..., :, :-1] = ~below[..., :, :-1] & open_boxes[..., :, :-1] & open_boxes[..., :, 1:]
+    return safe_right, safe_below
+
+
+def get_edges(mask_right: Any, mask_below: Any) -> Any:
+    """
+    :param mask_right: Per box, True or a count for the line right of the box.
+    :type mask_right: numpy.ndarray
+    :param mask_below: Per box, True or a count for the line below the box.
+    :type mask_below: numpy.ndarray
+    :return: The edge numbers (see GameBoard.get_edge()) of the lines, every line as often as its count, in the
+        order of the edge numbers (the order of the loops over x, y and right, below in the AIs).
+    :rtype: numpy.ndarray
+    """
+    counts = numpy.stack((mask_right, mask_below), axis=2).ravel()
+    if counts.dtype == bool:
+        return numpy.flatnonzero(counts)
+    return numpy.repeat(numpy.arange(counts.size), counts)
+
+
+def get_better_move_edges(gb: GameBoard) -> Tuple[Any, Any]:
+    """
+    NumPy version of BetterAI.get_better_moves_lists(), with edge numbers instead of Move objects.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: Tuple of the "better moves" (safe lines at a right angle to a drawn line, once per drawn line) and the
+        "good moves" (all safe lines), in the same order as the lists of BetterAI.get_better_moves_lists().
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    count_right, count_below, safe_right, safe_below = get_better_move_masks(*get_line_grids(gb))
+    return get_edges(count_right, count_below), get_edges(safe_right, safe_below)
+
+
+def get_better_move_edges_batch(boards: List[GameBoard]) -> List[Tuple[Any, Any]]:
+    """
+    Version of get_better_move_edges() for many gameboards of the same size, which classifies the lines of all
+    boards with one set of whole-array operations.
+
+    :param boards: The gameboards, all of the same size.
+    :type boards: List[GameBoard]
+    :return: The result of get_better_move_edges() for every gameboard.
+    :rtype: List[Tuple[numpy.ndarray, numpy.ndarray]]
+    """
+    count_right, count_below, safe_right, safe_below = get_better_move_masks(*get_line_grids_batch(boards))
+    return [(get_edges(count_right[i], count_below[i]), get_edges(safe_right[i], safe_below[i]))
+            for i in range(len(boards))]
+
+
+def get_better_move_masks(right: Any, below: Any, side_counts: Any) -> Tuple[Any, Any, Any, Any]:
+    """
+    :param right: The lines right of the boxes, see get_line_grids() and get_line_grids_batch().
+    :type right: numpy.ndarray
+    :param below: The lines below the boxes.
+    :type below: numpy.ndarray
+    :param side_counts: The side counts.
+    :type side_counts: numpy.ndarray
+    :return: Tuple of the counts of the drawn lines at a right angle to the safe lines right of and below the boxes,
+        and the masks of the safe lines right of and below the boxes (see get_safe_masks()).
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    safe_right, safe_below = get_safe_masks(side_counts, right, below)
+
+    # Drawn lines at the four ends of a line right of a box: below and above this box and the box to the right
+    count_right = numpy.zeros(right.shape, dtype=numpy.int8)
+    count_right[..., :-1, :] += below[..., :-1, :]
+    count_right[..., :-1, :] += below[..., 1:, :]
+    count_right[..., :-1, 1:] += below[..., :-1, :-1]
+    count_right[..., :-1, 1:] += below[..., 1:, :-1]
+    count_right *= safe_right
+    # Drawn lines at the four ends of a line below a box: right and left of this box and the box below
+    count_below = numpy.zeros(below.shape, dtype=numpy.int8)
+    count_below[..., :, :-1] += right[..., :, :-1]
+    count_below[..., :, :-1] += right[..., :, 1:]
+    count_below[..., 1:, :-1] += right[..., :-1, :-1]
+    count_below[..., 1:, :-1] += right[..., :-1, 1:]
+    count_below *= safe_below
+
+    return count_right, count_below, safe_right, safe_below
+
+
+def get_close_to_other_lines_edges(gb: GameBoard) -> Tuple[Any, Any]:
+    """
+    NumPy version of the lists of NormalAI.get_close_to_other_lines_move(), with edge numbers.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: Tuple of the "better moves" (safe lines next to a drawn line or the border) and all safe lines, in the
+        same order as the lists of NormalAI.get_close_to_other_lines_move().
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    right, below, side_counts = get_line_grids(gb)
+    safe_right, safe_below = get_safe_masks(side_counts, right, below)
+
+    # A line right of a box is close to the line below the box, the border or the lines right of the boxes above
+    # and below
+    close_right = below.copy()
+    close_right[:, 0] = True
+    close_right[:, -1] = True
+    close_right[:, 1:] |= right[:, :-1]
+    close_right[:, :-1] |= right[:, 1:]
+    # A line below a box is close to the line right of the box, the border or the lines below the boxes left and
+    # right of it
+    close_below = right.copy()
+    close_below[0, :] = True
+    close_below[-1, :] = True
+    close_below[1:, :] |= below[:-1, :]
+    close_below[:-1, :] |= below[1:, :]
+
+    return get_edges(safe_right & close_right, safe_below & close_below), get_edges(safe_right, safe_below)
+
+
+def get_single_box_sacrifice_edges(gb: GameBoard) -> Any:
+    """
+    NumPy version of BetterAI.get_single_box_sacrifice_moves(), with edge numbers.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: The free lines of the boxes with two lines around them, where both boxes next to the line have less
+        than two lines around them, in the same order as BetterAI.get_single_box_sacrifice_moves().
+    :rtype: numpy.ndarray
+    """
+    right, below, side_counts = get_line_grids(gb)
+    size_x, size_y = side_counts.shape
+    free_right = ~right
+    free_right[-1, :] = False
+    free_below = ~below
+    free_below[:, -1] = False
+    free_left = numpy.zeros(right.shape, dtype=bool)
+    free_left[1:, :] = free_right[:-1, :]
+    free_above = numpy.zeros(below.shape, dtype=bool)
+    free_above[:, 1:] = free_below[:, :-1]
+
+    # The neighbours behind all free lines of the box must have less than two lines around them
+    open_boxes = side_counts < 2
+    mask = side_counts == 2
+    mask[:-1, :] &= ~free_right[:-1, :] | open_boxes[1:, :]
+    mask[1:, :] &= ~free_left[1:, :] | open_boxes[:-1, :]
+    mask[:, :-1] &= ~free_below[:, :-1] | open_boxes[:, 1:]
+    mask[:, 1:] &= ~free_above[:, 1:] | open_boxes[:, :-1]
+
+    # The two free lines of every box: right, left or above first, then below, above or left
+    boxes = numpy.arange(size_x * size_y).reshape(side_counts.shape)
+    edge_right = boxes << 1
+    edge_left = (boxes - size_y) << 1
+    edge_below = (boxes << 1) | 1
+    edge_above = ((boxes - 1) << 1) | 1
+    first = numpy.where(free_right, edge_right, numpy.where(free_left, edge_left, edge_above))
+    second = numpy.where(free_below, edge_below, numpy.where(free_above, edge_above, edge_left))
+    return numpy.stack((first, second), axis=2)[mask].ravel()
+
+
+def to_move(gb: GameBoard, move: Union[Move, int], player: int, player_ai: str = "") -> Move:
+    """
+    Get the Move of an entry of a move list, which holds Move objects (loops) or edge numbers (NumPy functions).
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :param move: The Move or the edge number.
+    :type move: Union[Move, int]
+    :param player: The player (1 or 2) making the move.
+    :type player: int
+    :param player_ai: The player_ai making the move.
+    :type player_ai: str
+    :return: The Move object.
+    :rtype: Move
+    """
+    if isinstance(move, Move):
+        return move
+    return gb.edge_to_move(int(move), player, player_ai)
@@ -0,0 +1,370 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from kaese.ai.ai import AI
+from kaese.ai.ai_exception import AIException
+from kaese.ai.endgame_solver import EndgameSolver
+from kaese.ai.move_ordering import MoveOrdering
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+from kaese.gameboard.symmetry import get_line_mask
+
+
+class MctsNode:
+    """
+    One position in the search tree of MctsAI.
+
+    Attributes:
+        edge (int): The edge number of the line that leads to this position, -1 for the root.
+        parent (Optional[MctsNode]): The previous position, None for the root.
+        player (int): The player to move in this position.
+        mover (int): The player who has drawn the line that leads to this position.
+        children (Dict[int, MctsNode]): The expanded moves, by edge number.
+        untried_edges (List[int]): The moves that are not expanded yet, the next one is the last in the list.
+        visits (int): Number of playouts through this position.
+        score (float): Sum of the results of these playouts for the mover, see MctsAI.search().
+    """
+    edge: int
+    parent: Optional["MctsNode"]
+    player: int
+    mover: int
+    children: Dict[int, "MctsNode"]
+    untried_edges: List[int]
+    visits: int
+    score: float
+
+    def __init__(self, gb: GameBoard, edge: int = -1, parent: Optional["MctsNode"] = None, mover: int = 0) -> None:
+        """
+        :param gb: The gameboard with this position.
+        :type gb: GameBoard
+        :param edge: The edge number of the line that leads to this position, -1 for the root.
+        :type edge: int
+        :param parent: The previous position, None for the root.
+        :type parent: Optional[MctsNode]
+        :param mover: The player who has drawn the line that leads to this position, 0 for the opponent of the player
+            to move.
+        :type mover: int
+        """
+        self.edge = edge
+        self.parent = parent
+        self.player = gb.current_player
+        self.mover = mover if mover else 3 - gb.current_player
+        self.children = {}
+        # Captures are expanded first, then safe moves, then sacrifices, in random order within a class
+        untried_edges = list(gb.free_lines)
+        random.shuffle(untried_edges)
+        untried_edges.sort(key=lambda e: MoveOrdering.get_move_class(gb, e))
+        self.untried_edges = untried_edges
+        self.visits = 0
+        self.score = 0.0
+
+
+class MctsAI(AI):
+    """
+    MctsAI class represents an AI player that implements a Monte Carlo Tree Search with UCT.
+
+    It inherits from the AI class. Every iteration selects a path in the search tree with the UCT formula, adds one
+    position to the tree and plays the game to the end with the playout policy: capture a box if possible, else
+    draw a line that does not give a box to the opponent (the "good moves" of BetterAI), else give the opponent as
+    few boxes as possible. The moves are made on a copy of the gameboard with apply() and taken back with undo().
+    As soon as a playout reaches a loony endgame (no safe moves left), the EndgameSolver computes its exact result.
+    If the position of the move itself is a loony endgame, the move of the EndgameSolver is used without a search.
+
+    The search tree is kept between the moves of one MctsAI instance: the position after the moves of the opponent
+    becomes the new root, if it has been searched before.
+    """
+
+    iterations: Optional[int]  # iterations per move, None: only the time budget counts
+    time_budget: Optional[float]  # seconds per move, None: only the number of iterations counts
+    exploration: float  # exploration constant of the UCT formula
+    endgame_solver: EndgameSolver
+
+    playout_samples: int = 8  # random lines tested for a safe move or a small sacrifice in the playouts
+    playout_solver_nodes: int = 50  # budget of the EndgameSolver in a playout, it is called in every playout
+
+    root: Optional[MctsNode]
+    root_line_mask: int  # line mask of the root position, see get_line_mask()
+    last_iterations: int  # number of iterations of the last search
+
+    def __init__(
+            self,
+            verbose: Union[bool, int] = False,
+            iterations: Optional[int] = None,
+            time_budget: Optional[float] = 1.0,
+            exploration: float = 0.7,
+            endgame_solver: Optional[EndgameSolver] = None
+    ) -> None:
+        """
+        Args:
+            verbose (Union[bool, int]): Verbosity level.
+            iterations (Optional[int]): Number of iterations per move, None for no limit.
+            time_budget (Optional[float]): Time budget per move in seconds, None for no limit.
+            exploration (float): Exploration constant of the UCT formula.
+            endgame_solver (Optional[EndgameSolver]): Solver for loony endgames, default EndgameSolver().
+
+        Raises:
+            AIException: If neither iterations nor time_budget is given.
+        """
+        super().__init__(verbose)
+        if iterations is None and time_budget is None:
+            raise AIException("MctsAI: Either the number of iterations or the time budget is needed.")
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+        self.root = None
+        self.root_line_mask = 0
+        self.last_iterations = 0
+
+    def get_next_move(self, gb: GameBoard, player: int) -> Move:
+        """
+        Calculates and returns the next move for the AI player, the most visited move of the root position.
+
+        Args:
+            gb (GameBoard): The game board object.
+            player (int): The AI player's identifier.
+
+        Returns:
+            Move: The next move.
+
+        Raises:
+            AIException: If it is not the turn of the player or the game has ended.
+        """
+        if gb.current_player != player:
+            raise AIException("MctsAI: Wrong Player, can not handle this...")
+        if not gb.free_lines:
+            raise AIException("No more valid moves found. The game seems to be already ended.")
+
+        board = gb.clone_for_search()
+        edge = self.endgame_solver.get_best_edge(board)
+        if edge is not None:
+            self.debug("Using the move of the EndgameSolver (value %d)." % self.endgame_solver.value, 1)
+            self.root = None
+            return board.edge_to_move(edge, player, self.__class__.__name__)
+
+        line_mask = get_line_mask(board)
+        root = self.find_root(board, line_mask)
+        if root is None:
+            root = MctsNode(board)
+            self.debug("New search tree.", 1)
+        else:
+            root.parent = None
+            self.debug("Reusing the search tree with %d playouts." % root.visits, 1)
+
+        self.search(board, root)
+
+        edge, child = max(root.children.items(), key=lambda item: item[1].visits)
+        self.debug("%d iterations, best move %d with %d visits and an average score of %.3f."
+                   % (self.last_iterations, edge, child.visits, child.score / child.visits), 1)
+
+        # The opponent moves next (unless this move captures a box), keep the subtree of this move
+        self.root = child
+        self.root_line_mask = line_mask | (1 << edge)
+        return board.edge_to_move(edge, player, self.__class__.__name__)
+
+    def find_root(self, gb: GameBoard, line_mask: int) -> Optional[MctsNode]:
+        """
+        Find the position of the gameboard in the search tree of the last move.
+
+        Args:
+            gb (GameBoard): The game board object.
+            line_mask (int): The line mask of the position, see get_line_mask().
+
+        Returns:
+            Optional[MctsNode]: The node of the position, None if it is not in the tree.
+        """
+        if self.root is None or self.root_line_mask & ~line_mask:
+            return None
+
+        def find(node: MctsNode, missing_lines: int) -> Optional[MctsNode]:
+            if not missing_lines:
+                return node if node.player == gb.current_player else None
+            for edge, child in node.children.items():
+                if missing_lines >> edge & 1:
+                    found = find(child, missing_lines ^ (1 << edge))
+                    if found is not None:
+                        return found
+            return None
+
+        return find(self.root, line_mask ^ self.root_line_mask)
+
+    def search(self, gb: GameBoard, root: MctsNode) -> None:
+        """
+        Run the iterations until the number of iterations or the time budget is reached.
+
+        Args:
+            gb (GameBoard): The game board with the position of the root, it is restored after every iteration.
+            root (MctsNode): The root of the search tree.
+
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        iterations = 0
+        # At least one iteration, so the root has a child
+        while iterations == 0 or ((self.iterations is None or iterations < self.iterations)
+                                  and (deadline is None or time.monotonic() < deadline)):
+            iterations += 1
+            node = root
+            cnt_moves = 0
+
+            # Selection
+            while not node.untried_edges and node.children:
+                node = self.select_child(node)
+                gb.apply(node.edge)
+                cnt_moves += 1
+
+            # Expansion
+            if node.untried_edges:
+                edge = node.untried_edges.pop()
+                mover = gb.current_player
+                gb.apply(edge)
+                cnt_moves += 1
+                child = MctsNode(gb, edge, node, mover)
+                node.children[edge] = child
+                node = child
+
+            # Playout
+            cnt_playout_moves, remaining_value = self.playout(gb)
+            cnt_moves += cnt_playout_moves
+            difference = gb.win_counter[1] - gb.win_counter[2]
+            difference += remaining_value if gb.current_player == 1 else -remaining_value
+            # The boxes of player 1 minus the boxes of player 2, scaled to 0 (player 2 gets all boxes) ... 1
+            result = 0.5 + difference / (2 * gb.size_x * gb.size_y)
+            for _ in range(cnt_moves):
+                gb.undo()
+
+            # Backpropagation, result is the result for player 1
+            while node is not None:
+                node.visits += 1
+                node.score += result if node.mover == 1 else 1.0 - result
+                node = node.parent
+        self.last_iterations = iterations
+
+    def select_child(self, node: MctsNode) -> MctsNode:
+        """
+        Select the child with the highest UCT value.
+
+        Args:
+            node (MctsNode): A node whose moves are all expanded.
+
+        Returns:
+            MctsNode: The selected child.
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best_child = None
+        best_value = -1.0
+        for child in node.children.values():
+            value = child.score / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best_child = child
+        return best_child
+
+    def playout(self, gb: GameBoard) -> Tuple[int, int]:
+        """
+        Play the game to the end with the playout policy, or until the EndgameSolver knows the result.
+
+        Args:
+            gb (GameBoard): The game board object, the moves are made with apply().
+
+        Returns:
+            Tuple[int, int]: The number of moves made and the value of the boxes that are not owned yet for the player
+                to move (0 if the game has ended).
+        """
+        cnt_moves = 0
+        free_lines = gb.free_lines
+        capturable_boxes = gb.capturable_boxes
+        surroundings = gb.surroundings
+        adjacent_boxes = gb.edge_table.adjacent_boxes
+        size_y = gb.size_y
+
+        def is_safe(line: int) -> bool:
+            box_1, box_2 = adjacent_boxes[line]
+            return (surroundings[box_1 // size_y][box_1 % size_y] < 2
+                    and surroundings[box_2 // size_y][box_2 % size_y] < 2)
+
+        free_line_positions = gb.free_line_positions
+        safe_edges: Optional[List[int]] = None
+        solve_endgame = True
+        while free_lines:
+            if capturable_boxes:
+                edge = next(iter(capturable_boxes.values()))
+            else:
+                edge = -1
+                if safe_edges is None:
+                    for _ in range(self.playout_samples):
+                        candidate = random.choice(free_lines)
+                        if is_safe(candidate):
+                            edge = candidate
+                            break
+                    if edge < 0:
+                        # Only a few safe moves are left, collect them once
+                        safe_edges = [line for line in free_lines if is_safe(line)]
+                if edge < 0 and safe_edges:
+                    # A move that is not safe (or not free) now never becomes safe again, so it can be dropped
+                    while safe_edges:
+                        i = random.randrange(len(safe_edges))
+                        candidate = safe_edges[i]
+                        safe_edges[i] = safe_edges[-1]
+                        safe_edges.pop()
+                        if free_line_positions[candidate] >= 0 and is_safe(candidate):
+                            edge = candidate
+                            break
+                if edge < 0:
+                    if solve_endgame:
+                        # Only once, if it is too large for the solver, the next loony positions are as well
+                        solve_endgame = False
+                        value = self.endgame_solver.get_value(gb, self.playout_solver_nodes)
+                        if value is not None:
+                            return cnt_moves, value
+                    edge = self.get_small_sacrifice(gb)
+            gb.apply(edge)
+            cnt_moves += 1
+        return cnt_moves, 0
+
+    def get_small_sacrifice(self, gb: GameBoard) -> int:
+        """
+        Select the line that gives the fewest boxes to the opponent out of a few random free lines, if there are no
+        safe moves left (like BetterAI, that tries to give the opponent only one box).
+
+        The boxes are counted by following the chains of boxes with two lines from the line, the gameboard is not
+        changed.
+
+        Args:
+            gb (GameBoard): The game board object without safe moves and without capturable boxes.
+
+        Returns:
+            int: The edge number of the line.
+        """
+        surroundings = gb.surroundings
+        adjacent_boxes = gb.edge_table.adjacent_boxes
+        box_edges = gb.edge_table.box_edges
+        free_line_positions = gb.free_line_positions
+        size_y = gb.size_y
+        best_edge = -1
+        best_count = gb.size_x * gb.size_y + 1
+        for _ in range(self.playout_samples):
+            edge = random.choice(gb.free_lines)
+            count = 0
+            loop = False
+            for start_box in adjacent_boxes[edge]:
+                box = start_box
+                line = edge
+                while not loop and surroundings[box // size_y][box % size_y] == 2 and count < best_count:
+                    # The box is captured, the opponent continues with the other free line of the box
+                    count += 1
+                    line = next(e for e in box_edges[box] if e != line and free_line_positions[e] >= 0)
+                    box_1, box_2 = adjacent_boxes[line]
+                    box = box_2 if box_1 == box else box_1
+                    # All boxes of a loop are counted from the first box already
+                    loop = box == start_box
+            if count < best_count:
+                best_edge = edge
+                best_count = count
+                if count <= 1:
+                    break
+        return best_edge
@@ -0,0 +1,94 @@
+from typing import Dict, List
+
+from kaese.gameboard.gameboard import GameBoard
+
+# Classes of moves, higher classes are searched first
+CAPTURE_MOVE: int = 2  # completes a box
+SAFE_MOVE: int = 1  # does not give a box to the opponent (a "good move" in BetterAI.get_better_moves_lists())
+SACRIFICE_MOVE: int = 0  # gives at least one box to the opponent
+
+
+class MoveOrdering:
+    """
+    Move ordering heuristics for the alpha-beta search of TreeAI.
+
+    The moves (edge numbers, see GameBoard.get_edge()) are sorted by their class first: moves that capture a box,
+    then safe moves, then sacrifices. Within a class, the killer moves of the current number of drawn lines come
+    first, followed by the other moves in the order of the history table.
+
+    Subclass it and override order_edges() and record_cutoff() to try other heuristics.
+
+    Attributes:
+        killers (Dict[int, List[int]]): Per number of moves made, the last two moves that caused a beta cutoff.
+        history (Dict[int, int]): Per edge number, the sum of depth * depth of all beta cutoffs caused by the move.
+    """
+    killers: Dict[int, List[int]]
+    history: Dict[int, int]
+
+    def __init__(self) -> None:
+        self.killers = {}
+        self.history = {}
+
+    def new_search(self) -> None:
+        """
+        Start a new search: The killer moves are cleared and the history table is aged (values are halved).
+
+        :return: None
+        """
+        self.killers = {}
+        self.history = {edge: value >> 1 for edge, value in self.history.items() if value > 1}
+
+    @staticmethod
+    def get_move_class(gb: GameBoard, edge: int) -> int:
+        """
+        Classify a move by the surroundings of the two boxes next to the line.
+
+        :param gb: The gameboard.
+        :param edge: The edge number of a free line.
+        :return: CAPTURE_MOVE, SAFE_MOVE or SACRIFICE_MOVE.
+        """
+        x, y, horizontal = gb.edge_table.coordinates[edge]
+        surroundings = gb.surroundings
+        count_1 = surroundings[x][y]
+        count_2 = surroundings[x][y + 1] if horizontal == 1 else surroundings[x + 1][y]
+        if count_1 == 3 or count_2 == 3:
+            return CAPTURE_MOVE
+        if count_1 < 2 and count_2 < 2:
+            return SAFE_MOVE
+        return SACRIFICE_MOVE
+
+    def order_edges(self, gb: GameBoard, edges: List[int]) -> List[int]:
+        """
+        Sort the moves in place, best first.
+
+        :param gb: The gameboard.
+        :param edges: The edge numbers of the moves, e.g. a copy of GameBoard.free_lines.
+        :return: The sorted list edges.
+        """
+        killers = self.killers.get(gb.moves_made, [])
+        history = self.history
+        get_move_class = self.get_move_class
+
+        def sort_key(edge: int) -> int:
+            key = (get_move_class(gb, edge) << 40) + history.get(edge, 0)
+            if edge in killers:
+                key += (2 - killers.index(edge)) << 36
+            return key
+
+        edges.sort(key=sort_key, reverse=True)
+        return edges
+
+    def record_cutoff(self, gb: GameBoard, edge: int, depth: int) -> None:
+        """
+        Update the killer moves and the history table after a move caused a beta cutoff.
+
+        :param gb: The gameboard, in the position in which the move was made.
+        :param edge: The edge number of the move.
+        :param depth: The remaining search depth of the position.
+        :return: None
+        """
+        killers = self.killers.setdefault(gb.moves_made, [])
+        if edge not in killers:
+            killers.insert(0, edge)
+            del killers[2:]
+        self.history[edge] = min(self.history.get(edge, 0) + depth * depth, (1 << 36) - 1)
@@ -1,8 +1,10 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import random
 import logging
 from kaese.ai.ai import AI
+from kaese.ai import line_masks
 from kaese.ai.ai_exception import AIException
+from kaese.ai.position_features import PositionFeatures, get_position_features
 from kaese.ai.random_ai import RandomAI
 from kaese.ai.simple_ai import SimpleAI
 from kaese.gameboard.move import Move
@@ -18,6 +20,9 @@ class NormalAI(AI):
     If none of the above is possible, it selects a random valid move.
 
     It inherits from the AI class.
+
+    With NumPy installed, the lines are classified with whole-array operations, see kaese.ai.line_masks. The lists of
+    lines are kept per position, see PositionFeatures.
     """
 
     def get_next_move(self, gb: GameBoard, player: int) -> Move:
@@ -42,7 +47,8 @@ class NormalAI(AI):
             return capture_field_move
 
         # before using "any valid move" search for moves where umrandungen<2
-        capture_field_move = NormalAI.get_close_to_other_lines_move(gb, player, player_ai)
+        features = get_position_features(gb)
+        capture_field_move = NormalAI.get_close_to_other_lines_move(gb, player, player_ai, features)
         if capture_field_move:
             return capture_field_move
 
@@ -52,21 +58,65 @@ class NormalAI(AI):
 
     @staticmethod
     def get_field_with_count_of_surroundings(gb: GameBoard) -> List[List[int]]:
-        """calculate how many surroundings every field has and return 2-dim list with integers 0-4"""
-        # TODO tests schreiben
-        surroundings = []
-        for x in range(0, gb.size_x):
-            row = []
-            for y in range(0, gb.size_y):
-                row.append(gb.get_count_surroundings(x, y))
-            surroundings.append(row)
-        return surroundings
+        """
+        Return 2-dim list with integers 0-4, how many surroundings every field has.
+
+        This is a copy of the surroundings matrix that the GameBoard keeps up to date on every move, so the caller may
+        modify it. The AIs read gb.surroundings (or PositionFeatures.side_counts) directly instead.
+        """
+        return [list(column) for column in gb.surroundings]
+
+    @staticmethod
+    def get_close_to_other_lines_move(
+            gb: GameBoard,
+            player: int,
+            player_ai: str = "",
+            features: Optional[PositionFeatures] = None
+    ) -> Optional[Move]:
+        """
+        Returns Move or None. Some Foo with using 'better' moves close to other lines...
+
+        Args:
+            gb (GameBoard): The game board object.
+            player (int): The AI player's identifier.
+            player_ai (string): Class name of used AI
+            features (Optional[PositionFeatures]): The features of the position, if the calling AI has them already.
+
+        Returns:
+            Optional[Move]: A line that does not give a box to the opponent, None if there is none.
+        """
+        better_moves, valid_moves = get_position_features(gb, features).get_close_lines()
+        if len(better_moves) > 0:
+            logging.info(
+                "%s: preventing closeable field for opponent, using 'better' move, (%d better, %d possible moves left)"
+                % (player_ai, len(better_moves), len(valid_moves))
+            )
+            return line_masks.to_move(gb, random.choice(better_moves), player, player_ai)
+        if len(valid_moves) > 0:
+            logging.info("%s: preventing closeable field for opponent, (%d possible moves left)" % (
+                player_ai, len(valid_moves)))
+            return line_masks.to_move(gb, random.choice(valid_moves), player, player_ai)
+        return None
 
     @staticmethod
-    def get_close_to_other_lines_move(gb: GameBoard, player: int, player_ai: str = "") -> Optional[Move]:
-        """Returns Move or None. Some Foo with using 'better' moves close to other lines..."""
-        # TODO tests schreiben
-        surroundings = NormalAI.get_field_with_count_of_surroundings(gb)
+    def get_close_to_other_lines_lists(
+            gb: GameBoard,
+            player: int,
+            player_ai: str = ""
+    ) -> Tuple[List[Move], List[Move]]:
+        """
+        Generates the lists of get_close_to_other_lines_move().
+
+        Args:
+            gb (GameBoard): The game board object.
+            player (int): The AI player's identifier.
+            player_ai (string): Class name of used AI
+
+        Returns:
+            Tuple[List[Move], List[Move]]: The 'better' moves (lines that do not give a box to the opponent and are
+                close to other lines or the border) and all lines that do not give a box to the opponent.
+        """
+        surroundings = gb.surroundings
         valid_moves = []
         better_moves = []
         for x in range(0, gb.size_x):
@@ -83,14 +133,4 @@ class NormalAI(AI):
                         if (gb.boxes[x][y].line_right or x == 0 or gb.boxes[x - 1][y].line_below
                                 or x + 1 == gb.size_x or gb.boxes[x + 1][y].line_below):
                             better_moves.append(Move(x, y, 1, player, player_ai))
-        if len(better_moves) > 0:
-            logging.info(
-                "%s: preventing closeable field for opponent, using 'better' move, (%d better, %d possible moves left)"
-                % (player_ai, len(better_moves), len(valid_moves))
-            )
-            return random.choice(better_moves)
-        if len(valid_moves) > 0:
-            logging.info("%s: preventing closeable field for opponent, (%d possible moves left)" % (
-                player_ai, len(valid_moves)))
-            return random.choice(valid_moves)
-        return None
+        return better_moves, valid_moves
@@ -0,0 +1,93 @@
+import random
+from typing import Dict, Optional, Union
+
+from kaese.ai.ai import AI
+from kaese.ai.ai_exception import AIException
+from kaese.db.solved_positions import SolvedPositions, get_solved_positions
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+
+class OracleAI(AI):
+    """
+    OracleAI class represents an AI player that plays perfectly on small boards (up to 4x4), with the exact values of
+    all positions from a database of solved positions (see kaese.db.solved_positions).
+
+    It inherits from the AI class. The database of a board size is mapped into memory once and shared by all
+    instances, every move costs one lookup per valid move. The databases are created with:
+
+        python3 -m kaese.db.solved_positions 3x3 3x4 4x3 4x4
+    """
+
+    directory: Optional[str]
+
+    def __init__(self, verbose: Union[bool, int] = False, directory: Optional[str] = None) -> None:
+        """
+        Args:
+            verbose (Union[bool, int]): Verbosity level.
+            directory (Optional[str]): The directory of the database files, default is the kaese/db directory.
+        """
+        super().__init__(verbose)
+        self.directory = directory
+
+    def get_next_move(self, gb: GameBoard, player: int) -> Move:
+        """
+        Calculates and returns the next move for the AI player, one of the moves with the best exact value.
+
+        Args:
+            gb (GameBoard): The game board object.
+            player (int): The AI player's identifier.
+
+        Returns:
+            Move: The next move.
+
+        Raises:
+            AIException: If it is not the turn of the player, the game has ended or there is no database for the size
+                of the game board.
+        """
+        if gb.current_player != player:
+            raise AIException("OracleAI: Wrong Player, can not handle this...")
+        if not gb.free_lines:
+            raise AIException("No more valid moves found. The game seems to be already ended.")
+
+        move_values = self.get_move_values(gb)
+        best_value = max(move_values.values())
+        best_edges = [edge for edge, value in move_values.items() if value == best_value]
+        self.debug("%d of %d moves have the best value %d." % (len(best_edges), len(move_values), best_value), 1)
+        return gb.edge_to_move(random.choice(best_edges), player, self.__class__.__name__)
+
+    def get_move_values(self, gb: GameBoard) -> Dict[int, int]:
+        """
+        Get the exact value of every valid move, e.g. to measure how many boxes the moves of other AIs give away.
+
+        Args:
+            gb (GameBoard): The game board object.
+
+        Returns:
+            Dict[int, int]: Per edge number of a free line, the number of the remaining boxes the player to move gets
+                minus the number the opponent gets after drawing the line, if both play perfectly.
+
+        Raises:
+            AIException: If there is no database for the size of the game board.
+        """
+        return self.get_solved_positions(gb).get_move_values(gb)
+
+    def get_solved_positions(self, gb: GameBoard) -> SolvedPositions:
+        """
+        Get the database for the size of the game board.
+
+        Args:
+            gb (GameBoard): The game board object.
+
+        Returns:
+            SolvedPositions: The database.
+
+        Raises:
+            AIException: If there is no database for the size of the game board.
+        """
+        try:
+            return get_solved_positions(gb.size_x, gb.size_y, self.directory)
+        except (OSError, ValueError) as e:
+            raise AIException("OracleAI: No database of solved %dx%d positions, create it with "
+                              "'python3 -m kaese.db.solved_positions %dx%d' (%s)."
+                              % (gb.size_x, gb.size_y, gb.size_x, gb.size_y, e))
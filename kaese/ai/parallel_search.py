@@ -0,0 +1,114 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from kaese.ai.search_stats import SearchStats
+from kaese.gameboard.gameboard import GameBoard
+
+# State of a worker process, see init_worker()
+worker_tree_ai: Any = None
+worker_search_id: int = -1
+
+
+class ProcessPool:
+    """
+    Worker processes for the parallel root search of TreeAI, see TreeAI.search_root_parallel().
+
+    Every worker process keeps its own TreeAI (with transposition table and move ordering) for all root moves it
+    searches. Positions are sent as GameBoard.encode() tuples.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        executor (ProcessPoolExecutor): The pool, the processes are started on first use.
+        stop_event (multiprocessing.synchronize.Event): Set it to stop all searches that run in the workers.
+    """
+    workers: int
+    executor: ProcessPoolExecutor
+    stop_event: Any
+
+    def __init__(self, workers: int, transposition_table_mb: float) -> None:
+        """
+        :param workers: Number of worker processes.
+        :type workers: int
+        :param transposition_table_mb: Memory cap of the transposition table of every worker in megabytes.
+        :type transposition_table_mb: float
+        """
+        self.workers = workers
+        self.stop_event = multiprocessing.Event()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(self.stop_event, transposition_table_mb)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_process_pool(workers: int, transposition_table_mb: float) -> ProcessPool:
+    """Return the (cached) ProcessPool for the given number of workers, shared by all TreeAI instances."""
+    return ProcessPool(workers, transposition_table_mb)
+
+
+def init_worker(stop_event: Any, transposition_table_mb: float) -> None:
+    """
+    Create the TreeAI of a worker process.
+
+    :param stop_event: The stop_event of the ProcessPool.
+    :param transposition_table_mb: Memory cap of the transposition table in megabytes.
+    :return: None
+    """
+    global worker_tree_ai
+    from kaese.ai.tree_ai import TreeAI
+    worker_tree_ai = TreeAI(transposition_table_mb=transposition_table_mb)
+    worker_tree_ai.stop_event = stop_event
+
+
+def search_root_move(
+        search_id: int,
+        encoding: Tuple[Any, ...],
+        edge: int,
+        depth: int,
+        alpha: int,
+        beta: int,
+        time_left: Optional[float]
+) -> Tuple[int, bool, SearchStats, List[int]]:
+    """
+    Search one root move in a worker process.
+
+    :param search_id: Identifies the search (TreeAI.get_next_move() call), the transposition table and the move
+        ordering of the worker are aged when a new search starts.
+    :param encoding: The root position, see GameBoard.encode().
+    :param edge: The edge number of the root move.
+    :param depth: The search depth of the root position.
+    :param alpha: The lower bound for the value of the root move.
+    :param beta: The upper bound for the value of the root move.
+    :param time_left: Seconds until the search has to stop, None for no limit.
+    :return: Tuple of the value of the move for the player to move in the root position, True if the search was
+        completed, the statistics of the search and the principal variation after the root move (edge numbers).
+    """
+    global worker_search_id
+    ai = worker_tree_ai
+    ai.gb = GameBoard.decode(encoding)
+    player = ai.gb.current_player
+    if search_id != worker_search_id:
+        worker_search_id = search_id
+        if ai.transposition_table_player != player:
+            ai.transposition_table.clear()
+            ai.transposition_table_player = player
+        ai.transposition_table.new_search()
+        ai.move_ordering.new_search()
+    ai.original_player = player
+    ai.killed = False
+    ai.timed_out = False
+    ai.stats = SearchStats()
+    ai.deadline = None if time_left is None else time.monotonic() + time_left
+
+    cnt_moves = ai.make_ai_move(edge)
+    value = ai.search_child(depth - 1, alpha, beta, player)
+    ai.take_back_moves(cnt_moves)
+    if ai.is_search_aborted():
+        return value, False, ai.stats, []
+    principal_variation = ai.get_principal_variation(ai.gb.edge_to_move(edge, player), depth)
+    edges = [ai.gb.get_edge(m.x, m.y, m.horizontal) for m in principal_variation[1:]]
+    return value, True, ai.stats, edges
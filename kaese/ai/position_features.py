@@ -0,0 +1,215 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+
+from kaese.ai import line_masks
+from kaese.ai.cluster_analysis import Cluster, ClusterCache, get_clusters
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+# Key of a position: size_x, size_y and GameBoard.line_hash
+PositionKey = Tuple[int, int, int]
+
+
+class PositionFeatures:
+    """
+    Features of one position for the heuristic AIs (SimpleAI, NormalAI, BetterAI, ClusterAI), computed on first use.
+
+    The features only depend on the drawn lines, so one object serves all AIs and both players as long as the
+    position does not change, see get_position_features(). The lists of lines are in the order of the edge numbers
+    (the order of the loops of the AIs), so random.choice() picks the same line as the loops.
+
+    Attributes:
+        gb (GameBoard): The gameboard the features are computed from, it must not change while they are used.
+        key (PositionKey): The position.
+        safe_lines (Optional[Sequence[int]]): Free lines that do not give a box to the opponent.
+        right_angle_lines (Optional[Sequence[int]]): Safe lines at a right angle to a drawn line, once per drawn
+            line (the "better moves" of BetterAI).
+        close_lines (Optional[Sequence[int]]): Safe lines next to a drawn line or the border (the "better moves" of
+            NormalAI).
+        single_box_sacrifices (Optional[Sequence[int]]): Lines that give exactly one box to the opponent.
+        clusters (Optional[List[Cluster]]): The chains and loops of the boxes with two lines around them.
+    """
+    gb: GameBoard
+    key: PositionKey
+    safe_lines: Optional[Sequence[int]]
+    right_angle_lines: Optional[Sequence[int]]
+    close_lines: Optional[Sequence[int]]
+    single_box_sacrifices: Optional[Sequence[int]]
+    clusters: Optional[List[Cluster]]
+
+    def __init__(self, gb: GameBoard) -> None:
+        self.gb = gb
+        self.key = get_position_key(gb)
+        self.safe_lines = None
+        self.right_angle_lines = None
+        self.close_lines = None
+        self.single_box_sacrifices = None
+        self.clusters = None
+
+    @property
+    def side_counts(self) -> List[List[int]]:
+        """
+        :return: The number of lines and borders around every box, the matrix that the gameboard keeps up to date.
+        :rtype: List[List[int]]
+        """
+        return self.gb.surroundings
+
+    @property
+    def free_lines(self) -> List[int]:
+        """
+        :return: The edge numbers of the free lines, the index that the gameboard keeps up to date.
+        :rtype: List[int]
+        """
+        return self.gb.free_lines
+
+    @property
+    def capturable_boxes(self) -> Dict[int, int]:
+        """
+        :return: The box number of every box with 3 lines around it, mapped to the edge number that captures it, the
+            index that the gameboard keeps up to date.
+        :rtype: Dict[int, int]
+        """
+        return self.gb.capturable_boxes
+
+    def get_safe_lines(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        :return: Tuple of right_angle_lines and safe_lines.
+        :rtype: Tuple[Sequence[int], Sequence[int]]
+        """
+        if self.safe_lines is None or self.right_angle_lines is None:
+            if line_masks.USE_NUMPY:
+                self.right_angle_lines, self.safe_lines = line_masks.get_better_move_edges(self.gb)
+            else:
+                # Imported here, BetterAI uses this module
+                from kaese.ai.better_ai import BetterAI
+                lists = BetterAI.get_better_moves_lists(self.gb, 0, self.gb.surroundings)
+                self.right_angle_lines = self.get_edges(lists["better_moves"])
+                self.safe_lines = self.get_edges(lists["good_moves"])
+        return self.right_angle_lines, self.safe_lines
+
+    def get_close_lines(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        :return: Tuple of close_lines and safe_lines.
+        :rtype: Tuple[Sequence[int], Sequence[int]]
+        """
+        if self.close_lines is None or self.safe_lines is None:
+            if line_masks.USE_NUMPY:
+                self.close_lines, self.safe_lines = line_masks.get_close_to_other_lines_edges(self.gb)
+            else:
+                from kaese.ai.normal_ai import NormalAI
+                close_moves, safe_moves = NormalAI.get_close_to_other_lines_lists(self.gb, 0)
+                self.close_lines = self.get_edges(close_moves)
+                self.safe_lines = self.get_edges(safe_moves)
+        return self.close_lines, self.safe_lines
+
+    def get_single_box_sacrifices(self) -> Sequence[int]:
+        """
+        :return: The single_box_sacrifices.
+        :rtype: Sequence[int]
+        """
+        if self.single_box_sacrifices is None:
+            if line_masks.USE_NUMPY:
+                self.single_box_sacrifices = line_masks.get_single_box_sacrifice_edges(self.gb)
+            else:
+                from kaese.ai.better_ai import BetterAI
+                moves = BetterAI.get_single_box_sacrifice_moves(self.gb, 0, self.gb.surroundings)
+                self.single_box_sacrifices = self.get_edges(moves)
+        return self.single_box_sacrifices
+
+    def get_clusters(self, cluster_cache: Optional[ClusterCache] = None) -> List[Cluster]:
+        """
+        :param cluster_cache: The cache to update to this position, None to decompose the position from scratch.
+        :type cluster_cache: Optional[ClusterCache]
+        :return: The clusters.
+        :rtype: List[Cluster]
+        """
+        if self.clusters is None:
+            self.clusters = cluster_cache.update(self.gb) if cluster_cache is not None else get_clusters(self.gb)
+        return self.clusters
+
+    def get_edges(self, moves: List[Move]) -> List[int]:
+        """
+        :param moves: Moves of the loops of the AIs.
+        :type moves: List[Move]
+        :return: The edge numbers of the moves.
+        :rtype: List[int]
+        """
+        get_edge = self.gb.get_edge
+        return [get_edge(move.x, move.y, move.horizontal) for move in moves]
+
+
+def get_position_key(gb: GameBoard) -> PositionKey:
+    """
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: The key of the position on the gameboard.
+    :rtype: PositionKey
+    """
+    return gb.size_x, gb.size_y, gb.line_hash
+
+
+# The features of the last positions, by key. The AIs run in the GUI thread and in the TreeAI thread, so the cache is
+# only changed with features_cache_lock held.
+features_cache: "OrderedDict[PositionKey, PositionFeatures]" = OrderedDict()
+features_cache_size: int = 16
+features_cache_lock = threading.Lock()
+
+
+def get_position_features(gb: GameBoard, features: Optional[PositionFeatures] = None) -> PositionFeatures:
+    """
+    Get the features of the position on the gameboard, the same object for all calls until the position changes.
+
+    The features of the last features_cache_size positions are kept, e.g. for the other player or the next move
+    after a move has been taken back.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :param features: The features passed down by the calling AI, they are used (and kept as the features of the
+        last position) if they belong to the position.
+    :type features: Optional[PositionFeatures]
+    :return: The features.
+    :rtype: PositionFeatures
+    """
+    key = get_position_key(gb)
+    with features_cache_lock:
+        if features is None or features.key != key:
+            features = features_cache.get(key)
+            if features is None:
+                features = PositionFeatures(gb)
+            else:
+                # Another gameboard with the same lines computes the missing features
+                features.gb = gb
+        features_cache[key] = features
+        features_cache.move_to_end(key)
+        if len(features_cache) > features_cache_size:
+            features_cache.popitem(last=False)
+    return features
+
+
+def get_position_features_batch(boards: List[GameBoard]) -> List[PositionFeatures]:
+    """
+    Get the features of many positions, e.g. for AI.get_next_moves().
+
+    With NumPy, the safe lines of all boards of the same size are computed together, see
+    line_masks.get_better_move_edges_batch(). Boards with a box that can be captured are skipped, the AIs capture it
+    without looking at the safe lines. As the batch can be larger than features_cache_size, pass the features to
+    get_position_features() again before they are used.
+
+    :param boards: The gameboards.
+    :type boards: List[GameBoard]
+    :return: The features of every gameboard.
+    :rtype: List[PositionFeatures]
+    """
+    batch = [get_position_features(gb) for gb in boards]
+    if line_masks.USE_NUMPY:
+        sizes: Dict[Tuple[int, int], List[PositionFeatures]] = {}
+        for features in batch:
+            if features.safe_lines is None or features.right_angle_lines is None:
+                if not features.capturable_boxes:
+                    sizes.setdefault(features.key[:2], []).append(features)
+        for same_size in sizes.values():
+            edges = line_masks.get_better_move_edges_batch([features.gb for features in same_size])
+            for features, (right_angle_lines, safe_lines) in zip(same_size, edges):
+                features.right_angle_lines, features.safe_lines = right_angle_lines, safe_lines
+    return batch
@@ -1,5 +1,5 @@
-from typing import List
 import random
+from typing import List
 from kaese.ai.ai import AI
 from kaese.ai.ai_exception import AIException
 from kaese.gameboard.move import Move
@@ -34,11 +34,37 @@ class RandomAI(AI):
 
         return RandomAI.get_random_valid_move(gb, player, player_ai)
 
+    def get_next_moves(self, game_boards: List[GameBoard]) -> List[Move]:
+        """
+        Calculates and returns the next move on many game boards, each for the player to move on the board.
+
+        The moves are the same as those of get_next_move() for the boards in the same order.
+
+        Args:
+            game_boards (List[GameBoard]): The game board objects.
+
+        Returns:
+            List[Move]: The next move on every game board.
+
+        Raises:
+            Exception: If no more valid moves are found on one of the game boards.
+        """
+        player_ai = self.__class__.__name__
+        choice = random.choice
+        moves = []
+        for gb in game_boards:
+            if not gb.free_lines:
+                raise AIException("No more valid moves found. The game seems to be already ended.")
+            moves.append(gb.edge_to_move(choice(gb.free_lines), gb.current_player, player_ai))
+        return moves
+
     @staticmethod
     def get_random_valid_move(gb: GameBoard, player: int, player_ai: str = "") -> Move:
         """
         Returns a random valid move from the available moves on the game board.
 
+        The move is sampled from the index of free lines of the game board in O(1), the board is not scanned.
+
         Args:
             gb (GameBoard): The game board object.
             player (int): The AI player's identifier.
@@ -50,18 +76,7 @@ class RandomAI(AI):
         Raises:
             Exception: If no more valid moves are found on the game board.
         """
-        gb_size_x = gb.size_x
-        gb_size_y = gb.size_y
-        valid_moves: List[Move] = []
-
-        for x, row in enumerate(gb.boxes):
-            for y, box in enumerate(row):
-                if box.line_right == 0 and x + 1 < gb_size_x:
-                    valid_moves.append(Move(x, y, 0, player, player_ai))
-                if box.line_below == 0 and y + 1 < gb_size_y:
-                    valid_moves.append(Move(x, y, 1, player, player_ai))
-
-        if not valid_moves:
+        if not gb.free_lines:
             raise AIException("No more valid moves found. The game seems to be already ended.")
 
-        return random.choice(valid_moves)
+        return gb.edge_to_move(random.choice(gb.free_lines), player, player_ai)
@@ -0,0 +1,100 @@
+import copy
+import time
+from typing import List, Optional
+
+from kaese.gameboard.move import Move
+
+
+class SearchStats:
+    """
+    Progress and statistics of one TreeAI search (one get_next_move() call).
+
+    The search thread updates its own SearchStats object and publishes a copy of it from time to time (see
+    TreeAI.publish_stats()). A published copy is never changed again, so other threads (e.g. the GUI) can read
+    TreeAI.published_stats without a lock: replacing the attribute is atomic.
+
+    Attributes:
+        start_time (float): time.monotonic() value at the start of the search.
+        elapsed (float): Seconds since the start of the search, at the time of the publication.
+        nodes (int): Number of searched positions, including the positions searched by worker processes.
+        depth (int): Depth of the running iteration of the iterative deepening.
+        completed_depth (int): Depth of the deepest completed iteration.
+        cnt_move_nr (int): Number of root moves that have been searched in the running iteration.
+        cnt_valid_moves (int): Number of root moves of the running iteration.
+        tt_hits (int): Number of positions that were found in the transposition table.
+        tt_cutoffs (int): Number of positions whose search was ended by the value stored in the transposition table.
+        beta_cutoffs (int): Number of positions whose search was ended by a move with a value of at least beta.
+        principal_variation (List[Move]): Expected moves of the deepest completed iteration, best move first.
+        principal_variation_value (Optional[int]): Value of the principal variation for the player to move.
+        finished (bool): True if the search has ended.
+    """
+    start_time: float
+    elapsed: float
+    nodes: int
+    depth: int
+    completed_depth: int
+    cnt_move_nr: int
+    cnt_valid_moves: int
+    tt_hits: int
+    tt_cutoffs: int
+    beta_cutoffs: int
+    principal_variation: List[Move]
+    principal_variation_value: Optional[int]
+    finished: bool
+
+    def __init__(self) -> None:
+        self.start_time = time.monotonic()
+        self.elapsed = 0.0
+        self.nodes = 0
+        self.depth = 0
+        self.completed_depth = 0
+        self.cnt_move_nr = 0
+        self.cnt_valid_moves = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.principal_variation = []
+        self.principal_variation_value = None
+        self.finished = False
+
+    @property
+    def nodes_per_second(self) -> float:
+        """
+        Returns:
+            float: The number of searched positions per second, 0 right after the start.
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_counters(self, other: "SearchStats") -> None:
+        """
+        Add the counters of another search, e.g. of the search of a root move in a worker process.
+
+        Args:
+            other (SearchStats): The statistics of the other search.
+
+        Returns:
+            None
+        """
+        self.nodes += other.nodes
+        self.tt_hits += other.tt_hits
+        self.tt_cutoffs += other.tt_cutoffs
+        self.beta_cutoffs += other.beta_cutoffs
+
+    def snapshot(self) -> "SearchStats":
+        """
+        Get a copy with the current elapsed time, which is not changed by the running search.
+
+        Returns:
+            SearchStats: The copy.
+        """
+        self.elapsed = time.monotonic() - self.start_time
+        stats = copy.copy(self)
+        stats.principal_variation = list(self.principal_variation)
+        return stats
+
+    def __str__(self) -> str:
+        return ("depth %d/%d, move %d/%d, %d nodes in %.2f s (%d nodes/s), tt hits %d, tt cutoffs %d, "
+                "beta cutoffs %d, pv value %s"
+                % (self.completed_depth, self.depth, self.cnt_move_nr, self.cnt_valid_moves, self.nodes,
+                   self.elapsed, self.nodes_per_second, self.tt_hits, self.tt_cutoffs, self.beta_cutoffs,
+                   self.principal_variation_value))
@@ -45,6 +45,8 @@ class SimpleAI(AI):
         """
         Searches for fields that can be captured immediately and returns the first found move.
 
+        Uses the index of capturable boxes of the game board, so this is O(1) instead of a scan of the whole board.
+
         Args:
             gb (GameBoard): The game board object.
             player (int): The AI player's identifier.
@@ -53,14 +55,10 @@ class SimpleAI(AI):
         Returns:
             Optional[Move]: The move to capture a field, or None if no fields can be captured.
         """
-        for x in range(0, gb.size_x):
-            for y in range(0, gb.size_y):
-                move = SimpleAI.check_surroundings(gb, player, x, y, player_ai)
-                if move:
-                    logging.info("%s: Capture field" % player_ai)
-                    return move
-
-        return None
+        move = gb.get_capture_move(player, player_ai)
+        if move:
+            logging.info("%s: Capture field" % player_ai)
+        return move
 
     @staticmethod
     def check_surroundings(gb: GameBoard, player: int, x: int, y: int, player_ai: str = "") -> Optional[Move]:
@@ -77,7 +75,7 @@ class SimpleAI(AI):
         Returns:
             Optional[Move]: The move to capture the field, or None if the field cannot be captured.
         """
-        if gb.boxes[x][y].owner > 0:
+        if gb.get_owner(x, y) > 0:
             return None
 
         right = 0
@@ -88,7 +86,7 @@ class SimpleAI(AI):
 
         # Check right side
         if x + 1 < gb.size_x:
-            if gb.boxes[x][y].line_right > 0:
+            if gb.get_line(x, y, 0) > 0:
                 surrounding_lines += 1
                 right = 1
         else:
@@ -97,7 +95,7 @@ class SimpleAI(AI):
 
         # Check bottom side
         if y + 1 < gb.size_y:
-            if gb.boxes[x][y].line_below > 0:
+            if gb.get_line(x, y, 1) > 0:
                 surrounding_lines += 1
                 bottom = 1
         else:
@@ -106,7 +104,7 @@ class SimpleAI(AI):
 
         # Check left side (right side of the box to the left)
         if x > 0:
-            if gb.boxes[x - 1][y].line_right > 0:
+            if gb.get_line(x - 1, y, 0) > 0:
                 surrounding_lines += 1
                 left = 1
         else:
@@ -115,7 +113,7 @@ class SimpleAI(AI):
 
         # Check top side (bottom side of the box above)
         if y > 0:
-            if gb.boxes[x][y - 1].line_below > 0:
+            if gb.get_line(x, y - 1, 1) > 0:
                 surrounding_lines += 1
                 top = 1
         else:
@@ -48,11 +48,8 @@ class StupidAI(AI):
         Raises:
             Exception: If no more valid moves are found on the game board.
         """
-        for x, row in enumerate(gb.boxes):
-            for y, box in enumerate(row):
-                if box.line_right == 0 and x + 1 < gb.size_x:
-                    return Move(x, y, 0, player, player_ai)
-                if box.line_below == 0 and y + 1 < gb.size_y:
-                    return Move(x, y, 1, player, player_ai)
-
-        raise AIException("No more valid moves found; the game seems to be already ended.")
+        if not gb.free_lines:
+            raise AIException("No more valid moves found; the game seems to be already ended.")
+
+        # The lowest edge number is the first free line scanning boxes[x][y] for line_right and line_below
+        return gb.edge_to_move(min(gb.free_lines), player, player_ai)
@@ -0,0 +1,116 @@
+from typing import List, Optional, Tuple
+
+# Bound types of the stored values
+EXACT: int = 0
+LOWER_BOUND: int = 1  # The real value is at least the stored value (the search failed high)
+UPPER_BOUND: int = 2  # The real value is at most the stored value (the search failed low)
+
+
+class TranspositionTable:
+    """
+    Bounded transposition table for the alpha-beta search of TreeAI.
+
+    Entries are stored in a fixed number of slots, the slot is chosen by the position hash (see
+    GameBoard.zobrist_hash). A position is identified by its hash and the score of player 1, the score is needed
+    because the zobrist hash only covers the lines and the player to move.
+
+    Replacement policy: depth-preferred with aging. An entry of the current search is only replaced by an entry of
+    the same position or of an equal or deeper search, entries of older searches (see new_search()) are always
+    replaced.
+
+    Every entry is a tuple (position_hash, score, depth, value, bound, best_edge, age).
+
+    Attributes:
+        size (int): Number of slots.
+        slots (List[Optional[Tuple[int, int, int, int, int, int, int]]]): The entries, None for empty slots.
+        age (int): Number of the current search.
+        probes (int): Number of calls of probe().
+        hits (int): Number of calls of probe() that found an entry.
+        stores (int): Number of entries stored.
+    """
+    # Estimated memory of one filled slot in bytes (list pointer, tuple with 7 items and its int objects)
+    entry_size: int = 160
+
+    size: int
+    slots: List[Optional[Tuple[int, int, int, int, int, int, int]]]
+    age: int
+    probes: int
+    hits: int
+    stores: int
+
+    def __init__(self, max_memory_mb: float = 64) -> None:
+        """
+        Create an empty transposition table.
+
+        :param max_memory_mb: Memory cap for the table in megabytes, determines the number of slots.
+        :type max_memory_mb: float
+        """
+        self.size = max(1, int(max_memory_mb * 1024 * 1024) // self.entry_size)
+        self.slots = [None] * self.size
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+
+        :return: None
+        """
+        self.slots = [None] * self.size
+        self.age = 0
+
+    def new_search(self) -> None:
+        """
+        Start a new search: All existing entries become replaceable, but can still be found by probe().
+
+        :return: None
+        """
+        self.age += 1
+
+    def probe(self, position_hash: int, score: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Look up a position.
+
+        :param position_hash: The zobrist hash of the position.
+        :type position_hash: int
+        :param score: The score of player 1 (win_counter[1]) in the position.
+        :type score: int
+        :return: Tuple (depth, value, bound, best_edge) or None if the position is not stored. best_edge is -1 if no
+            best move is known.
+        :rtype: Optional[Tuple[int, int, int, int]]
+        """
+        self.probes += 1
+        entry = self.slots[position_hash % self.size]
+        if entry is None or entry[0] != position_hash or entry[1] != score:
+            return None
+        self.hits += 1
+        return entry[2], entry[3], entry[4], entry[5]
+
+    def store(self, position_hash: int, score: int, depth: int, value: int, bound: int, best_edge: int = -1) -> None:
+        """
+        Store the result of a search of a position, if the replacement policy allows it.
+
+        :param position_hash: The zobrist hash of the position.
+        :type position_hash: int
+        :param score: The score of player 1 (win_counter[1]) in the position.
+        :type score: int
+        :param depth: The remaining search depth of the result.
+        :type depth: int
+        :param value: The value found by the search.
+        :type value: int
+        :param bound: EXACT, LOWER_BOUND or UPPER_BOUND.
+        :type bound: int
+        :param best_edge: The edge number of the best move found, -1 if none.
+        :type best_edge: int
+        :return: None
+        """
+        index = position_hash % self.size
+        entry = self.slots[index]
+        if (entry is not None and entry[6] == self.age and depth < entry[2]
+                and (entry[0] != position_hash or entry[1] != score)):
+            # Keep the deeper entry of another position from the current search
+            return
+        self.slots[index] = (position_hash, score, depth, value, bound, best_edge, self.age)
+        self.stores += 1
@@ -1,39 +1,119 @@
 import logging
 import random
-from typing import Optional, List, Union
-import copy
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional, List, Tuple, Union
 from kaese.ai.ai import AI
 from kaese.ai.ai_exception import AIException
 from kaese.ai.cluster_ai import ClusterAI
+from kaese.ai.endgame_solver import EndgameSolver
+from kaese.ai.move_ordering import MoveOrdering
+from kaese.ai.parallel_search import get_process_pool, search_root_move
+from kaese.ai.search_stats import SearchStats
+from kaese.ai.transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
 from kaese.gameboard.move import Move
 from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.symmetry import get_line_mask, get_symmetry_table
 
 
 class TreeAI(AI):
     """
-    TreeAI class represents an AI player that implements an Alpha Beta Search.
+    TreeAI class represents an AI player that implements an Alpha Beta Search (negamax with principal variation
+    search and aspiration windows).
 
-    It inherits from the AI class.
+    It inherits from the AI class. Searched positions are stored in a transposition table, which is kept between
+    the moves of one TreeAI instance.
+
+    The progress of a running search is published as SearchStats object (published_stats, stats_callback), e.g. for
+    the GUI or to tune the time budget.
     """
 
     killed: bool = False
     max_moves: int
 
-    cnt_valid_moves: Optional[int]
-    cnt_move_nr: Optional[int]
     very_large_numer: int = 1000000000
 
-    gb: GameBoard
+    gb: GameBoard  # clone of the gameboard of get_next_move(), see GameBoard.clone_for_search()
     original_player: int
-    cnt_deepcopys: int = 0
 
+    stats: SearchStats  # statistics of the running search, only changed by the thread that searches
+    published_stats: SearchStats  # copy of stats that is not changed anymore, see publish_stats()
+    stats_callback: Optional[Callable[[SearchStats], None]]  # called with every published copy of stats
+    stats_interval: float = 0.25  # seconds between two publications during the search
+    next_publish_time: float  # time.monotonic() value of the next publication
+
+    transposition_table: TranspositionTable
+    transposition_table_player: int  # The values in the transposition table depend on the original player
+
+    move_ordering: MoveOrdering
+    endgame_solver: EndgameSolver
+    cluster_ai: ClusterAI  # plays the moves with more than max_moves moves left, kept for its cluster cache
+
+    time_budget: Optional[float]  # seconds per move, None: search with the depth chosen from the number of moves
+    deadline: Optional[float]  # time.monotonic() value at which the running search stops
+    timed_out: bool
+    completed_depth: int  # depth of the deepest completed iteration of the running search
+
+    aspiration_window: int = 2  # half width of the search window around the value of the previous iteration
+    principal_variation: List[Move]  # expected moves of the deepest completed iteration, starting with the best move
+    principal_variation_value: Optional[int]  # value of the principal variation for the original player
 
-    def __init__(self, verbose: Union[bool, int] = False, max_moves: int = 42):
+    workers: int  # number of processes for the root search, 0 or 1: search in this process only
+    transposition_table_mb: float
+    stop_event: Any  # set by another process to stop the running search, see parallel_search.py
+    search_id: int  # identifies the running search in the worker processes
+    worker_principal_variations: Dict[int, List[int]]  # root edge: continuation found by a worker process
+
+    def __init__(
+            self,
+            verbose: Union[bool, int] = False,
+            max_moves: int = 56,
+            transposition_table_mb: float = 32,
+            time_budget: Optional[float] = None,
+            move_ordering: Optional[MoveOrdering] = None,
+            endgame_solver: Optional[EndgameSolver] = None,
+            workers: int = 0,
+            stats_callback: Optional[Callable[[SearchStats], None]] = None
+    ):
+        """
+        Args:
+            verbose (Union[bool, int]): Verbosity level.
+            max_moves (int): Use ClusterAI if more than max_moves moves are left and the endgame solver can not be
+                used.
+            transposition_table_mb (float): Memory cap of the transposition table in megabytes.
+            time_budget (Optional[float]): Time budget per move in seconds. If None, the search depth is chosen from
+                the number of valid moves and the search runs until it is completed.
+            move_ordering (Optional[MoveOrdering]): Move ordering heuristics for the search, default MoveOrdering().
+            endgame_solver (Optional[EndgameSolver]): Solver for loony endgames, default EndgameSolver().
+            workers (int): Number of worker processes that search the root moves in parallel, 0 or 1 to search in
+                this process only.
+            stats_callback (Optional[Callable[[SearchStats], None]]): Called by the searching thread with the
+                statistics of the running search every stats_interval seconds, after every completed iteration and
+                at the end of the search.
+        """
         super().__init__(verbose)
         self.max_moves = max_moves
+        self.time_budget = time_budget
+        self.deadline = None
+        self.timed_out = False
+        self.completed_depth = 0
+        self.principal_variation = []
+        self.principal_variation_value = None
+        self.transposition_table_mb = transposition_table_mb
+        self.transposition_table = TranspositionTable(transposition_table_mb)
+        self.transposition_table_player = 0
+        self.move_ordering = move_ordering if move_ordering is not None else MoveOrdering()
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+        self.cluster_ai = ClusterAI(verbose)
+        self.workers = workers
+        self.stop_event = None
+        self.search_id = 0
+        self.worker_principal_variations = {}
+        self.stats = SearchStats()
+        self.published_stats = self.stats.snapshot()
+        self.stats_callback = stats_callback
+        self.next_publish_time = 0.0
         self.killed = False
-        self.cnt_valid_moves = None
-        self.cnt_move_nr = None
         self.very_large_numer = 1000000000
 
     def get_next_move(self, gb: GameBoard, player: int) -> Move:
@@ -48,16 +128,38 @@ class TreeAI(AI):
             Optional[Move]: The next valid move found on the game board, or None if no moves are available.
         """
 
-        self.cnt_deepcopys = 1
-        self.gb = copy.deepcopy(gb)
+        # A search of this instance may have been killed before, kill_tree_ai() only stops the running search
+        self.killed = False
+        self.stats = SearchStats()
+        self.publish_stats()
+        self.deadline = None
+        self.timed_out = False
+        self.completed_depth = 0
+        self.principal_variation = []
+        self.principal_variation_value = None
+        self.search_id = time.monotonic_ns()
+        self.gb = gb.clone_for_search()
         self.original_player = self.gb.current_player
 
         if self.original_player != player:
             raise AIException("TreeAI: Wrong Player, can not handle this ...")
 
+        if self.transposition_table_player != player:
+            self.transposition_table.clear()
+            self.transposition_table_player = player
+        self.transposition_table.new_search()
+        self.move_ordering.new_search()
+
+        # In the loony endgame the solver knows the best move, including when to give boxes back to keep control
+        edge = self.endgame_solver.get_best_edge(self.gb)
+        if edge is not None:
+            self.tree_ai_debug("get_next_move: Using the move of the EndgameSolver (value %d, %d positions solved)"
+                               % (self.endgame_solver.value, self.endgame_solver.nodes))
+            return self.finish_search(self.gb.edge_to_move(edge, player, self.gb.player_ai[player]))
+
         m = self.get_capture_field_move()
         if m:
-            return m
+            return self.finish_search(m)
 
         # all_moves = (self.gb.size_x * self.gb.size_y * 2) - self.gb.size_x - self.gb.size_y
         # max_moves = (all_moves // 2) + (all_moves // 5)
@@ -66,12 +168,66 @@ class TreeAI(AI):
         if self.gb.remaining_moves > max_moves:
             self.tree_ai_debug("get_next_move: Too many valid_moves (%d>%d), using ClusterAi!"
                                % (self.gb.remaining_moves, max_moves))
-            ki = ClusterAI()
-            m = ki.get_next_move(self.gb, player)
+            # cluster_ai keeps the clusters of the original gameboard in its cache, see notify_move()
+            m = self.cluster_ai.get_next_move(gb, player)
             m.player_ai = self.gb.player_ai[player]
-            return m
+            return self.finish_search(m)
+
+        return self.finish_search(self.find_best_move())
+
+    def notify_move(self, gb: GameBoard, move: Move) -> None:
+        """
+        Keep the cluster cache of cluster_ai up to date, the transposition table needs no update.
+
+        Args:
+            gb (GameBoard): The game board object, after the move.
+            move (Move): The move.
+
+        Returns:
+            None
+        """
+        self.cluster_ai.notify_move(gb, move)
+
+    def notify_take_back(self, gb: GameBoard, move: Move) -> None:
+        """
+        Keep the cluster cache of cluster_ai up to date, see notify_move().
+
+        Args:
+            gb (GameBoard): The game board object, after the move has been taken back.
+            move (Move): The move.
 
-        return self.find_best_move()
+        Returns:
+            None
+        """
+        self.cluster_ai.notify_take_back(gb, move)
+
+    def publish_stats(self) -> None:
+        """
+        Publish a copy of the statistics of the running search as published_stats and with stats_callback.
+
+        Returns:
+            None
+        """
+        stats = self.stats.snapshot()
+        self.published_stats = stats
+        self.next_publish_time = time.monotonic() + self.stats_interval
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def finish_search(self, move: Move) -> Move:
+        """
+        Publish the final statistics of the search.
+
+        Args:
+            move (Move): The move found by the search.
+
+        Returns:
+            Move: The same move.
+        """
+        self.stats.finished = True
+        self.publish_stats()
+        self.debug("Search statistics: %s" % self.published_stats, 1)
+        return move
 
     def tree_ai_debug(
             self,
@@ -85,8 +241,8 @@ class TreeAI(AI):
             move: Optional[Move] = None,
             best_move: Optional[Move] = None
     ) -> None:
-        msg = ("tree_ai_debug --- %s --- [dc %d, remaining_moves %d, curPlayer %d, origPlayer %d"
-               % (msg, self.cnt_deepcopys, self.gb.remaining_moves, self.gb.current_player, self.original_player))
+        msg = ("tree_ai_debug --- %s --- [nodes %d, remaining_moves %d, curPlayer %d, origPlayer %d"
+               % (msg, self.stats.nodes, self.gb.remaining_moves, self.gb.current_player, self.original_player))
         if not depth is None:
             spacer = "  " * depth
             msg = "%s%s, depth %d" % (spacer, msg, depth)
@@ -122,13 +278,7 @@ class TreeAI(AI):
 
         player = self.gb.current_player
         player_ai = self.gb.player_ai[player]
-        valid_moves = []
-        for x, column in enumerate(self.gb.boxes):
-            for y, box in enumerate(column):
-                if box.line_right == 0 and x + 1 < self.gb.size_x:
-                    valid_moves.append(Move(x, y, 0, player, player_ai))
-                if box.line_below == 0 and y + 1 < self.gb.size_y:
-                    valid_moves.append(Move(x, y, 1, player, player_ai))
+        valid_moves = self.gb.get_valid_moves(player, player_ai)
         if self.verbose:
             count = len(valid_moves)
             self.tree_ai_debug("get_valid_moves_tree_ai: Found %d valid moves" % count, 3, valid_moves=count)
@@ -136,91 +286,33 @@ class TreeAI(AI):
                 self.tree_ai_debug("    - move", 3, move=m)
         return valid_moves
 
-    def check_outlines_tree_ai(self, x: int, y: int) -> Optional[Move]:
-        """
-        Count number of lines that already surround the field on position x, y on the gameboard. If exactly 3 lines
-        surround the given box, return the Move object, that represents the move, that is needed to capture this box.
-        Else, return None.
-
-        :param x:
-        :param y:
-        :return:
+    def is_search_aborted(self) -> bool:
         """
+        Check if the running search has to stop, because kill_tree_ai() was called, the deadline has been reached or
+        the stop_event has been set.
 
-        # We are not interested in already owned fields
-        current_box = self.gb.boxes[x][y]
-        if current_box.owner > 0:
-            return None
-
-        player = self.gb.current_player
-        player_ai = self.gb.player_ai[player]
-
-        right = 0
-        below = 0
-        left = 0
-        above = 0
+        The clock and the stop_event are only read every 1024 nodes, the statistics are published then if
+        stats_interval has passed.
 
-        # count how many lines are checked around this field
-        count_surroundings = 0
-
-        # Check line or border on the right of our box
-        if x + 1 < self.gb.size_x:
-            if current_box.line_right > 0:
-                count_surroundings += 1
-                right = 1
-        else:
-            # Right border of the gameboard
-            count_surroundings += 1
-            right = 1
-
-        # Check line or border below our box
-        if y + 1 < self.gb.size_y:
-            if current_box.line_below > 0:
-                count_surroundings += 1
-                below = 1
-        else:
-            # Border below our gameboard
-            count_surroundings += 1
-            below = 1
-
-        # Check line or border to the left of our box (The right line of the box left of our current box)
-        if x > 0:
-            if self.gb.boxes[x - 1][y].line_right > 0:
-                count_surroundings += 1
-                left = 1
-        else:
-            # Left border of gameboard
-            count_surroundings += 1
-            left = 1
-
-        # Check line or border above our box (The line below the box above our current box)
-        if y > 0:
-            if self.gb.boxes[x][y - 1].line_below > 0:
-                count_surroundings += 1
-                above = 1
-        else:
-            # Upper border of gameboard
-            count_surroundings += 1
-            above = 1
-
-        # If exactly 3 lines surround the box right now, return the Move object that represents the move,
-        # that is needed to capture this box.
-        if count_surroundings == 3:
-            if right == 0:
-                return Move(x, y, 0, player, player_ai)
-            if below == 0:
-                return Move(x, y, 1, player, player_ai)
-            if left == 0:
-                return Move(x - 1, y, 0, player, player_ai)
-            if above == 0:
-                return Move(x, y - 1, 1, player, player_ai)
-
-        # Else, return None
-        return None
+        :return: True if the search has to stop.
+        """
+        if self.killed or self.timed_out:
+            return True
+        if (self.stats.nodes & 1023) == 0:
+            now = time.monotonic()
+            if self.deadline is not None and now >= self.deadline:
+                self.timed_out = True
+                return True
+            if self.stop_event is not None and self.stop_event.is_set():
+                self.killed = True
+                return True
+            if now >= self.next_publish_time:
+                self.publish_stats()
+        return False
 
     def take_back_moves(self, count: int = 1) -> None:
         """
-        Take back 'count' moves and truncates the history.
+        Take back 'count' moves that were made with make_ai_move().
 
         :param count: How may moves should be taken bake
         :return:
@@ -232,19 +324,15 @@ class TreeAI(AI):
             print(msg)
 
         for _ in range(count):
-            self.gb.take_back_one_move()
-        self.gb.truncate_history()
+            self.gb.undo()
 
     def get_capture_field_move(self) -> Optional[Move]:
         """ Search for fields that can be captured right now and if found return the first one found. """
-        size_x = self.gb.size_x
-        size_y = self.gb.size_y
-        for x in range(0, size_x):
-            for y in range(0, size_y):
-                m = self.check_outlines_tree_ai(x, y)
-                if m:
-                    self.tree_ai_debug("get_capture_field_move: capture field", 3, move=m)
-                    return m
+        player = self.gb.current_player
+        m = self.gb.get_capture_move(player, self.gb.player_ai[player])
+        if m:
+            self.tree_ai_debug("get_capture_field_move: capture field", 3, move=m)
+            return m
         self.tree_ai_debug("get_capture_field_move: No (more) capture fields found", 3, move=m)
         return None
 
@@ -289,7 +377,7 @@ class TreeAI(AI):
         else:
             return 1
 
-    def make_ai_move(self, move: Move) -> int:
+    def make_ai_move(self, edge: int) -> int:
         """ A "AI move" can consist of multiple "move" objects on the game board. A "AI move" ends when no further
         squares can be closed.
 
@@ -307,40 +395,72 @@ class TreeAI(AI):
 
           Maybe we could even use some parts of the logic from the ClusterAI to reduce the amount of "valid" moves that
           are tested by the AlphaBeta Search Tree.
+
+        The moves are made with GameBoard.apply(), so they must be taken back with take_back_moves().
+
+        :param edge: The edge number of the first line to draw, see GameBoard.get_edge().
+        :return: The number of moves made on the game board.
         """
-        self.gb.make_move(move, print_it=False)
+        gb = self.gb
         cnt_moves = 1
-        if self.gb.current_player == move.player and self.gb.winner == 0:
-            # It's still our turn!
-            m = self.get_capture_field_move()
-            while m and self.gb.winner == 0:
-                self.gb.make_move(m, print_it=False)
+        if gb.apply(edge) and gb.winner == 0:
+            # It's still our turn! Capture all boxes that can be captured right now.
+            capturable_boxes = gb.capturable_boxes
+            while capturable_boxes and gb.winner == 0:
+                gb.apply(next(iter(capturable_boxes.values())))
                 cnt_moves += 1
-                if self.gb.winner == 0:
-                    m = self.get_capture_field_move()
         return cnt_moves
 
-    def alpha_beta_search(self, depth: int, alpha: int, beta: int) -> int:
+    def search_child(self, depth: int, alpha: int, beta: int, player: int) -> int:
+        """
+        Search the position after an "AI move" of the given player.
+
+        After an "AI move" usually the other player is up next, but if the move ended the game, the same player can
+        be the current player again. The value of the child position is converted to the perspective of the player.
+
+        Args:
+            depth (int): The remaining search depth of the child position.
+            alpha (int): The lower bound from the perspective of the player.
+            beta (int): The upper bound from the perspective of the player.
+            player (int): The player that made the "AI move".
+
+        Returns:
+            int: The value of the child position from the perspective of the player.
+        """
+        if self.gb.current_player == player:
+            return self.negamax_search(depth, alpha, beta)
+        return -self.negamax_search(depth, -beta, -alpha)
+
+    def negamax_search(self, depth: int, alpha: int, beta: int) -> int:
         """
-        Perform Alpha-Beta pruning search with evaluation and depth limits.
+        Perform a negamax search with principal variation search and evaluation and depth limits.
+
+        All values are from the perspective of the current player of the position. The first move (the best move by
+        the transposition table and the move ordering) is searched with the full window, all other moves first with a
+        null window, which only proves that they are not better than the best move so far. Only if that fails, the
+        move is searched again with the full window.
 
         Args:
-            depth (int): The current depth of the search tree.
+            depth (int): The remaining depth of the search tree.
             alpha (int): The lower bound for the best achievable score.
             beta (int): The upper bound for the best achievable score.
 
         Returns:
-            int: The evaluated score of the current game state.
+            int: The evaluated score of the current game state from the perspective of the current player.
         """
 
-        if self.killed:
-            # Die if requested
-            return self.very_large_numer
+        if self.is_search_aborted():
+            # Die if requested or out of time, the value is discarded
+            return 0
 
-        evaluation = self.position_evaluation(self.gb)
+        gb = self.gb
+        player = gb.current_player
+        evaluation = self.position_evaluation(gb)
+        if player != self.original_player:
+            evaluation = -evaluation
         if abs(evaluation) > 9000:
             self.tree_ai_debug(
-                "alpha_beta_search: Return Evaluation over nine thousand!",
+                "negamax_search: Return Evaluation over nine thousand!",
                 1,
                 depth,
                 evaluation
@@ -348,68 +468,147 @@ class TreeAI(AI):
             return evaluation
         if depth == 0:
             self.tree_ai_debug(
-                "alpha_beta_search: Return Evaluation because depth is 0.",
+                "negamax_search: Return Evaluation because depth is 0.",
                 2,
                 depth,
                 evaluation
             )
             return evaluation
 
-        valid_moves = self.get_valid_moves_tree_ai()
-        cnt_valid_moves = len(valid_moves)
+        # Copy the free lines, apply() and undo() change the order of the list
+        valid_edges = gb.free_lines[:]
+        cnt_valid_moves = len(valid_edges)
         if cnt_valid_moves == 0:
-            msg = ("alpha_beta_search: This is unexpected. Return Evaluation %d when len(valid_moves) == 0. "
+            msg = ("negamax_search: This is unexpected. Return Evaluation %d when len(valid_moves) == 0. "
                    "This should not happen. If the game has ended, the value should be over 9000!") % evaluation
             logging.warning(msg)
             self.tree_ai_debug(msg, 0, depth, evaluation)
             return evaluation
 
+        self.move_ordering.order_edges(gb, valid_edges)
+
+        # Look up the position in the transposition table, the values are stored from the perspective of the
+        # current player of the position (the zobrist hash contains the player to move)
+        position_hash = gb.zobrist_hash
+        score = gb.win_counter[1]
+        alpha_original = alpha
+        entry = self.transposition_table.probe(position_hash, score)
+        if entry:
+            self.stats.tt_hits += 1
+            entry_depth, entry_value, entry_bound, entry_edge = entry
+            if entry_depth >= depth:
+                if entry_bound == EXACT:
+                    self.stats.tt_cutoffs += 1
+                    return entry_value
+                if entry_bound == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    self.stats.tt_cutoffs += 1
+                    return entry_value
+            if entry_edge >= 0:
+                # Search the best move of the last search of this position first
+                valid_edges.remove(entry_edge)
+                valid_edges.insert(0, entry_edge)
+
         if self.verbose:
-            msg = ("alpha_beta_search: Recursively call alpha_beta_search for each valid move, "
-                   "next up: Player %d (I am %d)") % (self.gb.current_player, self.original_player)
+            msg = ("negamax_search: Recursively call negamax_search for each valid move, "
+                   "next up: Player %d (I am %d)") % (player, self.original_player)
             self.tree_ai_debug(msg, 2, depth, evaluation, alpha, beta, cnt_valid_moves)
-        if self.gb.current_player == 1:
-            value = -self.very_large_numer
-            for m in valid_moves:
-                if self.verbose:
-                    self.tree_ai_debug(
-                        "alpha_beta_search:     Recursively evaluating Move  -",
-                        3,
-                        depth,
-                        evaluation,
-                        move=m
-                    )
-                self.cnt_deepcopys += 1
-                cnt_moves = self.make_ai_move(m)
-                value = max(value, self.alpha_beta_search(depth - 1, alpha, beta))
-                self.take_back_moves(cnt_moves)
-                alpha = max(alpha, value)
-                if alpha >= beta:
-                    break
-        else:
-            value = self.very_large_numer
-            for m in valid_moves:
-                if self.verbose:
-                    self.tree_ai_debug(
-                        "alpha_beta_search:     Recursively evaluating Move  -",
-                        3,
-                        depth,
-                        evaluation,
-                        move=m
-                    )
-                self.cnt_deepcopys += 1
-                cnt_moves = self.make_ai_move(m)
-                value = min(value, self.alpha_beta_search(depth - 1, alpha, beta))
-                self.take_back_moves(cnt_moves)
-                beta = min(beta, value)
-                if alpha >= beta:
-                    break
+        value = -self.very_large_numer
+        best_edge = -1
+        for edge in valid_edges:
+            if self.verbose:
+                self.tree_ai_debug(
+                    "negamax_search:     Recursively evaluating Move  -",
+                    3,
+                    depth,
+                    evaluation,
+                    move=gb.edge_to_move(edge, player)
+                )
+            self.stats.nodes += 1
+            cnt_moves = self.make_ai_move(edge)
+            if best_edge < 0:
+                child_value = self.search_child(depth - 1, alpha, beta, player)
+            else:
+                child_value = self.search_child(depth - 1, alpha, alpha + 1, player)
+                if alpha < child_value < beta:
+                    # The null window search failed high, the move is better than the best move so far
+                    child_value = self.search_child(depth - 1, alpha, beta, player)
+            self.take_back_moves(cnt_moves)
+            if child_value > value or best_edge < 0:
+                value = child_value
+                best_edge = edge
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self.stats.beta_cutoffs += 1
+                self.move_ordering.record_cutoff(gb, edge, depth)
+                break
+
+        if not self.is_search_aborted():
+            if value <= alpha_original:
+                bound = UPPER_BOUND
+            elif value >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.transposition_table.store(position_hash, score, depth, value, bound, best_edge)
 
         return value
 
+    def get_principal_variation(self, move: Move, max_length: int) -> List[Move]:
+        """
+        Collect the principal variation that starts with the given root move from the transposition table.
+
+        Only the first line of every "AI move" is part of the principal variation, the captures that follow it are
+        left out. Root moves that were searched by a worker process use the continuation found by that process.
+
+        Args:
+            move (Move): The best root move.
+            max_length (int): The maximum number of moves, usually the search depth.
+
+        Returns:
+            List[Move]: The expected "AI moves" of both players, starting with the given move.
+        """
+        gb = self.gb
+        principal_variation: List[Move] = [move]
+        edge = gb.get_edge(move.x, move.y, move.horizontal)
+        continuation = self.worker_principal_variations.get(edge)
+        cnt_moves = self.make_ai_move(edge)
+        while len(principal_variation) < max_length and gb.winner == 0:
+            if continuation is not None:
+                if len(principal_variation) > len(continuation):
+                    break
+                edge = continuation[len(principal_variation) - 1]
+            else:
+                entry = self.transposition_table.probe(gb.zobrist_hash, gb.win_counter[1])
+                if entry is None:
+                    break
+                edge = entry[3]
+            if edge < 0 or gb.free_line_positions[edge] < 0:
+                break
+            principal_variation.append(gb.edge_to_move(edge, gb.current_player, gb.player_ai[gb.current_player]))
+            cnt_moves += self.make_ai_move(edge)
+        self.take_back_moves(cnt_moves)
+        return principal_variation
+
     def find_best_move(self) -> Move:
         """
-        Find the best move using Alpha-Beta pruning.
+        Find the best move using a negamax search with iterative deepening and aspiration windows.
+
+        The root moves are searched with depth 1, 2, 3, ... and every iteration starts with the best move of the
+        previous one. Without a time budget, the search ends after the depth chosen from the number of valid moves.
+        With a time budget, it continues until the deadline, unless the game tree has been searched completely.
+
+        Every iteration after the first one is searched with a narrow window around the value of the previous
+        iteration (aspiration_window). If the value is outside the window, the iteration is repeated with the full
+        window.
+
+        If the deadline is reached or kill_tree_ai() is called during an iteration, that iteration is discarded and
+        the best move of the deepest completed iteration is returned.
+
+        With more than one worker, the root moves are searched in parallel, see search_root_parallel().
 
         Returns:
             Move: The best move to make.
@@ -418,85 +617,250 @@ class TreeAI(AI):
             AIException: If no valid moves are found.
         """
 
-        best_value: int = -self.very_large_numer
-        best_move: Optional[Move] = None
         valid_moves: List[Move] = self.get_valid_moves_tree_ai()
-        random.shuffle(valid_moves)
-
-        self.cnt_valid_moves: int = len(valid_moves)
-        self.cnt_move_nr: int = 0
-        cnt_eva_null_moves_found: int = 0
+        if not valid_moves:
+            raise AIException("No more valid moves found, game seems to be ended already.")
 
+        # The search depth depends on the number of all valid moves, the depth of the subtrees does not change if
+        # symmetric root moves are skipped
         max_depth: int = 4
-        if True and self.cnt_valid_moves < 30:
+        if True and len(valid_moves) < 30:
             max_depth += 1
-        if True and self.cnt_valid_moves < 15:
+        if True and len(valid_moves) < 15:
             max_depth += 1
+        if self.time_budget is not None:
+            # Search as deep as the time budget allows, every "AI move" draws at least one line
+            max_depth = self.gb.remaining_moves
+            self.deadline = time.monotonic() + self.time_budget
+
+        # Moves that lead to symmetric positions have the same value, test only one of them
+        symmetry_table = get_symmetry_table(self.gb.size_x, self.gb.size_y)
+        unique_edges = set(symmetry_table.get_unique_edges(get_line_mask(self.gb), self.gb.free_lines))
+        valid_moves = [m for m in valid_moves if self.gb.get_edge(m.x, m.y, m.horizontal) in unique_edges]
+        random.shuffle(valid_moves)
+        # Safe moves first, then sacrifices (the sort is stable, so the order within a class stays random)
+        valid_moves.sort(
+            key=lambda m: self.move_ordering.get_move_class(self.gb, self.gb.get_edge(m.x, m.y, m.horizontal)),
+            reverse=True
+        )
+
+        best_move: Move = valid_moves[0]
+        value: Optional[int] = None
+        for depth in range(1, max_depth + 1):
+            self.stats.depth = depth
+            if value is None or abs(value) > 9000:
+                alpha, beta = -self.very_large_numer, self.very_large_numer
+            else:
+                alpha, beta = value - self.aspiration_window, value + self.aspiration_window
+            move, value, completed = self.search_root_parallel(valid_moves, depth, alpha, beta)
+            if completed and not alpha < value < beta and beta < self.very_large_numer:
+                self.tree_ai_debug("find_best_move: Value %d outside of the aspiration window, search again."
+                                   % value, 0, depth, value, alpha, beta)
+                move, value, completed = self.search_root_parallel(valid_moves, depth, -self.very_large_numer,
+                                                                   self.very_large_numer)
+            if not completed:
+                if self.completed_depth == 0 and move:
+                    # Not even the first iteration has been completed, use the best move that was fully searched
+                    best_move = move
+                self.tree_ai_debug("find_best_move: Iteration with depth %d aborted." % depth, 0, depth)
+                break
+            best_move = move
+            self.completed_depth = depth
+            self.principal_variation = self.get_principal_variation(move, depth)
+            self.principal_variation_value = value
+            self.stats.completed_depth = depth
+            self.stats.principal_variation = self.principal_variation
+            self.stats.principal_variation_value = value
+            self.publish_stats()
+            # Search the best move first in the next iteration
+            valid_moves.remove(move)
+            valid_moves.insert(0, move)
+            if abs(value) > 9000:
+                # Game over (or more than half of the boxes) within the search depth, deeper searches do not change
+                # the result
+                break
+
+        return best_move
+
+    def search_root(
+            self,
+            valid_moves: List[Move],
+            max_depth: int,
+            alpha: int,
+            beta: int
+    ) -> Tuple[Optional[Move], int, bool]:
+        """
+        Search all root moves with the given depth and window (one iteration of find_best_move()).
+
+        The first move is searched with the window, all other moves first with a null window (see
+        negamax_search()).
+
+        Args:
+            valid_moves (List[Move]): The root moves in the order to search them.
+            max_depth (int): The search depth.
+            alpha (int): The lower bound of the window.
+            beta (int): The upper bound of the window.
+
+        Returns:
+            Tuple[Optional[Move], int, bool]: The best move (None if no move was searched completely), its value and
+                True if the iteration was completed (not aborted by the deadline or by kill_tree_ai()). If the value
+                is not inside the window, it is only a bound of the real value.
+        """
+
+        best_value: int = -self.very_large_numer
+        best_move: Optional[Move] = None
+        player = self.original_player
+
+        stats = self.stats
+        stats.cnt_valid_moves = len(valid_moves)
+        stats.cnt_move_nr = 0
 
         for move in valid_moves:
-            if (True  # Set to True if you want to enable the feature "Skip if eva0 found too often".
-                    and max_depth > 5 and best_value == 0 and self.cnt_valid_moves > 10
-                    and cnt_eva_null_moves_found > self.cnt_valid_moves // 10):
-                self.tree_ai_debug(
-                    "find_best_move: Found Eva==0 too often. Break.",
-                    0,
-                    max_depth,
-                    best_value,
-                    -self.very_large_numer,
-                    self.very_large_numer,
-                    self.cnt_valid_moves,
-                    move
-                )
-                break
-            self.cnt_move_nr += 1
-            self.cnt_deepcopys += 1
-            cnt_moves = self.make_ai_move(move)
+            stats.cnt_move_nr += 1
+            stats.nodes += 1
+            cnt_moves = self.make_ai_move(self.gb.get_edge(move.x, move.y, move.horizontal))
             self.tree_ai_debug(
                 "find_best_move: Test Move %d of %d, made %d moves in one step. Next Up: Player %d (I am %d)!"
-                % (self.cnt_move_nr, self.cnt_valid_moves, cnt_moves, self.gb.current_player, self.original_player),
+                % (stats.cnt_move_nr, stats.cnt_valid_moves, cnt_moves, self.gb.current_player, self.original_player),
                 0,
                 max_depth,
                 best_value,
-                -self.very_large_numer,
-                self.very_large_numer,
-                self.cnt_valid_moves,
+                alpha,
+                beta,
+                stats.cnt_valid_moves,
                 move,
                 best_move
             )
-            value = self.alpha_beta_search(max_depth - 1, -self.very_large_numer, self.very_large_numer)
+            if best_move is None:
+                value = self.search_child(max_depth - 1, alpha, beta, player)
+            else:
+                value = self.search_child(max_depth - 1, alpha, alpha + 1, player)
+                if alpha < value < beta:
+                    value = self.search_child(max_depth - 1, alpha, beta, player)
             self.take_back_moves(cnt_moves)
+            if self.is_search_aborted():
+                return best_move, best_value, False
             self.tree_ai_debug(
-                "find_best_move:   Tested Move %d with Eva %d (Best was %d). #Eva0: %d"
-                % (self.cnt_move_nr, value, best_value, cnt_eva_null_moves_found),
+                "find_best_move:   Tested Move %d with Eva %d (Best was %d)."
+                % (stats.cnt_move_nr, value, best_value),
                 0,  # TODO Set to 1
                 max_depth,
                 value,
-                valid_moves=self.cnt_valid_moves,
+                valid_moves=stats.cnt_valid_moves,
                 move=move,
                 best_move=best_move
             )
 
-            if value == 0:
-                cnt_eva_null_moves_found += 1
-
-            if value > best_value:
+            if value > best_value or best_move is None:
                 best_value = value
                 best_move = move
+            alpha = max(alpha, best_value)
+            if alpha >= beta:
+                # Fail high, the value is outside of the aspiration window
+                break
+
+        return best_move, best_value, True
+
+    def search_root_parallel(
+            self,
+            valid_moves: List[Move],
+            max_depth: int,
+            alpha: int,
+            beta: int
+    ) -> Tuple[Optional[Move], int, bool]:
+        """
+        Search all root moves like search_root(), but with the worker processes (Young Brothers Wait).
+
+        The first move is searched in this process to get a good lower bound. Then all other root moves are sent to
+        the worker processes and searched with a null window. Moves that fail high are searched again with the
+        window. Every worker keeps its own transposition table between the root moves and between the moves of the
+        game. This process only waits for the results and checks the deadline and kill_tree_ai(). If the search has
+        to stop, the stop_event of the pool aborts all searches that are still running.
+
+        Without workers (or with one root move only), this is search_root().
+
+        Args:
+            valid_moves (List[Move]): The root moves in the order to search them.
+            max_depth (int): The search depth.
+            alpha (int): The lower bound of the window.
+            beta (int): The upper bound of the window.
 
-            if True and max_depth > 3 and best_value > 0:
+        Returns:
+            Tuple[Optional[Move], int, bool]: Same as search_root().
+        """
+
+        self.worker_principal_variations = {}
+        if self.workers < 2 or len(valid_moves) < 2:
+            return self.search_root(valid_moves, max_depth, alpha, beta)
+
+        best_move, best_value, completed = self.search_root(valid_moves[:1], max_depth, alpha, beta)
+        self.stats.cnt_valid_moves = len(valid_moves)
+        alpha = max(alpha, best_value)
+        if not completed or alpha >= beta:
+            return best_move, best_value, completed
+
+        pool = get_process_pool(self.workers, self.transposition_table_mb)
+        pool.stop_event.clear()
+        encoding = self.gb.encode()
+        pending = {}
+
+        def submit(root_move: Move, window_alpha: int, window_beta: int) -> None:
+            time_left = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+            edge = self.gb.get_edge(root_move.x, root_move.y, root_move.horizontal)
+            future = pool.executor.submit(search_root_move, self.search_id, encoding, edge, max_depth,
+                                          window_alpha, window_beta, time_left)
+            pending[future] = (root_move, edge, window_alpha, window_beta)
+
+        def stop() -> None:
+            # Wait until the workers have stopped, the next search must not share them with an old one
+            pool.stop_event.set()
+            for running in pending:
+                running.cancel()
+            wait(pending)
+
+        for move in valid_moves[1:]:
+            submit(move, alpha, alpha + 1)
+
+        while pending:
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            if self.killed or (self.deadline is not None and time.monotonic() >= self.deadline):
+                self.timed_out = not self.killed
+                stop()
+                return best_move, best_value, False
+            if time.monotonic() >= self.next_publish_time:
+                self.publish_stats()
+            for future in done:
+                move, edge, window_alpha, window_beta = pending.pop(future)
+                value, completed, worker_stats, continuation = future.result()
+                self.stats.add_counters(worker_stats)
+                if not completed:
+                    # The worker has reached the deadline
+                    self.timed_out = True
+                    stop()
+                    return best_move, best_value, False
+                if window_beta == window_alpha + 1 and window_beta < beta and alpha < value < beta:
+                    # Null window fail high, the exact value is needed
+                    submit(move, alpha, beta)
+                    continue
+                self.stats.cnt_move_nr += 1
                 self.tree_ai_debug(
-                    "find_best_move: Found Eva>0. Break.",
+                    "find_best_move:   Tested Move %d with Eva %d in a worker process (Best was %d)."
+                    % (self.stats.cnt_move_nr, value, best_value),
                     0,
                     max_depth,
-                    best_value,
-                    -self.very_large_numer,
-                    self.very_large_numer,
-                    self.cnt_valid_moves,
-                    move
+                    value,
+                    valid_moves=self.stats.cnt_valid_moves,
+                    move=move,
+                    best_move=best_move
                 )
-                break
-
-        if not best_move:
-            raise AIException("No more valid moves found, game seems to be ended already.")
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                    self.worker_principal_variations[edge] = continuation
+                alpha = max(alpha, best_value)
+                if alpha >= beta:
+                    # Fail high, the value is outside of the aspiration window
+                    stop()
+                    return best_move, best_value, True
 
-        return best_move
+        return best_move, best_value, True
@@ -0,0 +1,325 @@
+import logging
+import mmap
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from kaese.gameboard.edges import get_edge_table
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.symmetry import get_symmetry_table
+
+# Header of a database file: magic bytes, size_x, size_y and two reserved bytes
+HEADER_MAGIC = b"KDB1"
+HEADER_SIZE = 8
+
+# Larger boards need 2 ** lines bytes (e.g. 5x4: 2 ** 31), they are not supported
+MAX_LINES = 24
+
+DATABASE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class PositionIndex:
+    """
+    Dense numbering of the positions on one board size, shared by all databases of that size.
+
+    The rest of the game only depends on the drawn lines, not on the owners of the boxes or the player who has drawn
+    a line. So the index of a position is a line mask with one bit per line of the gameboard: bit number i is set if
+    the line EdgeTable.edges[i] is drawn. The lines on the border are always drawn and not part of the index.
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        edges (List[int]): The edge number of every bit (see GameBoard.get_edge()).
+        bits (Dict[int, int]): The bit (1 << i) of every edge number.
+        box_masks (Dict[int, Tuple[int, int]]): Per bit, the masks of the lines around the two boxes next to the line.
+        symmetry_tables (List[List[List[int]]]): Per symmetry of the board (see SymmetryTable), lookup tables that
+            map the index bytewise: the mapped index is the OR of table[k][(index >> 8 * k) & 255] over all bytes k.
+        count (int): Number of positions (2 ** number of lines).
+    """
+    size_x: int
+    size_y: int
+    edges: List[int]
+    bits: Dict[int, int]
+    box_masks: Dict[int, Tuple[int, int]]
+    symmetry_tables: List[List[List[int]]]
+    count: int
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        self.size_x = size_x
+        self.size_y = size_y
+        edge_table = get_edge_table(size_x, size_y)
+        self.edges = list(edge_table.edges)
+        self.bits = {edge: 1 << i for i, edge in enumerate(self.edges)}
+        self.count = 1 << len(self.edges)
+        box_lines = []
+        for lines in edge_table.box_edges:
+            mask = 0
+            for edge in lines:
+                mask |= self.bits[edge]
+            box_lines.append(mask)
+        self.box_masks = {}
+        for edge in self.edges:
+            box_1, box_2 = edge_table.adjacent_boxes[edge]
+            self.box_masks[self.bits[edge]] = (box_lines[box_1], box_lines[box_2])
+
+        symmetry_table = get_symmetry_table(size_x, size_y)
+        self.symmetry_tables = []
+        for edge_map in symmetry_table.edge_maps[1:]:
+            byte_tables = []
+            for shift in range(0, len(self.edges), 8):
+                byte_table = []
+                for byte in range(256):
+                    mapped = 0
+                    for i in range(8):
+                        if byte >> i & 1 and shift + i < len(self.edges):
+                            mapped |= self.bits[edge_map[self.edges[shift + i]]]
+                    byte_table.append(mapped)
+                byte_tables.append(byte_table)
+            self.symmetry_tables.append(byte_tables)
+
+    def get_index(self, gb: GameBoard) -> int:
+        """
+        Get the index of the position on the gameboard.
+
+        :param gb: The gameboard, it must have the size of this index.
+        :type gb: GameBoard
+        :return: The index of the position.
+        :rtype: int
+        """
+        free_line_positions = gb.free_line_positions
+        index = 0
+        for edge, bit in self.bits.items():
+            if free_line_positions[edge] < 0:
+                index |= bit
+        return index
+
+    def get_symmetric_indexes(self, index: int) -> List[int]:
+        """
+        Get the indexes of all positions that are symmetric to the given one (without the position itself).
+
+        :param index: The index of the position.
+        :type index: int
+        :return: One index per symmetry of the board except the identity, they may contain duplicates.
+        :rtype: List[int]
+        """
+        result = []
+        for byte_tables in self.symmetry_tables:
+            mapped = 0
+            shifted = index
+            for byte_table in byte_tables:
+                mapped |= byte_table[shifted & 255]
+                shifted >>= 8
+            result.append(mapped)
+        return result
+
+    def get_move_value(self, index: int, bit: int, child_value: int) -> int:
+        """
+        Get the value of drawing one line from the value of the resulting position.
+
+        :param index: The index of the position before the move.
+        :type index: int
+        :param bit: The bit of the line, see bits.
+        :type bit: int
+        :param child_value: The value of the position after the move for its player to move.
+        :type child_value: int
+        :return: The value of the move for the player who draws the line.
+        :rtype: int
+        """
+        child = index | bit
+        mask_1, mask_2 = self.box_masks[bit]
+        captured = (child & mask_1 == mask_1) + (child & mask_2 == mask_2)
+        if captured:
+            # The player moves again
+            return captured + child_value
+        return -child_value
+
+
+@lru_cache(maxsize=None)
+def get_position_index(size_x: int, size_y: int) -> PositionIndex:
+    """Return the (cached) PositionIndex for the given board size."""
+    return PositionIndex(size_x, size_y)
+
+
+def solve_positions(size_x: int, size_y: int) -> bytearray:
+    """
+    Solve all positions of one board size with retrograde analysis.
+
+    The value of a position is the number of the remaining boxes that the player to move gets minus the number of
+    boxes the opponent gets, if both play perfectly. Drawing a line only adds a bit to the index, so the positions
+    are solved from the highest index (all lines drawn) down to 0, every following position is known by then.
+
+    Symmetric positions have the same value. Only the position with the highest index of every class of symmetric
+    positions is solved, all others copy its value.
+
+    :param size_x: Size of the gameboard in "boxes".
+    :type size_x: int
+    :param size_y: Size of the gameboard in "boxes".
+    :type size_y: int
+    :return: The value of every position (by index) as signed byte.
+    :rtype: bytearray
+    """
+    position_index = get_position_index(size_x, size_y)
+    if len(position_index.edges) > MAX_LINES:
+        raise ValueError("Board size %dx%d has %d lines, at most %d are supported."
+                         % (size_x, size_y, len(position_index.edges), MAX_LINES))
+    count = position_index.count
+    all_lines = count - 1
+    box_masks = position_index.box_masks
+    get_symmetric_indexes = position_index.get_symmetric_indexes
+    # Values are stored as value & 255, get them back with (byte ^ 128) - 128
+    values = bytearray(count)
+    for index in range(count - 2, -1, -1):
+        representative = max(get_symmetric_indexes(index), default=index)
+        if representative > index:
+            values[index] = values[representative]
+            continue
+        best = -128
+        free = all_lines ^ index
+        while free:
+            bit = free & -free
+            free ^= bit
+            child = index | bit
+            child_value = (values[child] ^ 128) - 128
+            mask_1, mask_2 = box_masks[bit]
+            captured = (child & mask_1 == mask_1) + (child & mask_2 == mask_2)
+            value = captured + child_value if captured else -child_value
+            if value > best:
+                best = value
+        values[index] = best & 255
+    return values
+
+
+def get_database_path(size_x: int, size_y: int, directory: Optional[str] = None) -> str:
+    """
+    Get the path of the database file for one board size.
+
+    :param size_x: Size of the gameboard in "boxes".
+    :type size_x: int
+    :param size_y: Size of the gameboard in "boxes".
+    :type size_y: int
+    :param directory: The directory of the file, default is the directory of this module.
+    :type directory: Optional[str]
+    :return: The path of the file.
+    :rtype: str
+    """
+    return os.path.join(directory if directory is not None else DATABASE_DIRECTORY,
+                        "solved-%dx%d.bin" % (size_x, size_y))
+
+
+def write_database(size_x: int, size_y: int, directory: Optional[str] = None) -> str:
+    """
+    Solve all positions of one board size and write them to the database file, see SolvedPositions.
+
+    :param size_x: Size of the gameboard in "boxes".
+    :type size_x: int
+    :param size_y: Size of the gameboard in "boxes".
+    :type size_y: int
+    :param directory: The directory of the file, default is the directory of this module.
+    :type directory: Optional[str]
+    :return: The path of the written file.
+    :rtype: str
+    """
+    values = solve_positions(size_x, size_y)
+    path = get_database_path(size_x, size_y, directory)
+    with open(path, "wb") as file:
+        file.write(HEADER_MAGIC + bytes([size_x, size_y, 0, 0]))
+        file.write(values)
+    return path
+
+
+class SolvedPositions:
+    """
+    Read-only access to a database file written by write_database().
+
+    The file is mapped into memory with mmap, so the value of a position is one byte lookup and the operating
+    system only loads the pages that are used. The file has an 8 byte header (HEADER_MAGIC, size_x, size_y) and
+    one signed byte per position, see PositionIndex.
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        position_index (PositionIndex): The numbering of the positions.
+        path (str): The path of the database file.
+        data (mmap.mmap): The mapped file.
+    """
+    size_x: int
+    size_y: int
+    position_index: PositionIndex
+    path: str
+    data: mmap.mmap
+
+    def __init__(self, size_x: int, size_y: int, directory: Optional[str] = None) -> None:
+        """
+        :param size_x: Size of the gameboard in "boxes".
+        :type size_x: int
+        :param size_y: Size of the gameboard in "boxes".
+        :type size_y: int
+        :param directory: The directory of the file, default is the directory of this module.
+        :type directory: Optional[str]
+        :raises FileNotFoundError: If there is no database file for this size.
+        :raises ValueError: If the file is not a database for this size.
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        self.position_index = get_position_index(size_x, size_y)
+        self.path = get_database_path(size_x, size_y, directory)
+        with open(self.path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if (self.data[:HEADER_SIZE] != HEADER_MAGIC + bytes([size_x, size_y, 0, 0])
+                or len(self.data) != HEADER_SIZE + self.position_index.count):
+            self.data.close()
+            raise ValueError("%s is not a database of solved %dx%d positions." % (self.path, size_x, size_y))
+
+    def get_value(self, index: int) -> int:
+        """
+        Get the value of a position for the player to move.
+
+        :param index: The index of the position, see PositionIndex.get_index().
+        :type index: int
+        :return: The number of the remaining boxes the player to move gets minus the number the opponent gets.
+        :rtype: int
+        """
+        return (self.data[HEADER_SIZE + index] ^ 128) - 128
+
+    def get_move_values(self, gb: GameBoard) -> Dict[int, int]:
+        """
+        Get the exact value of every valid move on the gameboard.
+
+        :param gb: The gameboard.
+        :type gb: GameBoard
+        :return: Per edge number of a free line, the number of the remaining boxes the player to move gets minus the
+            number the opponent gets if the line is drawn and both play perfectly afterwards.
+        :rtype: Dict[int, int]
+        """
+        position_index = self.position_index
+        index = position_index.get_index(gb)
+        move_values = {}
+        for edge in gb.free_lines:
+            bit = position_index.bits[edge]
+            move_values[edge] = position_index.get_move_value(index, bit, self.get_value(index | bit))
+        return move_values
+
+    def close(self) -> None:
+        """
+        Unmap the database file.
+
+        :return: None
+        """
+        self.data.close()
+
+
+@lru_cache(maxsize=None)
+def get_solved_positions(size_x: int, size_y: int, directory: Optional[str] = None) -> SolvedPositions:
+    """Return the (cached) SolvedPositions for the given board size, the file is mapped only once."""
+    return SolvedPositions(size_x, size_y, directory)
+
+
+if __name__ == "__main__":
+    # Write the databases, e.g. python3 -m kaese.db.solved_positions 3x3 3x4 4x3 4x4
+    logging.basicConfig(level=logging.INFO)
+    for size in sys.argv[1:] or ["3x3", "3x4", "4x3", "4x4"]:
+        start = time.monotonic()
+        x, y = (int(value) for value in size.split("x"))
+        logging.info("Wrote %s in %.1f seconds." % (write_database(x, y), time.monotonic() - start))
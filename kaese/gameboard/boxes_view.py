@@ -0,0 +1,77 @@
+from typing import Iterator
+
+from kaese.gameboard.box import Box
+
+
+class BoxView:
+    """
+    Read-only stand-in for a Box object, the GameBoard stores the boxes in arrays.
+
+    The values are read from the board on every access, so a BoxView always reflects the current game state.
+    """
+    __slots__ = ("board", "x", "y")
+
+    def __init__(self, board, x: int, y: int) -> None:
+        self.board = board
+        self.x = x
+        self.y = y
+
+    @property
+    def owner(self) -> int:
+        return self.board.get_owner(self.x, self.y)
+
+    @property
+    def line_right(self) -> int:
+        return self.board.get_line(self.x, self.y, 0)
+
+    @property
+    def line_below(self) -> int:
+        return self.board.get_line(self.x, self.y, 1)
+
+    def to_box(self) -> Box:
+        """Return a detached Box object with the current values of this box."""
+        return Box(self.owner, self.line_right, self.line_below)
+
+
+class BoxesColumnView:
+    """Read-only view on one column (fixed x) of the boxes of a GameBoard, used as boxes[x]."""
+    __slots__ = ("board", "x")
+
+    def __init__(self, board, x: int) -> None:
+        self.board = board
+        self.x = x
+
+    def __len__(self) -> int:
+        return self.board.size_y
+
+    def __getitem__(self, y: int) -> BoxView:
+        if y < 0 or y >= self.board.size_y:
+            raise IndexError("Box index y=%d out of range" % y)
+        return BoxView(self.board, self.x, y)
+
+    def __iter__(self) -> Iterator[BoxView]:
+        for y in range(self.board.size_y):
+            yield BoxView(self.board, self.x, y)
+
+
+class BoxesView:
+    """
+    Read-only view that mimics the 2D matrix GameBoard.boxes, so boxes[x][y].owner, .line_right and .line_below
+    keep working for the GUI, the savegames and the AIs, although the GameBoard does not store Box objects.
+    """
+    __slots__ = ("board",)
+
+    def __init__(self, board) -> None:
+        self.board = board
+
+    def __len__(self) -> int:
+        return self.board.size_x
+
+    def __getitem__(self, x: int) -> BoxesColumnView:
+        if x < 0 or x >= self.board.size_x:
+            raise IndexError("Box index x=%d out of range" % x)
+        return BoxesColumnView(self.board, x)
+
+    def __iter__(self) -> Iterator[BoxesColumnView]:
+        for x in range(self.board.size_x):
+            yield BoxesColumnView(self.board, x)
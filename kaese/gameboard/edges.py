@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+
+class EdgeTable:
+    """
+    Precomputed lookup tables for the integer encoding of the lines on one board size, shared by all boards of that
+    size.
+
+    Edge number ((x * size_y + y) << 1) | horizontal stands for the line right of (horizontal=0) or below
+    (horizontal=1) the box x, y, see GameBoard.get_edge(). Box number x * size_y + y stands for the box x, y.
+    Edge numbers of lines that do not exist (right of the last column, below the last row) are not in edges, their
+    entries in the other tables must not be used.
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        edges (List[int]): Sorted edge numbers of all lines on the gameboard.
+        coordinates (List[Tuple[int, int, int]]): Per edge number, the tuple (x, y, horizontal).
+        adjacent_boxes (List[Tuple[int, int]]): Per edge number, the box numbers of the two boxes next to the line
+            (box x, y first).
+        box_edges (List[Tuple[int, ...]]): Per box number, the edge numbers of the lines around the box (right,
+            below, left, above; lines on the border of the gameboard are left out).
+    """
+    size_x: int
+    size_y: int
+    edges: List[int]
+    coordinates: List[Tuple[int, int, int]]
+    adjacent_boxes: List[Tuple[int, int]]
+    box_edges: List[Tuple[int, ...]]
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        self.size_x = size_x
+        self.size_y = size_y
+        self.edges = []
+        self.coordinates = []
+        self.adjacent_boxes = []
+        self.box_edges = []
+        for x in range(size_x):
+            for y in range(size_y):
+                box_nr = x * size_y + y
+                edge = box_nr << 1
+                if x + 1 < size_x:
+                    self.edges.append(edge)
+                if y + 1 < size_y:
+                    self.edges.append(edge | 1)
+                self.coordinates.append((x, y, 0))
+                self.coordinates.append((x, y, 1))
+                self.adjacent_boxes.append((box_nr, box_nr + size_y))
+                self.adjacent_boxes.append((box_nr, box_nr + 1))
+                lines = []
+                if x + 1 < size_x:
+                    lines.append(edge)
+                if y + 1 < size_y:
+                    lines.append(edge | 1)
+                if x > 0:
+                    lines.append(edge - (size_y << 1))
+                if y > 0:
+                    lines.append(edge - 1)
+                self.box_edges.append(tuple(lines))
+
+
+@lru_cache(maxsize=None)
+def get_edge_table(size_x: int, size_y: int) -> EdgeTable:
+    """Return the (cached) EdgeTable for the given board size."""
+    return EdgeTable(size_x, size_y)
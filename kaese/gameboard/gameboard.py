@@ -1,8 +1,12 @@
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 import logging
+from kaese.gameboard.gameboard_exception import GameboardException
+from kaese.gameboard.gameboard_snapshot import GameBoardSnapshot
 from kaese.gameboard.invalid_move_exception import InvalidMoveException
-from kaese.gameboard.box import Box
+from kaese.gameboard.boxes_view import BoxesView
+from kaese.gameboard.edges import EdgeTable, get_edge_table
 from kaese.gameboard.move import Move
+from kaese.gameboard.zobrist import ZobristTable, get_zobrist_table
 
 
 class GameBoard:
@@ -13,7 +17,18 @@ class GameBoard:
         size_x (int): Size of the gameboard in "boxes" (not pixels).
         size_y (int): Size of the gameboard in "boxes" (not pixels).
         verbose (Union[bool, int]): Level of verbosity for game messages (bool or int in range 0-3).
-        boxes (List[List[Box]]): 2D matrix of all boxes on the board.
+        boxes (BoxesView): Read-only 2D matrix view of all boxes on the board (boxes[x][y].owner, ...).
+        owners (bytearray): Owner (0-2) of every box, indexed by box number x * size_y + y.
+        lines_right (bytearray): Player (0-2) that has drawn the line right of every box, indexed by box number.
+        lines_below (bytearray): Player (0-2) that has drawn the line below every box, indexed by box number.
+        surroundings (List[List[int]]): 2D matrix with the count of lines (and borders) around every box (0-4).
+        free_lines (List[int]): Unordered list of the edges (see get_edge()) of all lines that are still free.
+        free_line_positions (List[int]): Position of every edge in free_lines, -1 if the line is not free.
+        capturable_boxes (Dict[int, int]): Box number (x * size_y + y) of every box with exactly 3 lines around it,
+            mapped to the edge of the line that captures the box.
+        edge_table (EdgeTable): Precomputed lookup tables for the edge numbers of this board size.
+        zobrist (ZobristTable): Random keys for the Zobrist hash of this board size.
+        line_hash (int): XOR of the Zobrist keys of all drawn lines, see zobrist_hash.
         current_player (int): The current player (1 or 2).
         player_ai (Dict[int, str]): Dictionary mapping player number to player type ("Human" or "AI").
         winner (int): 0 for no winner yet, 1/2 for player 1/2 won, 3 for draw.
@@ -23,11 +38,22 @@ class GameBoard:
         last_move (Optional[Move]): Last move made, used to highlight the line in the GUI.
         move_history (List[Move]): List of moves made in the game.
         move_history_pointer (int): Pointer to the current position in the move history.
+        undo_stack (List[int]): Moves made with apply(), encoded as integers, see undo().
     """
     size_x: int  # size of the gameboard in "boxes" (not pixels)
     size_y: int
     verbose: Union[bool, int]
-    boxes: List[List[Box]]  # 2D matrix of all boxes on the board
+    boxes: BoxesView  # read-only 2D matrix view of all boxes on the board
+    owners: bytearray  # owner of every box, index x * size_y + y
+    lines_right: bytearray  # player that has drawn the line right of every box
+    lines_below: bytearray  # player that has drawn the line below every box
+    surroundings: List[List[int]]  # 2D matrix, count of lines (and borders) around every box, updated on every move
+    free_lines: List[int]  # edges of all free lines, unordered (swap-remove)
+    free_line_positions: List[int]  # index of every edge in free_lines, -1 if not free
+    capturable_boxes: Dict[int, int]  # box number of every box with 3 lines around it -> edge that captures it
+    edge_table: EdgeTable  # shared per board size
+    zobrist: ZobristTable  # shared per board size
+    line_hash: int  # XOR of the Zobrist keys of all drawn lines, updated on every move
     current_player: int  # 1 or 2
     player_ai: Dict[int, str]
     winner: int  # 0: no winner yet, 1/2: player 1/2 won, 3: draw
@@ -37,6 +63,7 @@ class GameBoard:
     last_move: Optional[Move]  # last move, stored to highlight that line in some way in the GUI
     move_history: List[Move]
     move_history_pointer: int
+    undo_stack: List[int]  # (edge << 3) | (captured boxes << 1) | (player - 1) of every move made with apply()
 
     def __init__(self, size_x: int = 12, size_y: int = 12, verbose: Union[bool, int] = False) -> None:
         """
@@ -52,14 +79,15 @@ class GameBoard:
         self.size_x = size_x
         self.size_y = size_y
         self.verbose = verbose
-        self.boxes = []
         self.win_counter = {1: 0, 2: 0}
         self.last_move = None
-        for x in range(self.size_x):
-            column = []
-            for y in range(self.size_y):
-                column.append(Box())
-            self.boxes.append(column)
+        self.edge_table = get_edge_table(self.size_x, self.size_y)
+        self.init_boxes()
+        self.init_surroundings()
+        self.init_free_lines()
+        self.capturable_boxes = {}
+        self.zobrist = get_zobrist_table(self.size_x, self.size_y)
+        self.line_hash = 0
         self.moves_made = 0
         self.remaining_moves = (self.size_x * self.size_y * 2) - self.size_x - self.size_y
 
@@ -76,9 +104,299 @@ class GameBoard:
         #  0: Pointing to no move.
         #  1 - len(self.move_history): Point to self.move_history[self.move_history_pointer-1].
         self.move_history_pointer = 0
+        self.undo_stack = []
 
         logging.info("Gameboard initialized")
 
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        64-bit Zobrist hash of the position: the drawn lines and the player to move.
+
+        Positions that were reached by a different order of moves have the same hash. The owners of the boxes and
+        the score are not part of the hash, use e.g. (zobrist_hash, win_counter[1]) as key if the score matters.
+
+        :return: The hash of the current position.
+        :rtype: int
+        """
+        if self.current_player == 2:
+            return self.line_hash ^ self.zobrist.side_to_move
+        return self.line_hash
+
+    def compute_zobrist_hash(self) -> int:
+        """
+        Compute the Zobrist hash of the position from scratch, see zobrist_hash for the incrementally updated value.
+
+        :return: The hash of the current position.
+        :rtype: int
+        """
+        line_hash = 0
+        for x in range(self.size_x):
+            for y in range(self.size_y):
+                for horizontal in (0, 1):
+                    if self.get_line(x, y, horizontal) > 0:
+                        line_hash ^= self.zobrist.lines[self.get_edge(x, y, horizontal)]
+        if self.current_player == 2:
+            return line_hash ^ self.zobrist.side_to_move
+        return line_hash
+
+    def init_boxes(self) -> None:
+        """
+        Create the empty storage for all boxes on the board: one bytearray each for the owners, the lines right of and
+        the lines below the boxes, and the BoxesView for the boxes attribute.
+
+        The box number x*size_y+y indexes all three, get_line(), set_line(), get_owner() and set_owner() read and write
+        single bytes.
+
+        :return: None
+        """
+        count = self.size_x * self.size_y
+        self.owners = bytearray(count)
+        self.lines_right = bytearray(count)
+        self.lines_below = bytearray(count)
+        self.boxes = BoxesView(self)
+
+    def init_surroundings(self) -> None:
+        """
+        Create the surroundings matrix for an empty board, where only the border of the gameboard surrounds the boxes.
+
+        :return: None
+        """
+        self.surroundings = []
+        for x in range(self.size_x):
+            column = []
+            for y in range(self.size_y):
+                column.append((x == 0) + (x + 1 == self.size_x) + (y == 0) + (y + 1 == self.size_y))
+            self.surroundings.append(column)
+
+    def update_surroundings(self, x: int, y: int, horizontal: int, delta: int) -> None:
+        """
+        Add delta to the surroundings count of the two boxes next to the line right of (horizontal=0) or below
+        (horizontal=1) the box x, y.
+
+        The index of capturable boxes is updated for both boxes as well, so the index of free lines must already be
+        up to date.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :param horizontal: 0 for the vertical line right of the box, 1 for the horizontal line below the box.
+        :type horizontal: int
+        :param delta: 1 if the line was drawn, -1 if the line was removed.
+        :type delta: int
+        :return: None
+        """
+        self.surroundings[x][y] += delta
+        self.update_capturable_box(x, y)
+        if horizontal == 1:
+            self.surroundings[x][y + 1] += delta
+            self.update_capturable_box(x, y + 1)
+        else:
+            self.surroundings[x + 1][y] += delta
+            self.update_capturable_box(x + 1, y)
+
+    def update_capturable_box(self, x: int, y: int) -> None:
+        """
+        Add the box x, y to the index of capturable boxes if it has exactly 3 lines around it, else remove it.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :return: None
+        """
+        box_nr = x * self.size_y + y
+        if self.surroundings[x][y] == 3:
+            self.capturable_boxes[box_nr] = self.get_missing_edge(x, y)
+        elif box_nr in self.capturable_boxes:
+            del self.capturable_boxes[box_nr]
+
+    def get_missing_edge(self, x: int, y: int) -> int:
+        """
+        Get the edge of a free line around the box x, y (for a box with 3 lines around it: the one that captures it).
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :return: The edge number of the free line, -1 if there is no free line around the box.
+        :rtype: int
+        """
+        free_line_positions = self.free_line_positions
+        for edge in self.edge_table.box_edges[x * self.size_y + y]:
+            if free_line_positions[edge] >= 0:
+                return edge
+        return -1
+
+    def get_capture_move(self, player: int = 0, player_ai: str = "") -> Optional[Move]:
+        """
+        Get a move that captures a box right now in O(1), using the index of capturable boxes.
+
+        :param player: The player (1 or 2) making the move.
+        :type player: int
+        :param player_ai: The player_ai making the move.
+        :type player_ai: str
+        :return: The Move object, or None if no box can be captured.
+        :rtype: Optional[Move]
+        """
+        for edge in self.capturable_boxes.values():
+            return self.edge_to_move(edge, player, player_ai)
+        return None
+
+    def init_free_lines(self) -> None:
+        """
+        Create the index of free lines for an empty board, where all lines are free.
+
+        :return: None
+        """
+        self.free_lines = self.edge_table.edges[:]
+        self.free_line_positions = [-1] * (self.size_x * self.size_y * 2)
+        for position, edge in enumerate(self.free_lines):
+            self.free_line_positions[edge] = position
+
+    def add_free_line(self, edge: int) -> None:
+        """
+        Add the line with the given edge number to the index of free lines in O(1).
+
+        :param edge: The edge number of the line, see get_edge().
+        :type edge: int
+        :return: None
+        """
+        self.free_line_positions[edge] = len(self.free_lines)
+        self.free_lines.append(edge)
+
+    def remove_free_line(self, edge: int) -> None:
+        """
+        Remove the line with the given edge number from the index of free lines in O(1).
+
+        The last free line takes the place of the removed one, so the order of free_lines changes.
+
+        :param edge: The edge number of the line, see get_edge().
+        :type edge: int
+        :return: None
+        """
+        position = self.free_line_positions[edge]
+        last_edge = self.free_lines.pop()
+        if last_edge != edge:
+            self.free_lines[position] = last_edge
+            self.free_line_positions[last_edge] = position
+        self.free_line_positions[edge] = -1
+
+    def get_edge(self, x: int, y: int, horizontal: int) -> int:
+        """
+        Get the edge number of the line right of (horizontal=0) or below (horizontal=1) the box x, y.
+
+        Sorting edge numbers gives the same order as scanning boxes[x][y] for line_right and then line_below. The
+        lookup tables for edge numbers (coordinates, adjacent boxes, lines around a box) are in edge_table.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :param horizontal: 0 for the vertical line right of the box, 1 for the horizontal line below the box.
+        :type horizontal: int
+        :return: The edge number.
+        :rtype: int
+        """
+        return ((x * self.size_y + y) << 1) | horizontal
+
+    def edge_to_move(self, edge: int, player: int = 0, player_ai: str = "") -> Move:
+        """
+        Create the Move object for the line with the given edge number.
+
+        :param edge: The edge number of the line, see get_edge().
+        :type edge: int
+        :param player: The player (1 or 2) making the move.
+        :type player: int
+        :param player_ai: The player_ai making the move.
+        :type player_ai: str
+        :return: The Move object.
+        :rtype: Move
+        """
+        x, y, horizontal = self.edge_table.coordinates[edge]
+        return Move(x, y, horizontal, player, player_ai)
+
+    def get_valid_moves(self, player: int = 0, player_ai: str = "") -> List[Move]:
+        """
+        Get the Move objects for all free lines in O(free lines), in no particular order.
+
+        :param player: The player (1 or 2) making the move.
+        :type player: int
+        :param player_ai: The player_ai making the move.
+        :type player_ai: str
+        :return: List of all valid moves, empty if the game has ended.
+        :rtype: List[Move]
+        """
+        return [self.edge_to_move(edge, player, player_ai) for edge in self.free_lines]
+
+    def get_line(self, x: int, y: int, horizontal: int) -> int:
+        """
+        Get the player that has drawn the line right of (horizontal=0) or below (horizontal=1) the box x, y.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :param horizontal: 0 for the vertical line right of the box, 1 for the horizontal line below the box.
+        :type horizontal: int
+        :return: 0 if the line is still free, else the player (1 or 2) that has drawn the line.
+        :rtype: int
+        """
+        if horizontal == 1:
+            return self.lines_below[x * self.size_y + y]
+        return self.lines_right[x * self.size_y + y]
+
+    def set_line(self, x: int, y: int, horizontal: int, player: int) -> None:
+        """
+        Set the line right of (horizontal=0) or below (horizontal=1) the box x, y. Use player 0 to remove the line.
+
+        This does neither check the game rules nor update any other game state, use make_move() for that.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :param horizontal: 0 for the vertical line right of the box, 1 for the horizontal line below the box.
+        :type horizontal: int
+        :param player: The player (1 or 2) that draws the line, 0 to remove it.
+        :type player: int
+        :return: None
+        """
+        if horizontal == 1:
+            self.lines_below[x * self.size_y + y] = player
+        else:
+            self.lines_right[x * self.size_y + y] = player
+
+    def get_owner(self, x: int, y: int) -> int:
+        """
+        Get the owner of the box x, y.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :return: 0 if the box is not owned yet, else the owner (1 or 2).
+        :rtype: int
+        """
+        return self.owners[x * self.size_y + y]
+
+    def set_owner(self, x: int, y: int, owner: int) -> None:
+        """
+        Set the owner of the box x, y. Use owner 0 to reset the box.
+
+        This does not update the win_counter, see check_and_set_new_owner() and take_back_one_move().
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :param owner: The new owner (1 or 2) or 0.
+        :type owner: int
+        :return: None
+        """
+        self.owners[x * self.size_y + y] = owner
+
     def check_and_set_new_owner(self, x: int, y: int, new_owner: int, print_it: bool = True) -> int:
         """
         Check if a certain box now has a new owner and return 0 by default, else 1 if the new box is owned.
@@ -96,11 +414,11 @@ class GameBoard:
         """
         if x >= self.size_x or y >= self.size_y:
             return 0
-        if self.boxes[x][y].owner > 0:
+        if self.get_owner(x, y) > 0:
             return 0
         border_count = self.get_count_surroundings(x, y)
         if border_count == 4:
-            self.boxes[x][y].owner = new_owner
+            self.set_owner(x, y, new_owner)
             if print_it:
                 logging.info("New Owner for x: %d, y: %d is player %d" % (x, y, new_owner))
             # TODO Maybe refactor this: Do not increment but count all fields instead
@@ -112,6 +430,8 @@ class GameBoard:
         """
         Get the count of surrounding elements around the specified coordinates.
 
+        The count is read from the surroundings matrix, which make_move() and take_back_one_move() keep up to date.
+
         :param x: The x-coordinate of the element 0 - size_x-1.
         :type x: int
         :param y: The y-coordinate of the element 0 - size_y-1.
@@ -119,28 +439,7 @@ class GameBoard:
         :return: The count of surrounding elements 0 - 4.
         :rtype: int
         """
-        border_count = 0
-        if x + 1 < self.size_x:
-            if self.boxes[x][y].line_right > 0:
-                border_count += 1
-        else:
-            border_count += 1
-        if y + 1 < self.size_y:
-            if self.boxes[x][y].line_below > 0:
-                border_count += 1
-        else:
-            border_count += 1
-        if x > 0:
-            if self.boxes[x - 1][y].line_right > 0:
-                border_count += 1
-        else:
-            border_count += 1
-        if y > 0:
-            if self.boxes[x][y - 1].line_below > 0:
-                border_count += 1
-        else:
-            border_count += 1
-        return border_count
+        return self.surroundings[x][y]
 
     def make_move(
             self,
@@ -168,11 +467,11 @@ class GameBoard:
             logging.info(msg)
             print(msg)
         self.is_valid_move(move, ignore_current_selected_player)
-        box = self.boxes[move.x][move.y]
-        if move.horizontal == 1:
-            box.line_below = move.player
-        else:
-            box.line_right = move.player
+        self.set_line(move.x, move.y, move.horizontal, move.player)
+        edge = self.get_edge(move.x, move.y, move.horizontal)
+        self.line_hash ^= self.zobrist.lines[edge]
+        self.remove_free_line(edge)
+        self.update_surroundings(move.x, move.y, move.horizontal, 1)
         captured_boxes = 0
         captured_boxes += self.check_and_set_new_owner(move.x, move.y, move.player, print_it)
         captured_boxes += self.check_and_set_new_owner(move.x + 1, move.y, move.player, print_it)
@@ -190,12 +489,20 @@ class GameBoard:
         self.moves_made += 1
         self.remaining_moves -= 1
         if self.remaining_moves == 0:
-            if self.win_counter[1] > self.win_counter[2]:
-                self.winner = 1
-            elif self.win_counter[2] > self.win_counter[1]:
-                self.winner = 2
-            else:
-                self.winner = 3
+            self.set_winner()
+
+    def set_winner(self) -> None:
+        """
+        Set the winner at the end of the game, according to the win_counter.
+
+        :return: None
+        """
+        if self.win_counter[1] > self.win_counter[2]:
+            self.winner = 1
+        elif self.win_counter[2] > self.win_counter[1]:
+            self.winner = 2
+        else:
+            self.winner = 3
 
     def take_back_one_move(self) -> None:
         """
@@ -209,30 +516,23 @@ class GameBoard:
         """
         self.move_history_pointer -= 1
         move = self.move_history[self.move_history_pointer]
-        if self.boxes[move.x][move.y].owner > 0:
-            # TODO Maybe refactor this: Do not increment but count all fields instead
-            self.win_counter[self.boxes[move.x][move.y].owner] -= 1
-            self.boxes[move.x][move.y].owner = 0
+        self.release_box(move.x, move.y)
+        self.set_line(move.x, move.y, move.horizontal, 0)
+        edge = self.get_edge(move.x, move.y, move.horizontal)
+        self.line_hash ^= self.zobrist.lines[edge]
+        self.add_free_line(edge)
+        self.update_surroundings(move.x, move.y, move.horizontal, -1)
         if move.horizontal == 0:
             # Vertical line, check boxes left and right of line (x and x+1)
-            self.boxes[move.x][move.y].line_right = 0
             if move.x + 1 < self.size_x:
-                if self.boxes[move.x + 1][move.y].owner > 0:
-                    # TODO Maybe refactor this: Do not increment but count all fields instead
-                    self.win_counter[self.boxes[move.x + 1][move.y].owner] -= 1
-                    self.boxes[move.x + 1][move.y].owner = 0
+                self.release_box(move.x + 1, move.y)
         else:
             # Horizontal line, check boxes above and below line (y and y+1)
-            self.boxes[move.x][move.y].line_below = 0
             if move.y + 1 < self.size_y:
-                if self.boxes[move.x][move.y + 1].owner > 0:
-                    # TODO Maybe refactor this: Do not increment but count all fields instead
-                    self.win_counter[self.boxes[move.x][move.y + 1].owner] -= 1
-                    self.boxes[move.x][move.y + 1].owner = 0
-        if self.move_history_pointer > 0:
-            self.current_player = move.player
-        else:
-            self.current_player = 1
+                self.release_box(move.x, move.y + 1)
+        # The player who made the move is the player to move in the position before it. Boards created with
+        # clone_for_search() have no history before their first move, so do not rely on move_history_pointer here.
+        self.current_player = move.player
         self.moves_made -= 1
         self.remaining_moves += 1
         if self.winner > 0:
@@ -243,10 +543,252 @@ class GameBoard:
         else:
             self.last_move = None
 
+    def apply(self, edge: int) -> int:
+        """
+        Draw the line with the given edge number for the current player, fast path for searches.
+
+        Other than make_move(), this does not check the move, does not log anything and does not touch the move
+        history or last_move. The move is pushed to the undo_stack as a single integer instead, so it can be taken
+        back with undo() in O(1). The line must be free (e.g. taken from free_lines or capturable_boxes).
+
+        :param edge: The edge number of a free line, see get_edge().
+        :type edge: int
+        :return: Number of boxes captured with this move (0-2). If it is 0, the other player is next.
+        :rtype: int
+        """
+        player = self.current_player
+        x, y, horizontal = self.edge_table.coordinates[edge]
+        self.set_line(x, y, horizontal, player)
+        self.line_hash ^= self.zobrist.lines[edge]
+        self.remove_free_line(edge)
+        self.update_surroundings(x, y, horizontal, 1)
+        # The line was free before, so a box with 4 lines around it now is captured by this move
+        captured = 0
+        if self.surroundings[x][y] == 4:
+            self.set_owner(x, y, player)
+            captured = 1
+        if horizontal == 1:
+            y += 1
+        else:
+            x += 1
+        if self.surroundings[x][y] == 4:
+            self.set_owner(x, y, player)
+            captured |= 2
+        self.undo_stack.append((edge << 3) | (captured << 1) | (player - 1))
+        count = (captured & 1) + (captured >> 1)
+        if count:
+            self.win_counter[player] += count
+        else:
+            self.current_player = 3 - player
+        self.moves_made += 1
+        self.remaining_moves -= 1
+        if self.remaining_moves == 0:
+            self.set_winner()
+        return count
+
+    def undo(self) -> None:
+        """
+        Take back the last move made with apply() in O(1).
+
+        :return: None
+        """
+        entry = self.undo_stack.pop()
+        player = (entry & 1) + 1
+        captured = (entry >> 1) & 3
+        edge = entry >> 3
+        x, y, horizontal = self.edge_table.coordinates[edge]
+        if captured & 1:
+            self.set_owner(x, y, 0)
+            self.win_counter[player] -= 1
+        if captured & 2:
+            if horizontal == 1:
+                self.set_owner(x, y + 1, 0)
+            else:
+                self.set_owner(x + 1, y, 0)
+            self.win_counter[player] -= 1
+        self.set_line(x, y, horizontal, 0)
+        self.line_hash ^= self.zobrist.lines[edge]
+        self.add_free_line(edge)
+        self.update_surroundings(x, y, horizontal, -1)
+        self.current_player = player
+        self.moves_made -= 1
+        self.remaining_moves += 1
+        self.winner = 0
+
+    def release_box(self, x: int, y: int) -> None:
+        """
+        Reset the owner of the box x, y (if any) and decrement the win_counter of that owner.
+
+        :param x: The x-coordinate of the box.
+        :type x: int
+        :param y: The y-coordinate of the box.
+        :type y: int
+        :return: None
+        """
+        owner = self.get_owner(x, y)
+        if owner > 0:
+            # TODO Maybe refactor this: Do not increment but count all fields instead
+            self.win_counter[owner] -= 1
+            self.set_owner(x, y, 0)
+
     def truncate_history(self) -> None:
         # Truncate history after current move
         self.move_history = self.move_history[:self.move_history_pointer]
 
+    def snapshot_boxes(self) -> Tuple[bytes, bytes, bytes]:
+        """
+        Copy the lines and owners of all boxes, see restore_boxes().
+
+        :return: The bytes of owners, lines_right and lines_below.
+        :rtype: Tuple[bytes, bytes, bytes]
+        """
+        return bytes(self.owners), bytes(self.lines_right), bytes(self.lines_below)
+
+    def restore_boxes(self, boxes: Tuple[bytes, bytes, bytes]) -> None:
+        """
+        Replace the lines and owners of all boxes with a copy created by snapshot_boxes().
+
+        :param boxes: The copy created by snapshot_boxes() of a board of the same size.
+        :type boxes: Tuple[bytes, bytes, bytes]
+        :return: None
+        """
+        owners, lines_right, lines_below = boxes
+        self.owners = bytearray(owners)
+        self.lines_right = bytearray(lines_right)
+        self.lines_below = bytearray(lines_below)
+        self.boxes = BoxesView(self)
+
+    def snapshot(self) -> GameBoardSnapshot:
+        """
+        Copy the current position (lines, owners, indexes, score and player to move) without the move history.
+
+        :return: The snapshot, see restore().
+        :rtype: GameBoardSnapshot
+        """
+        snapshot = GameBoardSnapshot()
+        snapshot.boxes = self.snapshot_boxes()
+        snapshot.surroundings = [column[:] for column in self.surroundings]
+        snapshot.free_lines = self.free_lines[:]
+        snapshot.free_line_positions = self.free_line_positions[:]
+        snapshot.capturable_boxes = dict(self.capturable_boxes)
+        snapshot.line_hash = self.line_hash
+        snapshot.current_player = self.current_player
+        snapshot.player_ai = dict(self.player_ai)
+        snapshot.winner = self.winner
+        snapshot.win_counter = dict(self.win_counter)
+        snapshot.moves_made = self.moves_made
+        snapshot.remaining_moves = self.remaining_moves
+        snapshot.last_move = self.last_move
+        snapshot.move_history_pointer = self.move_history_pointer
+        return snapshot
+
+    def restore_position(self, snapshot: GameBoardSnapshot) -> None:
+        """
+        Restore the position of a snapshot, but leave the move history as it is (see restore()). The undo_stack of
+        apply() is cleared.
+
+        :param snapshot: A snapshot of a board of the same size.
+        :type snapshot: GameBoardSnapshot
+        :return: None
+        """
+        self.restore_boxes(snapshot.boxes)
+        self.surroundings = [column[:] for column in snapshot.surroundings]
+        self.free_lines = snapshot.free_lines[:]
+        self.free_line_positions = snapshot.free_line_positions[:]
+        self.capturable_boxes = dict(snapshot.capturable_boxes)
+        self.line_hash = snapshot.line_hash
+        self.current_player = snapshot.current_player
+        self.player_ai = dict(snapshot.player_ai)
+        self.winner = snapshot.winner
+        self.win_counter = dict(snapshot.win_counter)
+        self.moves_made = snapshot.moves_made
+        self.remaining_moves = snapshot.remaining_moves
+        self.last_move = snapshot.last_move
+        self.undo_stack = []
+
+    def restore(self, snapshot: GameBoardSnapshot) -> None:
+        """
+        Restore the position of a snapshot that was taken from this board.
+
+        All moves made after the snapshot are removed from the move history, so the moves before the snapshot must
+        still be in the history (do not take back moves behind the snapshot before restoring it).
+
+        :param snapshot: A snapshot created by snapshot() of this board.
+        :type snapshot: GameBoardSnapshot
+        :return: None
+        """
+        if len(self.move_history) < snapshot.move_history_pointer:
+            raise GameboardException(
+                "Can not restore snapshot: The move history is shorter than the snapshot's move_history_pointer",
+                len(self.move_history),
+                snapshot.move_history_pointer
+            )
+        self.restore_position(snapshot)
+        del self.move_history[snapshot.move_history_pointer:]
+        self.move_history_pointer = snapshot.move_history_pointer
+
+    def clone_for_search(self) -> "GameBoard":
+        """
+        Create an independent copy of the current position for searches and background threads.
+
+        The clone has an empty move history. Moves made on the clone can be taken back with take_back_one_move() until
+        the position of this board is reached again.
+
+        :return: The new gameboard.
+        :rtype: GameBoard
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.size_x = self.size_x
+        board.size_y = self.size_y
+        board.verbose = self.verbose
+        board.edge_table = self.edge_table
+        board.zobrist = self.zobrist
+        board.restore_position(self.snapshot())
+        board.move_history = []
+        board.move_history_pointer = 0
+        return board
+
+    def encode(self) -> Tuple[Any, ...]:
+        """
+        Compact encoding of the position (lines, owners and player to move), e.g. to send it to another process. The
+        move history and player_ai are not part of the encoding.
+
+        :return: Tuple (size_x, size_y, current_player) followed by the copy of the boxes of snapshot_boxes().
+        :rtype: Tuple[Any, ...]
+        """
+        return (self.size_x, self.size_y, self.current_player) + self.snapshot_boxes()
+
+    @classmethod
+    def decode(cls, encoding: Tuple[Any, ...]) -> "GameBoard":
+        """
+        Create a gameboard from the encoding of a position, see encode().
+
+        :param encoding: The encoded position.
+        :type encoding: Tuple[Any, ...]
+        :return: The new gameboard with an empty move history.
+        :rtype: GameBoard
+        """
+        size_x, size_y, current_player = encoding[:3]
+        board = cls(size_x, size_y)
+        board.restore_boxes(encoding[3:])
+        for edge in board.edge_table.edges:
+            x, y, horizontal = board.edge_table.coordinates[edge]
+            if board.get_line(x, y, horizontal):
+                board.remove_free_line(edge)
+                board.update_surroundings(x, y, horizontal, 1)
+                board.line_hash ^= board.zobrist.lines[edge]
+                board.moves_made += 1
+                board.remaining_moves -= 1
+        for x in range(size_x):
+            for y in range(size_y):
+                owner = board.get_owner(x, y)
+                if owner:
+                    board.win_counter[owner] += 1
+        board.current_player = current_player
+        if board.remaining_moves == 0:
+            board.set_winner()
+        return board
+
     def is_valid_move(self, move: Move, ignore_current_selected_player: bool = False) -> bool:
         """
         Check if a move is valid, otherwise raise an InvalidMoveException.
@@ -268,7 +810,6 @@ class GameBoard:
                 )
         if move.x < 0 or move.x >= self.size_x or move.y < 0 or move.y >= self.size_y:
             raise InvalidMoveException("Invalid move: Bad coordinates", move.x, move.y, self.size_x, self.size_y)
-        box = self.boxes[move.x][move.y]
         if move.horizontal == 1:
             if move.y + 1 >= self.size_y:
                 raise InvalidMoveException(
@@ -278,7 +819,7 @@ class GameBoard:
                     self.size_x,
                     self.size_y
                 )
-            if box.line_below > 0:
+            if self.get_line(move.x, move.y, 1) > 0:
                 raise InvalidMoveException("Invalid move: Line below already occupied", move.x, move.y)
         else:
             if move.x + 1 >= self.size_x:
@@ -289,6 +830,6 @@ class GameBoard:
                     self.size_x,
                     self.size_y
                 )
-            if box.line_right > 0:
+            if self.get_line(move.x, move.y, 0) > 0:
                 raise InvalidMoveException("Invalid move: Line right already occupied", move.x, move.y)
         return True
@@ -0,0 +1,42 @@
+from typing import Dict, List, Optional, Tuple
+
+from kaese.gameboard.move import Move
+
+
+class GameBoardSnapshot:
+    """
+    Flat copy of the position state of a GameBoard, created by GameBoard.snapshot() and used by GameBoard.restore().
+
+    The move history is not copied, only the move_history_pointer is stored. The snapshot is independent of the
+    board, so it can be restored any number of times.
+
+    Attributes:
+        boxes (Tuple[bytes, bytes, bytes]): Copy of the lines and owners, see GameBoard.snapshot_boxes().
+        surroundings (List[List[int]]): Copy of GameBoard.surroundings.
+        free_lines (List[int]): Copy of GameBoard.free_lines.
+        free_line_positions (List[int]): Copy of GameBoard.free_line_positions.
+        capturable_boxes (Dict[int, int]): Copy of GameBoard.capturable_boxes.
+        line_hash (int): GameBoard.line_hash.
+        current_player (int): GameBoard.current_player.
+        player_ai (Dict[int, str]): Copy of GameBoard.player_ai.
+        winner (int): GameBoard.winner.
+        win_counter (Dict[int, int]): Copy of GameBoard.win_counter.
+        moves_made (int): GameBoard.moves_made.
+        remaining_moves (int): GameBoard.remaining_moves.
+        last_move (Optional[Move]): GameBoard.last_move (shared, not copied).
+        move_history_pointer (int): GameBoard.move_history_pointer.
+    """
+    boxes: Tuple[bytes, bytes, bytes]
+    surroundings: List[List[int]]
+    free_lines: List[int]
+    free_line_positions: List[int]
+    capturable_boxes: Dict[int, int]
+    line_hash: int
+    current_player: int
+    player_ai: Dict[int, str]
+    winner: int
+    win_counter: Dict[int, int]
+    moves_made: int
+    remaining_moves: int
+    last_move: Optional[Move]
+    move_history_pointer: int
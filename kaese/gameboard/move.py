@@ -1,10 +1,17 @@
 class Move:
-    """Dumb container for a move (holds coordinates of a line and player)"""
-    x: int = 0
-    y: int = 0
-    horizontal: int = 0  # horizontal=0 represents a vertical line, horizontal=1 represents a horizontal line
-    player: int = 0
-    player_ai: str = ""
+    """
+    Dumb container for a move (holds coordinates of a line and player)
+
+    The GameBoard and the AIs work on integer edge numbers internally (see GameBoard.get_edge() and EdgeTable), Move
+    objects are only created at the API boundary (e.g. GameBoard.edge_to_move()), so the class uses __slots__.
+    """
+    __slots__ = ("x", "y", "horizontal", "player", "player_ai")
+
+    x: int
+    y: int
+    horizontal: int  # horizontal=0 represents a vertical line, horizontal=1 represents a horizontal line
+    player: int
+    player_ai: str
 
     def __init__(self, x: int, y: int, horizontal: int, player: int = 0, player_ai: str = ""):
         self.x = x
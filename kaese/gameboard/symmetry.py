@@ -0,0 +1,200 @@
+from functools import lru_cache
+from typing import Callable, List, Set, Tuple
+
+from kaese.gameboard.edges import get_edge_table
+from kaese.gameboard.gameboard import GameBoard
+
+# Box transformations (x, y, size_x, size_y) -> (x, y) of the symmetry group of the gameboard. The first four are
+# symmetries of every board, the last four only of square boards.
+BOX_TRANSFORMATIONS: List[Tuple[str, Callable[[int, int, int, int], Tuple[int, int]]]] = [
+    ("identity", lambda x, y, sx, sy: (x, y)),
+    ("mirror_x", lambda x, y, sx, sy: (sx - 1 - x, y)),
+    ("mirror_y", lambda x, y, sx, sy: (x, sy - 1 - y)),
+    ("rotate_180", lambda x, y, sx, sy: (sx - 1 - x, sy - 1 - y)),
+    ("transpose", lambda x, y, sx, sy: (y, x)),
+    ("rotate_90", lambda x, y, sx, sy: (sy - 1 - y, x)),
+    ("rotate_270", lambda x, y, sx, sy: (y, sx - 1 - x)),
+    ("anti_transpose", lambda x, y, sx, sy: (sy - 1 - y, sx - 1 - x)),
+]
+
+
+class SymmetryTable:
+    """
+    Precomputed mappings of the edge numbers (see GameBoard.get_edge()) for all symmetries of one board size.
+
+    A square board has 8 symmetries, a rectangular one 4. Symmetry 0 is always the identity. Every line lies between
+    two boxes, so a line is mapped by mapping both boxes next to it.
+
+    Positions are handled as line masks: bit number edge is set if the line with that edge number is drawn, see
+    get_line_mask().
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        names (List[str]): Name of every symmetry.
+        edge_maps (List[List[int]]): Per symmetry, the mapped edge number per edge number (-1 for edge numbers of
+            lines that do not exist).
+        inverse (List[int]): Per symmetry, the index of the symmetry that reverts it.
+    """
+    size_x: int
+    size_y: int
+    names: List[str]
+    edge_maps: List[List[int]]
+    inverse: List[int]
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        self.size_x = size_x
+        self.size_y = size_y
+        self.names = []
+        self.edge_maps = []
+        edge_table = get_edge_table(size_x, size_y)
+        transformations = BOX_TRANSFORMATIONS if size_x == size_y else BOX_TRANSFORMATIONS[:4]
+        for name, transformation in transformations:
+            edge_map = [-1] * (size_x * size_y * 2)
+            for edge in edge_table.edges:
+                boxes = []
+                for box_nr in edge_table.adjacent_boxes[edge]:
+                    x, y = transformation(box_nr // size_y, box_nr % size_y, size_x, size_y)
+                    boxes.append(x * size_y + y)
+                # The line below/right of the box with the lower number is the line between both boxes
+                box_nr = min(boxes)
+                edge_map[edge] = (box_nr << 1) | (1 if abs(boxes[0] - boxes[1]) == 1 else 0)
+            self.names.append(name)
+            self.edge_maps.append(edge_map)
+        self.inverse = []
+        for edge_map in self.edge_maps:
+            for index, other_map in enumerate(self.edge_maps):
+                if all(other_map[edge_map[edge]] == edge for edge in edge_table.edges):
+                    self.inverse.append(index)
+                    break
+
+    def transform_mask(self, line_mask: int, symmetry: int) -> int:
+        """
+        Map a line mask with one symmetry.
+
+        :param line_mask: The line mask, see get_line_mask().
+        :type line_mask: int
+        :param symmetry: Index of the symmetry.
+        :type symmetry: int
+        :return: The mapped line mask.
+        :rtype: int
+        """
+        if symmetry == 0:
+            return line_mask
+        edge_map = self.edge_maps[symmetry]
+        result = 0
+        while line_mask:
+            lowest_bit = line_mask & -line_mask
+            result |= 1 << edge_map[lowest_bit.bit_length() - 1]
+            line_mask ^= lowest_bit
+        return result
+
+    def canonical(self, line_mask: int) -> Tuple[int, int]:
+        """
+        Get the canonical orientation of a position: the smallest line mask of all its symmetric positions.
+
+        Symmetric positions have the same canonical line mask, so it can be used as key for caches and opening books.
+        Use map_edge() with the returned symmetry to map moves into the canonical orientation and unmap_edge() to map
+        them back.
+
+        :param line_mask: The line mask, see get_line_mask().
+        :type line_mask: int
+        :return: Tuple of the canonical line mask and the index of the symmetry that maps the position to it.
+        :rtype: Tuple[int, int]
+        """
+        best_mask = line_mask
+        best_symmetry = 0
+        for symmetry in range(1, len(self.edge_maps)):
+            mask = self.transform_mask(line_mask, symmetry)
+            if mask < best_mask:
+                best_mask = mask
+                best_symmetry = symmetry
+        return best_mask, best_symmetry
+
+    def map_edge(self, edge: int, symmetry: int) -> int:
+        """
+        Map the edge number of a line with one symmetry (e.g. from the position to its canonical orientation).
+
+        :param edge: The edge number.
+        :type edge: int
+        :param symmetry: Index of the symmetry.
+        :type symmetry: int
+        :return: The mapped edge number.
+        :rtype: int
+        """
+        return self.edge_maps[symmetry][edge]
+
+    def unmap_edge(self, edge: int, symmetry: int) -> int:
+        """
+        Map the edge number of a line back with the inverse of one symmetry (e.g. from the canonical orientation).
+
+        :param edge: The mapped edge number.
+        :type edge: int
+        :param symmetry: Index of the symmetry that was used for mapping.
+        :type symmetry: int
+        :return: The original edge number.
+        :rtype: int
+        """
+        return self.edge_maps[self.inverse[symmetry]][edge]
+
+    def get_stabilizer(self, line_mask: int) -> List[int]:
+        """
+        Get the symmetries that map the position onto itself.
+
+        :param line_mask: The line mask, see get_line_mask().
+        :type line_mask: int
+        :return: List of the indexes of these symmetries, the identity (0) is always included.
+        :rtype: List[int]
+        """
+        return [symmetry for symmetry in range(len(self.edge_maps))
+                if self.transform_mask(line_mask, symmetry) == line_mask]
+
+    def get_unique_edges(self, line_mask: int, edges: List[int]) -> List[int]:
+        """
+        Remove the moves that lead to the same position as another move, up to symmetry.
+
+        Only symmetries that map the current position onto itself are used, so the returned moves lead to the same
+        game values as the removed ones.
+
+        :param line_mask: The line mask of the current position, see get_line_mask().
+        :type line_mask: int
+        :param edges: The edge numbers of the moves (e.g. GameBoard.free_lines).
+        :type edges: List[int]
+        :return: One edge number for every class of equivalent moves, in the order of edges.
+        :rtype: List[int]
+        """
+        stabilizer = self.get_stabilizer(line_mask)
+        if len(stabilizer) == 1:
+            return list(edges)
+        seen: Set[int] = set()
+        unique_edges = []
+        for edge in edges:
+            if edge in seen:
+                continue
+            unique_edges.append(edge)
+            for symmetry in stabilizer:
+                seen.add(self.edge_maps[symmetry][edge])
+        return unique_edges
+
+
+@lru_cache(maxsize=None)
+def get_symmetry_table(size_x: int, size_y: int) -> SymmetryTable:
+    """Return the (cached) SymmetryTable for the given board size."""
+    return SymmetryTable(size_x, size_y)
+
+
+def get_line_mask(gb: GameBoard) -> int:
+    """
+    Get the line mask of the position on the gameboard: bit number edge is set if the line is drawn.
+
+    :param gb: The gameboard.
+    :type gb: GameBoard
+    :return: The line mask.
+    :rtype: int
+    """
+    free_line_positions = gb.free_line_positions
+    line_mask = 0
+    for edge in gb.edge_table.edges:
+        if free_line_positions[edge] < 0:
+            line_mask |= 1 << edge
+    return line_mask
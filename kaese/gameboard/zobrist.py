@@ -0,0 +1,38 @@
+from functools import lru_cache
+from typing import List
+import random
+
+
+class ZobristTable:
+    """
+    Random 64-bit keys for the Zobrist hash of the positions on one board size.
+
+    The hash of a position is the XOR of the keys of all drawn lines, XORed with side_to_move if player 2 is the
+    current player. Who has drawn a line does not matter for the rest of the game, so it is not part of the hash.
+
+    The keys are generated from a fixed seed, so the same position has the same hash in every process (e.g. for
+    caches that are written to disk or shared with worker processes).
+
+    Attributes:
+        size_x (int): Size of the gameboard in "boxes".
+        size_y (int): Size of the gameboard in "boxes".
+        lines (List[int]): Key per edge number (see GameBoard.get_edge()).
+        side_to_move (int): Key that is XORed into the hash if player 2 is the current player.
+    """
+    size_x: int
+    size_y: int
+    lines: List[int]
+    side_to_move: int
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        self.size_x = size_x
+        self.size_y = size_y
+        rng = random.Random("kaese-zobrist-%dx%d" % (size_x, size_y))
+        self.lines = [rng.getrandbits(64) for _ in range(size_x * size_y * 2)]
+        self.side_to_move = rng.getrandbits(64)
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_table(size_x: int, size_y: int) -> ZobristTable:
+    """Return the (cached) ZobristTable for the given board size."""
+    return ZobristTable(size_x, size_y)
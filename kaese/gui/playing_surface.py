@@ -137,7 +137,7 @@ class PlayingSurface:
         # Draw boxes in player colours
         for x in range(0, boxes_count_x):
             for y in range(0, boxes_count_y):
-                owner = self.gui.gb.boxes[x][y].owner
+                owner = self.gui.gb.get_owner(x, y)
                 if owner == 1:
                     square_color = self.theme.gui_player_1_color
                 elif owner == 2:
@@ -159,7 +159,7 @@ class PlayingSurface:
                             and self.gui.gb.last_move.horizontal == 0:
                         player_1_color = self.theme.playing_surface_line_player_1_last_move_color
                         player_2_color = self.theme.playing_surface_line_player_2_last_move_color
-                    owner = self.gui.gb.boxes[x][y].line_right
+                    owner = self.gui.gb.get_line(x, y, 0)
                     if owner == 1:
                         line_color = player_1_color
                     elif owner == 2:
@@ -180,7 +180,7 @@ class PlayingSurface:
                             and self.gui.gb.last_move.horizontal == 1:
                         player_1_color = self.theme.playing_surface_line_player_1_last_move_color
                         player_2_color = self.theme.playing_surface_line_player_2_last_move_color
-                    owner = self.gui.gb.boxes[x][y].line_below
+                    owner = self.gui.gb.get_line(x, y, 1)
                     if owner == 1:
                         line_color = player_1_color
                     elif owner == 2:
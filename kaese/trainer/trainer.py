@@ -5,13 +5,8 @@ import pygame
 import logging
 import threading
 
-import kaese.ai.better_ai
-import kaese.ai.cluster_ai
-import kaese.ai.normal_ai
-import kaese.ai.random_ai
-import kaese.ai.simple_ai
-import kaese.ai.stupid_ai
 import kaese.ai.tree_ai
+from kaese.ai.ai_session import AISession
 from kaese.gameboard.gameboard import GameBoard
 from kaese.gameboard.move import Move
 from kaese.gui.abstract_gui import AbstractGui
@@ -44,11 +39,15 @@ class Gui(AbstractGui):
     running: bool
     ai_timer: int
 
+    ai_session: AISession  # one AI instance per player, kept for the whole game
+
     ai_thread: Optional[threading.Thread]
     ai_thread_start_time: Any  # Is this int? Or something like pygame.milliseconds?
     running_tree_ai: Optional[kaese.ai.tree_ai.TreeAI]
     tree_ai_move: Optional[Move]
     tree_ai_max_moves: int
+    tree_ai_time_budget: Optional[float]
+    tree_ai_workers: int
 
     screen_width: int
     screen_height: int
@@ -90,7 +89,9 @@ class Gui(AbstractGui):
             player1: str = "Human",
             player2: str = "Human",
             tree_ai_max_moves: int = 8,
-            verbose: Union[bool, int] = False
+            verbose: Union[bool, int] = False,
+            tree_ai_time_budget: Optional[float] = None,
+            tree_ai_workers: int = 0
     ) -> None:
         # Get Parameters
         self.theme = theme
@@ -98,6 +99,8 @@ class Gui(AbstractGui):
         self.player1 = player1
         self.player2 = player2
         self.tree_ai_max_moves = tree_ai_max_moves
+        self.tree_ai_time_budget = tree_ai_time_budget
+        self.tree_ai_workers = tree_ai_workers
         self.verbose = verbose
 
         # Init Gameboard
@@ -111,6 +114,7 @@ class Gui(AbstractGui):
         self.running = False
         self.ai_timer = 0
 
+        self.ai_session = self.create_ai_session()
         self.ai_thread = None
         self.ai_thread_start_time = None
         self.running_tree_ai = None
@@ -478,15 +482,15 @@ class Gui(AbstractGui):
             font_color=player_color
         ).draw()
 
-        if self.ai_thread and self.running_tree_ai and self.running_tree_ai.cnt_move_nr:
+        stats = self.running_tree_ai.published_stats if self.running_tree_ai else None
+        if self.ai_thread and stats and stats.cnt_move_nr:
             TextBox(
                 self.theme,
                 self.screen,
                 pos_next_up_box_x + box_next_up_width + 10, pos_row_2_y + 2, box_next_up_width, box_height - 4,
                 1,
                 text_left="...",
-                text_right="Test move %d/%d"
-                           % (self.running_tree_ai.cnt_move_nr, self.running_tree_ai.cnt_valid_moves),
+                text_right="Depth %d, move %d/%d" % (stats.depth, stats.cnt_move_nr, stats.cnt_valid_moves),
                 font_size=smaller_font_size,
                 font_color=player_color
             ).draw()
@@ -557,6 +561,7 @@ class Gui(AbstractGui):
             return
         self.gb.make_move(move)
         self.gb.last_move = Move(move.x, move.y, move.horizontal, move.player, move.player_ai)
+        self.ai_session.notify_move(self.gb, move)
         self.check_game_state()
 
     def check_game_state(self) -> None:
@@ -641,28 +646,8 @@ class Gui(AbstractGui):
         current_player = self.gb.current_player
         player_ai = self.gb.player_ai[current_player]
         try:
-            if player_ai == "StupidAI":
-                ai = kaese.ai.stupid_ai.StupidAI(self.verbose)
-                move = ai.get_next_move(self.gb, current_player)
-                self.make_move(move)
-            elif player_ai == "RandomAI":
-                ai = kaese.ai.random_ai.RandomAI(self.verbose)
-                move = ai.get_next_move(self.gb, current_player)
-                self.make_move(move)
-            elif player_ai == "SimpleAI":
-                ai = kaese.ai.simple_ai.SimpleAI(self.verbose)
-                move = ai.get_next_move(self.gb, current_player)
-                self.make_move(move)
-            elif player_ai == "NormalAI":
-                ai = kaese.ai.normal_ai.NormalAI(self.verbose)
-                move = ai.get_next_move(self.gb, current_player)
-                self.make_move(move)
-            elif player_ai == "BetterAI":
-                ai = kaese.ai.better_ai.BetterAI(self.verbose)
-                move = ai.get_next_move(self.gb, current_player)
-                self.make_move(move)
-            elif player_ai == "ClusterAI":
-                ai = kaese.ai.cluster_ai.ClusterAI(self.verbose)
+            if player_ai in ["StupidAI", "RandomAI", "SimpleAI", "NormalAI", "BetterAI", "ClusterAI"]:
+                ai = self.ai_session.get_ai(current_player, player_ai)
                 move = ai.get_next_move(self.gb, current_player)
                 self.make_move(move)
             elif player_ai == "TreeAI":
@@ -717,8 +702,18 @@ class Gui(AbstractGui):
             # Disable AI, reset to Human player
             self.update_player_ai(current_player, "Human")
 
+    def create_ai_session(self) -> AISession:
+        """Create the AISession for a new game, with the settings of the TreeAI"""
+        return AISession(self.verbose, {
+            "TreeAI": {
+                "max_moves": self.tree_ai_max_moves,
+                "time_budget": self.tree_ai_time_budget,
+                "workers": self.tree_ai_workers
+            }
+        })
+
     def run_tree_ai(self) -> None:
-        self.running_tree_ai = kaese.ai.tree_ai.TreeAI(self.verbose, self.tree_ai_max_moves)
+        self.running_tree_ai = self.ai_session.get_ai(self.gb.current_player, "TreeAI")
         try:
             move = self.running_tree_ai.get_next_move(self.gb, self.gb.current_player)
             if not self.running_tree_ai.killed:
@@ -739,8 +734,10 @@ class Gui(AbstractGui):
             )
 
     def kill_tree_ai(self) -> None:
-        if self.running_tree_ai:
+        if self.running_tree_ai and self.ai_thread and self.ai_thread.is_alive():
             self.running_tree_ai.killed = True
+            # The killed search is still running in its thread, the next search needs a new TreeAI instance
+            self.ai_session.discard(self.running_tree_ai)
         self.ai_thread = None
 
     def callback_popup_window_dismiss_button(self) -> None:
@@ -782,6 +779,7 @@ class Gui(AbstractGui):
 
             self.gb.last_move = None
             self.kill_tree_ai()
+            self.ai_session.reset()
 
             self.popup_windows_queue.pop()
 
@@ -812,6 +810,7 @@ class Gui(AbstractGui):
 
             self.kill_tree_ai()
             self.gb = Savegames.load_game(filename, reset_players_to_human=True, verbose=self.verbose)
+            self.ai_session.reset()
             self.update_player_ai(1, self.gb.player_ai[1])
             self.update_player_ai(2, self.gb.player_ai[2])
 
@@ -900,6 +899,7 @@ class Gui(AbstractGui):
             self.kill_tree_ai()
             # Take back one move
             self.gb.take_back_one_move()
+            self.ai_session.notify_take_back(self.gb, self.gb.move_history[self.gb.move_history_pointer])
 
     def callback_forward_button(self) -> None:
         """Called, when History-Forward button was clicked"""
@@ -913,6 +913,7 @@ class Gui(AbstractGui):
                 # Make the move again
                 self.gb.make_move(move, skip_append_to_history=True, ignore_current_selected_player=True)
                 self.gb.last_move = move
+                self.ai_session.notify_move(self.gb, move)
                 self.check_game_state()
                 self.gb.move_history_pointer += 1
             except Exception as err:
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+from kaese.ai.ai_exception import AIException
+from kaese.ai.ai_session import AISession
+from kaese.ai.cluster_analysis import get_clusters
+from kaese.gameboard.gameboard import GameBoard
+from kaese.savegames.savegames import Savegames
+
+
+class TestAISession(unittest.TestCase):
+    def test_get_ai(self):
+        session = AISession(ai_kwargs={"TreeAI": {"max_moves": 4}})
+        ai = session.get_ai(1, "ClusterAI")
+        self.assertIs(session.get_ai(1, "ClusterAI"), ai)
+        self.assertIsNot(session.get_ai(2, "ClusterAI"), ai)
+
+        tree_ai = session.get_ai(1, "TreeAI")
+        self.assertEqual(tree_ai.__class__.__name__, "TreeAI")
+        self.assertEqual(tree_ai.max_moves, 4)
+
+        session.discard(tree_ai)
+        self.assertIsNot(session.get_ai(1, "TreeAI"), tree_ai)
+
+        session.reset()
+        self.assertEqual(session.ais, {})
+
+        with self.assertRaises(AIException):
+            session.get_ai(1, "Human")
+
+    def test_ai_classes(self):
+        # Every AI of the session survives a savegame
+        for player_ai in AISession.ai_classes:
+            gb = Savegames.from_json({"size_x": 3, "size_y": 3, "player_ai": {"1": player_ai, "2": player_ai}})
+            self.assertEqual(gb.player_ai, {1: player_ai, 2: player_ai})
+
+    def test_play_game_with_history_navigation(self):
+        random.seed(4)
+        session = AISession()
+        gb = GameBoard(5, 5)
+        gb.player_ai = {1: "ClusterAI", 2: "BetterAI"}
+        cluster_ai = session.get_ai(1, "ClusterAI")
+        taken_back = False
+        while gb.winner == 0:
+            player = gb.current_player
+            move = session.get_ai(player, gb.player_ai[player]).get_next_move(gb, player)
+            gb.make_move(move, print_it=False)
+            session.notify_move(gb, move)
+            # The cluster cache follows the moves of both players, once ClusterAI has needed it
+            if cluster_ai.cluster_cache is not None:
+                self.assertEqual(cluster_ai.cluster_cache.line_hash, gb.line_hash)
+
+            if not taken_back and cluster_ai.cluster_cache is not None:
+                taken_back = True
+                for _ in range(5):
+                    gb.take_back_one_move()
+                    session.notify_take_back(gb, gb.move_history[gb.move_history_pointer])
+                    self.assertEqual(cluster_ai.cluster_cache.line_hash, gb.line_hash)
+                gb.truncate_history()
+
+        self.assertTrue(taken_back)
+        self.assertIs(session.get_ai(1, "ClusterAI"), cluster_ai)
+        clusters = cluster_ai.cluster_cache.update(gb)
+        self.assertEqual(sorted(c.boxes for c in clusters), sorted(c.boxes for c in get_clusters(gb)))
+
+
+if __name__ == '__main__':
+    unittest.main()
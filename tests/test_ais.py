@@ -1,13 +1,16 @@
 import unittest
+import gc
+import random
 import re
 import importlib.util
+from kaese.ai import position_features
 from kaese.gameboard.gameboard import GameBoard
 from kaese.gameboard.move import Move
 
 
 class TestAIs(unittest.TestCase):
     def test_make_move(self):
-        ai_classes = ["BetterAI", "ClusterAI", "NormalAI", "RandomAI", "SimpleAI", "StupidAI", "TreeAI"]
+        ai_classes = ["BetterAI", "ClusterAI", "MctsAI", "NormalAI", "RandomAI", "SimpleAI", "StupidAI", "TreeAI"]
         for ai_class in ai_classes:
             ai = self.getAi(ai_class)
 
@@ -131,6 +134,61 @@ class TestAIs(unittest.TestCase):
                 self.assertEqual(move.horizontal, 1)
             self.assertEqual(move.player, 1)
 
+    def test_field_with_count_of_surroundings(self):
+        game_board = GameBoard(size_x=3, size_y=4)
+        game_board.make_move(Move(1, 1, 0, 1, "Human"), False)
+        matrix = self.getAi("NormalAI").get_field_with_count_of_surroundings(game_board)
+        self.assertEqual(matrix, game_board.surroundings)
+        # The matrix is a copy, changing it does not change the gameboard
+        matrix[1][1] = 4
+        self.assertEqual(game_board.surroundings[1][1], 1)
+
+    def test_get_next_moves(self):
+        ai_classes = ["BetterAI", "ClusterAI", "NormalAI", "RandomAI", "SimpleAI", "StupidAI"]
+        for ai_class in ai_classes:
+            games = []
+            for batch in [False, True]:
+                ai = self.getAi(ai_class)
+                position_features.features_cache.clear()
+                random.seed(7)
+                boards = [GameBoard(size_x=3 + i % 3, size_y=4) for i in range(12)]
+                for game_board in boards:
+                    game_board.player_ai = {1: ai_class, 2: ai_class}
+                # Advance all games together, the finished games are left out
+                while True:
+                    running = [game_board for game_board in boards if game_board.winner == 0]
+                    if not running:
+                        break
+                    if batch:
+                        moves = ai.get_next_moves(running)
+                    else:
+                        moves = [ai.get_next_move(game_board, game_board.current_player) for game_board in running]
+                    self.assertEqual(len(moves), len(running))
+                    for game_board, move in zip(running, moves):
+                        self.assertEqual(move.player, game_board.current_player)
+                        game_board.make_move(move, print_it=False)
+                games.append([[(m.x, m.y, m.horizontal, m.player) for m in game_board.move_history]
+                              for game_board in boards])
+            # The batch moves are the same as the moves of get_next_move()
+            self.assertEqual(games[0], games[1], msg=ai_class)
+
+    def test_cluster_ai_batch_caches(self):
+        ai = self.getAi("ClusterAI")
+        random.seed(3)
+        boards = [GameBoard(size_x=3, size_y=3) for _ in range(4)]
+        for game_board in boards:
+            game_board.player_ai = {1: "ClusterAI", 2: "ClusterAI"}
+        ai.get_next_moves(boards)
+        # Every board has its own cache, also if a later call passes the boards in another order
+        ai.get_next_moves(boards[::-1][:2])
+        self.assertEqual(set(ai.batch_cluster_caches.keys()), set(boards))
+        self.assertIsNone(ai.cluster_cache)
+        # The caches are dropped together with the boards (the features of the last positions refer to them, too)
+        del boards, game_board
+        position_features.features_cache.clear()
+        gc.collect()
+        self.assertEqual(len(ai.batch_cluster_caches), 0)
+
     @staticmethod
     def getAi(ai_class):
         # Import the AI class dynamically
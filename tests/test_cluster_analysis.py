@@ -0,0 +1,160 @@
+import random
+import unittest
+
+from kaese.ai.cluster_ai import ClusterAI
+from kaese.ai.cluster_analysis import CHAIN, LOOP, Cluster, ClusterCache, get_clusters
+from kaese.ai.endgame_solver import EndgameSolver
+from kaese.ai.move_ordering import SAFE_MOVE, MoveOrdering
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+
+class TestClusterAnalysis(unittest.TestCase):
+    @staticmethod
+    def random_position(size_x, size_y, cnt_moves):
+        gb = GameBoard(size_x, size_y)
+        for _ in range(cnt_moves):
+            gb.apply(random.choice(gb.free_lines))
+        return gb
+
+    def assert_valid_clusters(self, gb, clusters):
+        size_y = gb.size_y
+        two_sided = {x * size_y + y for x in range(gb.size_x) for y in range(size_y) if gb.surroundings[x][y] == 2}
+        boxes = [box for cluster in clusters for box in cluster.boxes]
+        # Every box with two free lines is part of exactly one cluster
+        self.assertEqual(sorted(boxes), sorted(two_sided))
+        for cluster in clusters:
+            self.assertEqual(len(cluster.edges), cluster.size + (1 if cluster.kind == CHAIN else 0))
+            for i, box in enumerate(cluster.boxes):
+                # The lines in front of and behind every box are free lines of the box
+                behind = cluster.edges[(i + 1) % len(cluster.edges)]
+                for edge in (cluster.edges[i], behind):
+                    self.assertGreaterEqual(gb.free_line_positions[edge], 0)
+                    self.assertIn(box, gb.edge_table.adjacent_boxes[edge])
+            if cluster.kind == CHAIN:
+                for end in cluster.ends:
+                    self.assertNotIn(end, two_sided)
+                self.assertIn(cluster.ends[0], gb.edge_table.adjacent_boxes[cluster.edges[0]])
+                self.assertIn(cluster.ends[1], gb.edge_table.adjacent_boxes[cluster.edges[-1]])
+            else:
+                self.assertEqual(cluster.ends, (-1, -1))
+
+    def test_random_positions(self):
+        for seed in range(100):
+            random.seed(seed)
+            size_x, size_y = random.randint(2, 8), random.randint(2, 8)
+            gb = self.random_position(size_x, size_y, random.randrange(2 * size_x * size_y - size_x - size_y))
+            self.assert_valid_clusters(gb, get_clusters(gb))
+
+    def test_same_as_endgame_solver(self):
+        solver = EndgameSolver()
+        cnt_positions = 0
+        for seed in range(300):
+            random.seed(seed)
+            gb = GameBoard(5, 5)
+            # Draw safe lines until no safe line is left
+            safe_lines = gb.free_lines[:]
+            while safe_lines:
+                edge = safe_lines.pop(random.randrange(len(safe_lines)))
+                if MoveOrdering.get_move_class(gb, edge) == SAFE_MOVE:
+                    gb.apply(edge)
+            position = solver.get_position(gb)
+            if position is None:
+                continue
+            cnt_positions += 1
+            clusters = get_clusters(gb)
+            self.assert_valid_clusters(gb, clusters)
+            self.assertEqual(sorted(c.size for c in clusters if c.kind == LOOP),
+                             sorted(len(edges) for edges in position.loops))
+            # Chains of the solver without boxes are lines between two junctions
+            self.assertEqual(sorted(c.size for c in clusters if c.kind == CHAIN),
+                             sorted(len(edges) - 1 for _, _, edges in position.chains if len(edges) > 1))
+        self.assertGreater(cnt_positions, 50)
+
+    def test_long_chain(self):
+        # A chain that snakes through all columns of a large board, its first and last box can be captured
+        gb = GameBoard(50, 50)
+        for x in range(49):
+            for y in range(50):
+                if not (x % 2 == 0 and y == 49) and not (x % 2 == 1 and y == 0):
+                    gb.apply(gb.get_edge(x, y, 0))
+        clusters = get_clusters(gb)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0].kind, CHAIN)
+        self.assertEqual(clusters[0].size, 50 * 50 - 2)
+
+    @staticmethod
+    def get_cluster_set(clusters):
+        return {(c.kind, frozenset(c.boxes), frozenset(c.edges)) for c in clusters}
+
+    def test_cluster_cache(self):
+        for seed in range(20):
+            random.seed(seed)
+            gb = GameBoard(6, 5)
+            cache = ClusterCache(gb)
+            while gb.free_lines:
+                # Mostly draw lines, sometimes take some back
+                if gb.undo_stack and random.random() < 0.2:
+                    for _ in range(random.randint(1, min(3, len(gb.undo_stack)))):
+                        gb.undo()
+                else:
+                    for _ in range(random.randint(1, 2)):
+                        if gb.free_lines:
+                            gb.apply(random.choice(gb.free_lines))
+                clusters = cache.update(gb)
+                self.assert_valid_clusters(gb, clusters)
+                self.assertEqual(self.get_cluster_set(clusters), self.get_cluster_set(get_clusters(gb)))
+                for cluster in clusters:
+                    for box in cluster.boxes:
+                        self.assertIs(cache.box_clusters[box], cluster)
+
+        # Another game: the clusters are built from scratch
+        other = self.random_position(6, 5, 40)
+        self.assertEqual(self.get_cluster_set(cache.update(other)), self.get_cluster_set(get_clusters(other)))
+
+    def test_update_line(self):
+        for seed in range(10):
+            random.seed(seed)
+            gb = GameBoard(6, 5)
+            cache = ClusterCache(gb)
+            while gb.free_lines:
+                # One line at a time, drawn or taken back
+                if gb.undo_stack and random.random() < 0.2:
+                    edge = gb.undo_stack[-1] >> 3
+                    gb.undo()
+                else:
+                    edge = random.choice(gb.free_lines)
+                    gb.apply(edge)
+                cache.update_line(gb, edge)
+                self.assertEqual(cache.free_lines, set(gb.free_lines))
+                clusters = list(cache.clusters.values())
+                self.assertEqual(self.get_cluster_set(clusters), self.get_cluster_set(get_clusters(gb)))
+
+        # A line that does not follow the position of the cache: the free lines are compared
+        other = self.random_position(6, 5, 40)
+        cache.update_line(other, other.undo_stack[-1] >> 3)
+        self.assertEqual(cache.free_lines, set(other.free_lines))
+        self.assertEqual(self.get_cluster_set(cache.clusters.values()), self.get_cluster_set(get_clusters(other)))
+
+    def test_opening_edge(self):
+        self.assertEqual(Cluster(CHAIN, [1, 2], [10, 11, 12], (0, 3)).get_opening_edge(), 11)
+        self.assertEqual(Cluster(CHAIN, [1, 2, 3], [10, 11, 12, 13], (0, 4)).get_opening_edge(), 10)
+        self.assertEqual(Cluster(LOOP, [1, 2, 3, 4], [10, 11, 12, 13]).get_opening_edge(), 10)
+
+    def test_smallest_cluster(self):
+        # 3x3 board: a loop of the 4 boxes x 0-1, y 0-1 and a chain of the boxes 2,1, 2,2 and 1,2 between the boxes
+        # 2,0 and 0,2
+        gb = GameBoard(3, 3)
+        for x, y, horizontal in [(1, 0, 0), (1, 1, 0), (0, 1, 1), (1, 1, 1)]:
+            gb.apply(gb.get_edge(x, y, horizontal))
+        clusters = get_clusters(gb)
+        self.assertEqual(sorted((c.kind, c.size) for c in clusters), [(CHAIN, 3), (LOOP, 4)])
+        chain = [c for c in clusters if c.kind == CHAIN][0]
+        self.assertEqual(sorted(chain.ends), [2, 6])
+        move = ClusterAI().get_best_cluster_move(gb, gb.current_player, "ClusterAI")
+        self.assertIsInstance(move, Move)
+        self.assertIn(gb.get_edge(move.x, move.y, move.horizontal), chain.edges)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import random
+import time
+import unittest
+
+from kaese.ai.endgame_solver import EndgameSolver, get_canonical_key
+from kaese.ai.tree_ai import TreeAI
+from kaese.gameboard.gameboard import GameBoard
+
+
+class TestEndgameSolver(unittest.TestCase):
+    @staticmethod
+    def create_loony_board(size_x, size_y, seed):
+        # Draw the lines in random order, as long as they do not give a box to the opponent
+        random.seed(seed)
+        gb = GameBoard(size_x, size_y)
+        edges = gb.free_lines[:]
+        random.shuffle(edges)
+        for edge in edges:
+            box_1, box_2 = gb.edge_table.adjacent_boxes[edge]
+            if (gb.surroundings[box_1 // size_y][box_1 % size_y] < 2
+                    and gb.surroundings[box_2 // size_y][box_2 % size_y] < 2):
+                gb.apply(edge)
+        return gb
+
+    @staticmethod
+    def create_loops_board(size_x, size_y):
+        # Only the lines inside of blocks of 2x2 boxes are free, every block is a loop of four boxes
+        gb = GameBoard(size_x, size_y)
+        for edge in gb.free_lines[:]:
+            x, y, horizontal = gb.edge_table.coordinates[edge]
+            if not ((horizontal == 0 and x % 2 == 0) or (horizontal == 1 and y % 2 == 0)):
+                gb.apply(edge)
+        return gb
+
+    @staticmethod
+    def exhaustive_search(gb, cache):
+        # Boxes of the player to move minus boxes of the opponent, for all boxes that are not owned yet
+        if not gb.free_lines:
+            return 0
+        value = cache.get(gb.line_hash)
+        if value is None:
+            values = []
+            for edge in gb.free_lines[:]:
+                values.append(TestEndgameSolver.get_edge_value(gb, edge, cache))
+            value = max(values)
+            cache[gb.line_hash] = value
+        return value
+
+    @staticmethod
+    def get_edge_value(gb, edge, cache):
+        captured = gb.apply(edge)
+        if captured:
+            value = captured + TestEndgameSolver.exhaustive_search(gb, cache)
+        else:
+            value = -TestEndgameSolver.exhaustive_search(gb, cache)
+        gb.undo()
+        return value
+
+    def test_get_position(self):
+        gb = self.create_loops_board(6, 4)
+        position = EndgameSolver.get_position(gb)
+        self.assertEqual(position.get_key(), ((4, 4, 4, 4, 4, 4), ()))
+        self.assertEqual(sorted(edge for edges in position.loops for edge in edges), sorted(gb.free_lines))
+
+        gb = self.create_loony_board(5, 5, 2)
+        position = EndgameSolver.get_position(gb)
+        edges = [edge for edges in position.loops for edge in edges]
+        edges += [edge for _, _, chain_edges in position.chains for edge in chain_edges]
+        self.assertEqual(sorted(edges), sorted(gb.free_lines))
+        # Every box that is not owned yet is part of a loop, a chain or a junction
+        junctions = set(junction for chain in position.chains for junction in chain[:2])
+        loops, chains = position.get_key()
+        self.assertEqual(sum(loops) + sum(chain[2] for chain in chains) + len(junctions), 25)
+
+        # Not in the loony endgame
+        self.assertIsNone(EndgameSolver.get_position(GameBoard(5, 5)))
+
+    def test_get_canonical_key(self):
+        # The key does not depend on the box numbers of the junctions or the order of the chains
+        key, labels = get_canonical_key([4, 6], [(10, 20, 3), (20, 30, 1), (10, 30, 5), (30, 30, 4)])
+        self.assertEqual(get_canonical_key([6, 4], [(1, 1, 4), (3, 7, 3), (7, 1, 5), (1, 3, 1)])[0], key)
+        self.assertEqual(sorted(labels.values()), [0, 1, 2])
+        self.assertNotEqual(get_canonical_key([4, 6], [(10, 20, 3), (20, 30, 1), (10, 30, 5), (20, 20, 4)])[0], key)
+
+    def test_solve(self):
+        for size_x, size_y in [(3, 3), (3, 4)]:
+            for seed in range(6):
+                gb = self.create_loony_board(size_x, size_y, seed)
+                cache = {}
+                value = self.exhaustive_search(gb, cache)
+                solver = EndgameSolver()
+                self.assertEqual(solver.solve(solver.get_position(gb).get_key()), value)
+                edge = solver.get_best_edge(gb)
+                self.assertEqual(solver.value, value)
+                self.assertEqual(self.get_edge_value(gb, edge, cache), value)
+
+                # The opponent decides whether to take all boxes or to keep control
+                gb.apply(edge)
+                if gb.capturable_boxes:
+                    value = self.exhaustive_search(gb, cache)
+                    edge = solver.get_best_edge(gb)
+                    self.assertEqual(solver.value, value)
+                    self.assertEqual(self.get_edge_value(gb, edge, cache), value)
+
+    def test_large_board(self):
+        gb = self.create_loops_board(50, 50)
+        solver = EndgameSolver()
+        start = time.monotonic()
+        edge = solver.get_best_edge(gb)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIn(edge, gb.free_lines)
+        # The player in control gives back four boxes of every loop but the last one: 4 * 624 - 4 * 624 + 4
+        self.assertEqual(solver.value, -4)
+
+        ai = TreeAI()
+        move = ai.get_next_move(gb, gb.current_player)
+        self.assertTrue(gb.is_valid_move(move))
+        self.assertEqual(move.player_ai, gb.player_ai[gb.current_player])
+
+        # A random loony endgame has hundreds of chains between the junctions, too many for the exact search, so the
+        # shortest chains are opened until a few chains are left next to the loops
+        gb = self.create_loony_board(50, 50, 1)
+        while True:
+            if gb.capturable_boxes:
+                gb.apply(next(iter(gb.capturable_boxes.values())))
+                continue
+            position = EndgameSolver.get_position(gb)
+            if len(position.chains) <= 8:
+                break
+            gb.apply(min(position.chains, key=lambda chain: len(chain[2]))[2][0])
+        self.assertGreater(len(position.loops), 50)
+        solver = EndgameSolver()
+        start = time.monotonic()
+        edge = solver.get_best_edge(gb)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertIn(edge, gb.free_lines)
+
+        # The solver reaches its value when it plays for both players
+        value = solver.value
+        result = 0
+        sign = 1
+        while gb.free_lines:
+            edge = solver.get_best_edge(gb)
+            self.assertIsNotNone(edge)
+            captured = gb.apply(edge)
+            if captured:
+                result += sign * captured
+            else:
+                sign = -sign
+        self.assertEqual(result, value)
+
+
+if __name__ == '__main__':
+    unittest.main()
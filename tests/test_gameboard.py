@@ -0,0 +1,244 @@
+import random
+import unittest
+
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.gameboard_exception import GameboardException
+from kaese.gameboard.move import Move
+
+
+class TestGameBoard(unittest.TestCase):
+    @staticmethod
+    def play_random_game(gb):
+        """Play random moves until the game has ended and yield the gameboard after every move."""
+        while gb.winner == 0:
+            free_lines = [(x, y, h) for x in range(gb.size_x) for y in range(gb.size_y) for h in (0, 1)
+                          if gb.get_line(x, y, h) == 0 and (x + 1 < gb.size_x if h == 0 else y + 1 < gb.size_y)]
+            x, y, h = random.choice(free_lines)
+            gb.make_move(Move(x, y, h, gb.current_player, "Human"), print_it=False)
+            yield gb
+
+    def assertSurroundings(self, gb):
+        for x in range(gb.size_x):
+            for y in range(gb.size_y):
+                expected = ((x + 1 == gb.size_x or gb.get_line(x, y, 0) > 0)
+                            + (y + 1 == gb.size_y or gb.get_line(x, y, 1) > 0)
+                            + (x == 0 or gb.get_line(x - 1, y, 0) > 0)
+                            + (y == 0 or gb.get_line(x, y - 1, 1) > 0))
+                self.assertEqual(gb.surroundings[x][y], expected)
+                self.assertEqual(gb.get_count_surroundings(x, y), expected)
+
+    def test_surroundings(self):
+        gb = GameBoard(5, 4)
+        self.assertEqual(gb.surroundings[0], [2, 1, 1, 2])
+        self.assertEqual(gb.surroundings[1], [1, 0, 0, 1])
+        for _ in self.play_random_game(gb):
+            self.assertSurroundings(gb)
+        while gb.move_history_pointer > 0:
+            gb.take_back_one_move()
+            self.assertSurroundings(gb)
+
+    def assertFreeLines(self, gb):
+        expected = [gb.get_edge(x, y, h) for x in range(gb.size_x) for y in range(gb.size_y) for h in (0, 1)
+                    if gb.get_line(x, y, h) == 0 and (x + 1 < gb.size_x if h == 0 else y + 1 < gb.size_y)]
+        self.assertEqual(sorted(gb.free_lines), expected)
+        self.assertEqual(len(gb.free_lines), gb.remaining_moves)
+        for position, edge in enumerate(gb.free_lines):
+            self.assertEqual(gb.free_line_positions[edge], position)
+        self.assertEqual(sum(1 for position in gb.free_line_positions if position >= 0), len(gb.free_lines))
+
+    def test_free_lines(self):
+        gb = GameBoard(4, 6)
+        self.assertFreeLines(gb)
+        for _ in self.play_random_game(gb):
+            self.assertFreeLines(gb)
+        self.assertEqual(gb.free_lines, [])
+        while gb.move_history_pointer > 0:
+            gb.take_back_one_move()
+            self.assertFreeLines(gb)
+
+    def test_edges(self):
+        gb = GameBoard(4, 6)
+        for x in range(gb.size_x):
+            for y in range(gb.size_y):
+                for h in (0, 1):
+                    move = gb.edge_to_move(gb.get_edge(x, y, h), 2, "Human")
+                    self.assertEqual((move.x, move.y, move.horizontal, move.player), (x, y, h, 2))
+
+    def test_edge_table(self):
+        gb = GameBoard(3, 5)
+        table = gb.edge_table
+        self.assertIs(table, GameBoard(3, 5).edge_table)
+        self.assertEqual(len(table.edges), gb.remaining_moves)
+        self.assertEqual(table.edges, sorted(gb.free_lines))
+        for edge in table.edges:
+            x, y, h = table.coordinates[edge]
+            self.assertEqual(gb.get_edge(x, y, h), edge)
+            box_1, box_2 = table.adjacent_boxes[edge]
+            self.assertEqual(box_1, x * gb.size_y + y)
+            self.assertEqual(box_2, (x + 1) * gb.size_y + y if h == 0 else x * gb.size_y + y + 1)
+            self.assertIn(edge, table.box_edges[box_1])
+            self.assertIn(edge, table.box_edges[box_2])
+        for box_nr, edges in enumerate(table.box_edges):
+            x, y = divmod(box_nr, gb.size_y)
+            self.assertEqual(len(edges), 4 - gb.surroundings[x][y])
+
+    def assertCapturableBoxes(self, gb):
+        expected = {}
+        for x in range(gb.size_x):
+            for y in range(gb.size_y):
+                if gb.surroundings[x][y] == 3:
+                    expected[x * gb.size_y + y] = gb.get_missing_edge(x, y)
+        self.assertEqual(gb.capturable_boxes, expected)
+        for edge in gb.capturable_boxes.values():
+            self.assertGreaterEqual(gb.free_line_positions[edge], 0)
+
+    def test_capturable_boxes(self):
+        gb = GameBoard(5, 5)
+        self.assertIsNone(gb.get_capture_move())
+        for _ in self.play_random_game(gb):
+            self.assertCapturableBoxes(gb)
+        while gb.move_history_pointer > 0:
+            gb.take_back_one_move()
+            self.assertCapturableBoxes(gb)
+
+        gb = GameBoard(4, 4)
+        gb.make_move(Move(1, 0, 1, 1, "Human"), print_it=False)
+        gb.make_move(Move(1, 1, 1, 2, "Human"), print_it=False)
+        gb.make_move(Move(0, 1, 0, 1, "Human"), print_it=False)
+        move = gb.get_capture_move(2, "Human")
+        self.assertEqual((move.x, move.y, move.horizontal, move.player), (1, 1, 0, 2))
+
+    def test_zobrist_hash(self):
+        gb = GameBoard(4, 5)
+        self.assertEqual(gb.zobrist_hash, 0)
+        hashes = [gb.zobrist_hash]
+        for _ in self.play_random_game(gb):
+            self.assertEqual(gb.zobrist_hash, gb.compute_zobrist_hash())
+            hashes.append(gb.zobrist_hash)
+        self.assertEqual(len(set(hashes)), len(hashes))
+        while gb.move_history_pointer > 0:
+            hashes.pop()
+            gb.take_back_one_move()
+            self.assertEqual(gb.zobrist_hash, hashes[-1])
+
+        # Same position reached by a different order of moves
+        gb1 = GameBoard(3, 3)
+        gb2 = GameBoard(3, 3)
+        for gb, moves in [(gb1, [(0, 0, 0), (1, 1, 1), (0, 2, 0)]), (gb2, [(0, 2, 0), (1, 1, 1), (0, 0, 0)])]:
+            for x, y, h in moves:
+                gb.make_move(Move(x, y, h, gb.current_player, "Human"), print_it=False)
+        self.assertEqual(gb1.zobrist_hash, gb2.zobrist_hash)
+        self.assertEqual(gb1.zobrist_hash, GameBoard.decode(gb1.encode()).zobrist_hash)
+        gb1.make_move(Move(1, 0, 0, gb1.current_player, "Human"), print_it=False)
+        self.assertNotEqual(gb1.zobrist_hash, gb2.zobrist_hash)
+
+    def assertSameState(self, gb1, gb2):
+        for x in range(gb1.size_x):
+            for y in range(gb1.size_y):
+                self.assertEqual(gb1.get_owner(x, y), gb2.get_owner(x, y))
+                for h in (0, 1):
+                    self.assertEqual(gb1.get_line(x, y, h), gb2.get_line(x, y, h))
+        self.assertEqual(gb1.surroundings, gb2.surroundings)
+        self.assertEqual(sorted(gb1.free_lines), sorted(gb2.free_lines))
+        self.assertEqual(gb1.capturable_boxes, gb2.capturable_boxes)
+        self.assertEqual(gb1.zobrist_hash, gb2.zobrist_hash)
+        self.assertEqual(gb1.current_player, gb2.current_player)
+        self.assertEqual(gb1.win_counter, gb2.win_counter)
+        self.assertEqual(gb1.winner, gb2.winner)
+        self.assertEqual(gb1.moves_made, gb2.moves_made)
+        self.assertEqual(gb1.remaining_moves, gb2.remaining_moves)
+
+    def test_snapshot_and_restore(self):
+        gb = GameBoard(4, 4)
+        games = self.play_random_game(gb)
+        for _ in range(12):
+            next(games)
+        reference = gb.clone_for_search()
+        snapshot = gb.snapshot()
+        for _ in games:
+            pass
+        self.assertEqual(len(gb.move_history), 24)
+        gb.restore(snapshot)
+        self.assertSameState(gb, reference)
+        self.assertEqual(gb.move_history_pointer, 12)
+        self.assertEqual(len(gb.move_history), 12)
+        # The snapshot can be restored again, but not after its moves were removed from the history
+        next(self.play_random_game(gb))
+        gb.restore(snapshot)
+        self.assertSameState(gb, reference)
+        gb.take_back_one_move()
+        gb.truncate_history()
+        with self.assertRaises(GameboardException):
+            gb.restore(snapshot)
+
+    def test_clone_for_search(self):
+        gb = GameBoard(5, 3)
+        games = self.play_random_game(gb)
+        for _ in range(10):
+            next(games)
+        clone = gb.clone_for_search()
+        self.assertIs(type(clone), GameBoard)
+        self.assertEqual(clone.move_history, [])
+        self.assertSameState(gb, clone)
+        for _ in self.play_random_game(clone):
+            self.assertSurroundings(clone)
+        self.assertEqual(gb.remaining_moves, 12)
+        while clone.move_history_pointer > 0:
+            clone.take_back_one_move()
+        self.assertSameState(gb, clone)
+
+    def test_apply_and_undo(self):
+        gb = GameBoard(4, 5)
+        reference = GameBoard(4, 5)
+        while gb.winner == 0:
+            edge = random.choice(gb.free_lines)
+            player = gb.current_player
+            captured = gb.apply(edge)
+            reference.make_move(reference.edge_to_move(edge, player, "Human"), print_it=False)
+            self.assertSameState(gb, reference)
+            self.assertSurroundings(gb)
+            self.assertFreeLines(gb)
+            self.assertCapturableBoxes(gb)
+            self.assertEqual(gb.current_player, player if captured else 3 - player)
+            self.assertEqual(gb.get_line(*divmod(edge >> 1, gb.size_y), edge & 1), player)
+        self.assertEqual(gb.move_history, [])
+        self.assertEqual(len(gb.undo_stack), gb.moves_made)
+        while reference.move_history_pointer > 0:
+            gb.undo()
+            reference.take_back_one_move()
+            self.assertSameState(gb, reference)
+            self.assertCapturableBoxes(gb)
+        self.assertEqual(gb.undo_stack, [])
+        self.assertEqual(gb.zobrist_hash, 0)
+
+    def test_boxes_view(self):
+        gb = GameBoard(4, 3)
+        for _ in self.play_random_game(gb):
+            pass
+        self.assertEqual(len(gb.boxes), 4)
+        self.assertEqual(len(gb.boxes[0]), 3)
+        for x, column in enumerate(gb.boxes):
+            for y, box in enumerate(column):
+                self.assertEqual(box.owner, gb.owners[x * gb.size_y + y])
+                self.assertEqual(box.line_right, gb.lines_right[x * gb.size_y + y])
+                self.assertEqual(box.line_below, gb.lines_below[x * gb.size_y + y])
+                self.assertGreater(box.owner, 0)
+                self.assertEqual(box.to_box().line_right, gb.get_line(x, y, 0))
+        with self.assertRaises(AttributeError):
+            gb.boxes[0][0].owner = 1
+        with self.assertRaises(IndexError):
+            gb.boxes[0][3].owner
+
+    def test_encode_and_decode(self):
+        random.seed(3)
+        gb = GameBoard(5, 4)
+        for _ in range(20):
+            gb.apply(random.choice(gb.free_lines))
+        decoded = GameBoard.decode(gb.encode())
+        self.assertSameState(gb, decoded)
+        self.assertEqual(decoded.move_history, [])
+        self.assertEqual(decoded.encode(), gb.encode())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from kaese.ai import line_masks, position_features
+from kaese.ai.better_ai import BetterAI
+from kaese.ai.normal_ai import NormalAI
+from kaese.gameboard.gameboard import GameBoard
+
+
+@unittest.skipIf(line_masks.numpy is None, "NumPy is not installed")
+class TestLineMasks(unittest.TestCase):
+    def tearDown(self):
+        line_masks.USE_NUMPY = True
+
+    @staticmethod
+    def random_positions():
+        for seed in range(60):
+            random.seed(seed)
+            size_x, size_y = random.randint(1, 9), random.randint(1, 9)
+            gb = GameBoard(size_x, size_y)
+            for _ in range(random.randint(0, len(gb.free_lines))):
+                gb.apply(random.choice(gb.free_lines))
+            yield gb
+
+    @staticmethod
+    def get_edges(gb, moves):
+        return [gb.get_edge(m.x, m.y, m.horizontal) for m in moves]
+
+    def test_side_counts(self):
+        for gb in self.random_positions():
+            side_counts = line_masks.get_line_grids(gb)[2]
+            self.assertEqual(side_counts.tolist(), gb.surroundings)
+
+    def test_same_lists_as_loops(self):
+        for gb in self.random_positions():
+            lists = BetterAI.get_better_moves_lists(gb, 1, gb.surroundings)
+            better_edges, good_edges = line_masks.get_better_move_edges(gb)
+            self.assertEqual(better_edges.tolist(), self.get_edges(gb, lists["better_moves"]))
+            self.assertEqual(good_edges.tolist(), self.get_edges(gb, lists["good_moves"]))
+
+            moves = BetterAI.get_single_box_sacrifice_moves(gb, 1, gb.surroundings)
+            self.assertEqual(line_masks.get_single_box_sacrifice_edges(gb).tolist(), self.get_edges(gb, moves))
+
+            better_moves, valid_moves = NormalAI.get_close_to_other_lines_lists(gb, 1)
+            better_edges, valid_edges = line_masks.get_close_to_other_lines_edges(gb)
+            self.assertEqual(better_edges.tolist(), self.get_edges(gb, better_moves))
+            self.assertEqual(valid_edges.tolist(), self.get_edges(gb, valid_moves))
+
+    def test_batch(self):
+        random.seed(1)
+        boards = []
+        for _ in range(20):
+            gb = GameBoard(5, 6)
+            for _ in range(random.randint(0, len(gb.free_lines))):
+                gb.apply(random.choice(gb.free_lines))
+            boards.append(gb)
+        for gb, (better_edges, good_edges) in zip(boards, line_masks.get_better_move_edges_batch(boards)):
+            self.assertEqual(better_edges.tolist(), line_masks.get_better_move_edges(gb)[0].tolist())
+            self.assertEqual(good_edges.tolist(), line_masks.get_better_move_edges(gb)[1].tolist())
+
+    def test_same_moves_as_loops(self):
+        for ai in [BetterAI(), NormalAI()]:
+            for seed in range(5):
+                games = []
+                for use_numpy in [True, False]:
+                    line_masks.USE_NUMPY = use_numpy
+                    position_features.features_cache.clear()
+                    random.seed(seed)
+                    gb = GameBoard(5, 4)
+                    gb.player_ai = {1: ai.__class__.__name__, 2: ai.__class__.__name__}
+                    moves = []
+                    while gb.winner == 0:
+                        move = ai.get_next_move(gb, gb.current_player)
+                        gb.make_move(move, print_it=False)
+                        moves.append((move.x, move.y, move.horizontal, move.player))
+                    games.append(moves)
+                self.assertEqual(games[0], games[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import random
+import time
+import unittest
+
+from kaese.ai.ai_exception import AIException
+from kaese.ai.mcts_ai import MctsAI
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+
+class TestMctsAI(unittest.TestCase):
+    def test_budgets(self):
+        with self.assertRaises(AIException):
+            MctsAI(iterations=None, time_budget=None)
+
+        gb = GameBoard(5, 5)
+        ai = MctsAI(iterations=200, time_budget=None)
+        move = ai.get_next_move(gb, 1)
+        self.assertEqual(ai.last_iterations, 200)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+        # Large boards stay within the time budget
+        gb = GameBoard(50, 50)
+        ai = MctsAI(time_budget=0.5)
+        start = time.monotonic()
+        move = ai.get_next_move(gb, 1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertGreaterEqual(ai.last_iterations, 1)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+    def test_capture_move(self):
+        random.seed(0)
+        gb = GameBoard(4, 4)
+        for move in [Move(1, 0, 1, 1, "Human"), Move(1, 1, 1, 2, "Human"), Move(0, 1, 0, 1, "Human")]:
+            gb.make_move(move, False)
+        move = MctsAI(iterations=5000, time_budget=None).get_next_move(gb, 2)
+        self.assertEqual((move.x, move.y, move.horizontal), (1, 1, 0))
+
+    def test_reuse_tree(self):
+        random.seed(0)
+        gb = GameBoard(4, 4)
+        gb.player_ai = {1: "MctsAI", 2: "Human"}
+        ai = MctsAI(iterations=500, time_budget=None)
+        move = ai.get_next_move(gb, 1)
+        gb.make_move(move, False)
+        self.assertIsNotNone(ai.root)
+
+        # The position after the move of the opponent is found in the tree of the last search
+        reply = max(ai.root.children.items(), key=lambda item: item[1].visits)[0]
+        expected = ai.root.children[reply]
+        gb.make_move(gb.edge_to_move(reply, gb.current_player, "Human"), False)
+        ai.get_next_move(gb, gb.current_player)
+        self.assertIs(ai.root.parent, expected)
+        self.assertIsNone(expected.parent)
+
+    def test_play_game(self):
+        for seed in range(2):
+            random.seed(seed)
+            gb = GameBoard(3, 3)
+            gb.player_ai = {1: "MctsAI", 2: "MctsAI"}
+            ais = {1: MctsAI(iterations=100, time_budget=None), 2: MctsAI(iterations=100, time_budget=None)}
+            while gb.winner == 0:
+                move = ais[gb.current_player].get_next_move(gb, gb.current_player)
+                gb.make_move(move, print_it=False)
+            self.assertEqual(gb.win_counter[1] + gb.win_counter[2], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from kaese.ai.move_ordering import CAPTURE_MOVE, SACRIFICE_MOVE, SAFE_MOVE, MoveOrdering
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.move import Move
+
+
+class TestMoveOrdering(unittest.TestCase):
+    @staticmethod
+    def create_game_board():
+        # Box 1x1 is surrounded by 3 lines, its missing line is right of it
+        gb = GameBoard(4, 4)
+        for move in [Move(1, 0, 1, 1, "Human"), Move(1, 1, 1, 2, "Human"), Move(0, 1, 0, 1, "Human")]:
+            gb.make_move(move, print_it=False)
+        return gb
+
+    def test_get_move_class(self):
+        gb = self.create_game_board()
+        self.assertEqual(MoveOrdering.get_move_class(gb, gb.get_edge(1, 1, 0)), CAPTURE_MOVE)
+        self.assertEqual(MoveOrdering.get_move_class(gb, gb.get_edge(1, 0, 0)), SACRIFICE_MOVE)
+        self.assertEqual(MoveOrdering.get_move_class(gb, gb.get_edge(2, 2, 0)), SAFE_MOVE)
+
+    def test_order_edges(self):
+        gb = self.create_game_board()
+        ordering = MoveOrdering()
+        edges = ordering.order_edges(gb, gb.free_lines[:])
+        self.assertEqual(sorted(edges), sorted(gb.free_lines))
+        classes = [ordering.get_move_class(gb, edge) for edge in edges]
+        self.assertEqual(classes, sorted(classes, reverse=True))
+        self.assertEqual(edges[0], gb.get_edge(1, 1, 0))
+
+        # Killer moves come first within their class, then the moves of the history table
+        safe_edges = [edge for edge in edges if ordering.get_move_class(gb, edge) == SAFE_MOVE]
+        ordering.record_cutoff(gb, safe_edges[-2], 1)
+        ordering.record_cutoff(gb, safe_edges[-1], 1)
+        gb.apply(gb.get_edge(1, 1, 0))
+        ordering.record_cutoff(gb, safe_edges[-3], 5)
+        gb.undo()
+        edges = ordering.order_edges(gb, gb.free_lines[:])
+        self.assertEqual(edges[0], gb.get_edge(1, 1, 0))
+        self.assertEqual(edges[1:4], [safe_edges[-1], safe_edges[-2], safe_edges[-3]])
+
+    def test_new_search(self):
+        gb = self.create_game_board()
+        ordering = MoveOrdering()
+        ordering.record_cutoff(gb, 5, 3)
+        ordering.record_cutoff(gb, 7, 1)
+        ordering.new_search()
+        self.assertEqual(ordering.killers, {})
+        self.assertEqual(ordering.history, {5: 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import random
+import threading
+import unittest
+
+from kaese.ai import line_masks, position_features
+from kaese.ai.better_ai import BetterAI
+from kaese.ai.cluster_ai import ClusterAI
+from kaese.ai.cluster_analysis import get_clusters
+from kaese.ai.normal_ai import NormalAI
+from kaese.ai.position_features import get_position_features
+from kaese.gameboard.gameboard import GameBoard
+
+
+class TestPositionFeatures(unittest.TestCase):
+    def setUp(self):
+        position_features.features_cache.clear()
+
+    def tearDown(self):
+        line_masks.USE_NUMPY = line_masks.numpy is not None
+
+    @staticmethod
+    def get_edges(gb, moves):
+        return [gb.get_edge(m.x, m.y, m.horizontal) for m in moves]
+
+    @staticmethod
+    def random_position(seed):
+        random.seed(seed)
+        gb = GameBoard(random.randint(1, 8), random.randint(1, 8))
+        for _ in range(random.randint(0, len(gb.free_lines))):
+            gb.apply(random.choice(gb.free_lines))
+        return gb
+
+    def test_same_lists_as_loops(self):
+        for use_numpy in {False, line_masks.numpy is not None}:
+            line_masks.USE_NUMPY = use_numpy
+            for seed in range(30):
+                position_features.features_cache.clear()
+                gb = self.random_position(seed)
+                features = get_position_features(gb)
+                lists = BetterAI.get_better_moves_lists(gb, 1, gb.surroundings)
+                right_angle_lines, safe_lines = features.get_safe_lines()
+                self.assertEqual(list(right_angle_lines), self.get_edges(gb, lists["better_moves"]))
+                self.assertEqual(list(safe_lines), self.get_edges(gb, lists["good_moves"]))
+                close_moves, _ = NormalAI.get_close_to_other_lines_lists(gb, 1)
+                self.assertEqual(list(features.get_close_lines()[0]), self.get_edges(gb, close_moves))
+                moves = BetterAI.get_single_box_sacrifice_moves(gb, 1, gb.surroundings)
+                self.assertEqual(list(features.get_single_box_sacrifices()), self.get_edges(gb, moves))
+                self.assertEqual([c.boxes for c in features.get_clusters()], [c.boxes for c in get_clusters(gb)])
+
+    def test_memoised_by_position(self):
+        gb = self.random_position(3)
+        features = get_position_features(gb)
+        safe_lines = features.get_safe_lines()[1]
+        self.assertIs(get_position_features(gb), features)
+        self.assertIs(features.get_safe_lines()[1], safe_lines)
+
+        # Another gameboard with the same lines shares the features
+        other = GameBoard(gb.size_x, gb.size_y)
+        for entry in gb.undo_stack:
+            other.apply(entry >> 3)
+        self.assertIs(get_position_features(other), features)
+
+        # A move changes the position, taking it back restores the features
+        gb.apply(gb.free_lines[0])
+        self.assertIsNot(get_position_features(gb), features)
+        gb.undo()
+        self.assertIs(get_position_features(gb), features)
+
+    def test_features_passed_down(self):
+        gb = GameBoard(5, 5)
+        gb.player_ai = {1: "ClusterAI", 2: "ClusterAI"}
+        ai = ClusterAI()
+        move = ai.get_next_move(gb, gb.current_player)
+        features = get_position_features(gb)
+        self.assertIsNotNone(features.safe_lines)
+        self.assertIn(gb.get_edge(move.x, move.y, move.horizontal), list(features.safe_lines))
+
+        # The lists of the position are not computed again
+        features.safe_lines = features.right_angle_lines = [gb.get_edge(0, 0, 0)]
+        move = ai.get_next_move(gb, gb.current_player)
+        self.assertEqual((move.x, move.y, move.horizontal), (0, 0, 0))
+
+    def test_threads(self):
+        # The GUI thread and the TreeAI thread share the cache
+        boards = [self.random_position(seed) for seed in range(40)]
+        errors = []
+
+        def run():
+            try:
+                for _ in range(50):
+                    for gb in boards:
+                        self.assertEqual(get_position_features(gb).key, position_features.get_position_key(gb))
+            except Exception as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(position_features.features_cache), position_features.features_cache_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import tempfile
+import unittest
+
+from kaese.ai.ai_exception import AIException
+from kaese.ai.oracle_ai import OracleAI
+from kaese.ai.random_ai import RandomAI
+from kaese.db.solved_positions import SolvedPositions, get_position_index, solve_positions, write_database
+from kaese.gameboard.gameboard import GameBoard
+
+
+class TestSolvedPositions(unittest.TestCase):
+    @staticmethod
+    def exhaustive_search(gb, cache):
+        # Boxes of the player to move minus boxes of the opponent, for all boxes that are not owned yet
+        if not gb.free_lines:
+            return 0
+        value = cache.get(gb.line_hash)
+        if value is None:
+            values = []
+            for edge in gb.free_lines[:]:
+                captured = gb.apply(edge)
+                child_value = TestSolvedPositions.exhaustive_search(gb, cache)
+                values.append(captured + child_value if captured else -child_value)
+                gb.undo()
+            value = max(values)
+            cache[gb.line_hash] = value
+        return value
+
+    def test_solve_positions(self):
+        for size_x, size_y in [(3, 3), (3, 4)]:
+            values = solve_positions(size_x, size_y)
+            position_index = get_position_index(size_x, size_y)
+            self.assertEqual(len(values), 1 << len(position_index.edges))
+            cache = {}
+            for seed in range(50):
+                random.seed(seed)
+                gb = GameBoard(size_x, size_y)
+                for _ in range(random.randrange(len(gb.free_lines))):
+                    gb.apply(random.choice(gb.free_lines))
+                index = position_index.get_index(gb)
+                self.assertEqual((values[index] ^ 128) - 128, self.exhaustive_search(gb, cache))
+                # Symmetric positions have the same value
+                for symmetric_index in position_index.get_symmetric_indexes(index):
+                    self.assertEqual(values[symmetric_index], values[index])
+
+    def test_oracle_ai(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_database(3, 3, directory)
+            solved_positions = SolvedPositions(3, 3, directory)
+            self.assertEqual(solved_positions.get_value(0), self.exhaustive_search(GameBoard(3, 3), {}))
+            solved_positions.close()
+
+            # The oracle gets at least the value of the start position against any opponent
+            for seed in range(5):
+                random.seed(seed)
+                gb = GameBoard(3, 3)
+                gb.player_ai = {1: "OracleAI", 2: "RandomAI"}
+                ai = OracleAI(directory=directory)
+                expected_value = max(ai.get_move_values(gb).values())
+                while gb.winner == 0:
+                    if gb.current_player == 1:
+                        move = ai.get_next_move(gb, 1)
+                    else:
+                        move = RandomAI().get_next_move(gb, 2)
+                    gb.make_move(move, print_it=False)
+                self.assertGreaterEqual(gb.win_counter[1] - gb.win_counter[2], expected_value)
+
+            with self.assertRaises(AIException):
+                OracleAI(directory=directory).get_next_move(GameBoard(4, 4), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
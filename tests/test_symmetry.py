@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from kaese.gameboard.gameboard import GameBoard
+from kaese.gameboard.symmetry import get_line_mask, get_symmetry_table
+
+
+class TestSymmetry(unittest.TestCase):
+    @staticmethod
+    def play_random_moves(gb, count):
+        for _ in range(count):
+            gb.apply(random.choice(gb.free_lines))
+
+    def test_symmetry_count(self):
+        self.assertEqual(len(get_symmetry_table(4, 4).edge_maps), 8)
+        self.assertEqual(len(get_symmetry_table(4, 3).edge_maps), 4)
+        self.assertEqual(get_symmetry_table(3, 3).inverse, [0, 1, 2, 3, 4, 6, 5, 7])
+
+    def test_edge_maps(self):
+        for size_x, size_y in [(3, 3), (4, 4), (3, 5), (6, 4)]:
+            table = get_symmetry_table(size_x, size_y)
+            edges = GameBoard(size_x, size_y).edge_table.edges
+            for symmetry in range(len(table.edge_maps)):
+                mapped = [table.map_edge(edge, symmetry) for edge in edges]
+                self.assertEqual(sorted(mapped), edges)
+                for edge in edges:
+                    self.assertEqual(table.unmap_edge(table.map_edge(edge, symmetry), symmetry), edge)
+
+    def test_symmetric_positions(self):
+        for size_x, size_y in [(3, 3), (4, 4), (3, 5)]:
+            table = get_symmetry_table(size_x, size_y)
+            gb = GameBoard(size_x, size_y)
+            self.play_random_moves(gb, 7)
+            line_mask = get_line_mask(gb)
+            canonical_mask, canonical_symmetry = table.canonical(line_mask)
+            self.assertEqual(table.transform_mask(line_mask, canonical_symmetry), canonical_mask)
+            for symmetry in range(len(table.edge_maps)):
+                # Replay the position in the orientation of the symmetry
+                other = GameBoard(size_x, size_y)
+                for edge in gb.edge_table.edges:
+                    if gb.free_line_positions[edge] < 0:
+                        other.apply(table.map_edge(edge, symmetry))
+                self.assertEqual(get_line_mask(other), table.transform_mask(line_mask, symmetry))
+                self.assertEqual(table.canonical(get_line_mask(other))[0], canonical_mask)
+                self.assertEqual(sorted(sum(other.surroundings, [])), sorted(sum(gb.surroundings, [])))
+
+    def test_unique_edges(self):
+        gb = GameBoard(3, 3)
+        table = get_symmetry_table(3, 3)
+        self.assertEqual(len(table.get_unique_edges(0, gb.free_lines)), 2)
+        self.assertEqual(len(get_symmetry_table(4, 3).get_unique_edges(0, GameBoard(4, 3).free_lines)), 6)
+        # The vertical line between the boxes 0x1 and 1x1 only keeps the mirror symmetry along the y axis
+        gb.apply(gb.get_edge(0, 1, 0))
+        line_mask = get_line_mask(gb)
+        self.assertEqual(table.get_stabilizer(line_mask), [0, 2])
+        self.assertEqual(len(table.get_unique_edges(line_mask, gb.free_lines)), 6)
+        self.assertEqual(table.get_unique_edges(get_line_mask(GameBoard(3, 3)), [5]), [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from kaese.ai.transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+from kaese.ai.tree_ai import TreeAI
+from kaese.gameboard.gameboard import GameBoard
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_probe_and_store(self):
+        tt = TranspositionTable(1)
+        self.assertEqual(tt.size, 1024 * 1024 // TranspositionTable.entry_size)
+        self.assertIsNone(tt.probe(12345, 3))
+        tt.store(12345, 3, 4, 17, EXACT, 8)
+        self.assertEqual(tt.probe(12345, 3), (4, 17, EXACT, 8))
+        # The score is part of the key
+        self.assertIsNone(tt.probe(12345, 2))
+        self.assertEqual((tt.probes, tt.hits, tt.stores), (3, 1, 1))
+        tt.clear()
+        self.assertIsNone(tt.probe(12345, 3))
+
+    def test_replacement_policy(self):
+        tt = TranspositionTable(0)
+        self.assertEqual(tt.size, 1)
+        tt.store(1, 0, 5, 10, LOWER_BOUND)
+        # A shallower entry of another position does not replace a deeper one of the same search
+        tt.store(2, 0, 4, 20, EXACT)
+        self.assertEqual(tt.probe(1, 0), (5, 10, LOWER_BOUND, -1))
+        self.assertIsNone(tt.probe(2, 0))
+        # An equal or deeper one does
+        tt.store(2, 0, 5, 20, EXACT)
+        self.assertEqual(tt.probe(2, 0), (5, 20, EXACT, -1))
+        # The same position is always replaced
+        tt.store(2, 0, 1, 30, UPPER_BOUND)
+        self.assertEqual(tt.probe(2, 0), (1, 30, UPPER_BOUND, -1))
+        # Entries of older searches are always replaced
+        tt.store(3, 0, 9, 40, EXACT)
+        tt.new_search()
+        self.assertEqual(tt.probe(3, 0), (9, 40, EXACT, -1))
+        tt.store(4, 0, 1, 50, EXACT)
+        self.assertEqual(tt.probe(4, 0), (1, 50, EXACT, -1))
+
+    def test_same_value_as_without_table(self):
+        hits = 0
+        for seed in range(5):
+            random.seed(seed)
+            gb = GameBoard(3, 3)
+            for _ in range(4):
+                gb.apply(random.choice(gb.free_lines))
+            values = []
+            for transposition_table_mb in [8, 0]:
+                ai = TreeAI(transposition_table_mb=transposition_table_mb)
+                ai.gb = gb.clone_for_search()
+                ai.original_player = gb.current_player
+                values.append(ai.negamax_search(5, -ai.very_large_numer, ai.very_large_numer))
+                if transposition_table_mb:
+                    hits += ai.transposition_table.hits
+            self.assertEqual(values[0], values[1])
+        self.assertGreater(hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import random
+import time
+import unittest
+
+from kaese.ai.tree_ai import TreeAI
+from kaese.gameboard.gameboard import GameBoard
+
+
+class TestTreeAI(unittest.TestCase):
+    def test_time_budget(self):
+        gb = GameBoard(5, 5)
+        ai = TreeAI(max_moves=100, time_budget=0.5)
+        start = time.monotonic()
+        move = ai.get_next_move(gb, 1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(ai.timed_out)
+        self.assertGreaterEqual(ai.completed_depth, 1)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+    def test_fixed_depth(self):
+        gb = GameBoard(3, 3)
+        ai = TreeAI()
+        move = ai.get_next_move(gb, 1)
+        self.assertFalse(ai.timed_out)
+        self.assertGreaterEqual(ai.completed_depth, 1)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+    def test_killed(self):
+        gb = GameBoard(4, 4)
+        kills = [True]
+
+        def kill(stats):
+            # Kill the first search as soon as it has started
+            if kills:
+                ai.killed = kills.pop()
+
+        ai = TreeAI(stats_callback=kill)
+        move = ai.get_next_move(gb, 1)
+        self.assertEqual(ai.completed_depth, 0)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+        # The next search of the same instance is not killed
+        move = ai.get_next_move(gb, 1)
+        self.assertFalse(ai.killed)
+        self.assertGreaterEqual(ai.completed_depth, 1)
+        self.assertTrue(gb.is_valid_move(move, ignore_current_selected_player=True))
+
+    @staticmethod
+    def minimax(ai, depth):
+        # Plain minimax from the perspective of the original player, without any pruning
+        gb = ai.gb
+        evaluation = ai.position_evaluation(gb)
+        if abs(evaluation) > 9000 or depth == 0:
+            return evaluation
+        values = []
+        for edge in gb.free_lines[:]:
+            cnt_moves = ai.make_ai_move(edge)
+            values.append(TestTreeAI.minimax(ai, depth - 1))
+            ai.take_back_moves(cnt_moves)
+        return max(values) if gb.current_player == ai.original_player else min(values)
+
+    def test_negamax_search(self):
+        for seed in range(5):
+            random.seed(seed)
+            gb = GameBoard(3, 3)
+            for _ in range(2):
+                gb.apply(random.choice(gb.free_lines))
+            ai = TreeAI()
+            ai.gb = gb.clone_for_search()
+            ai.original_player = gb.current_player
+            value = ai.negamax_search(4, -ai.very_large_numer, ai.very_large_numer)
+            self.assertEqual(value, self.minimax(ai, 4))
+
+    def test_principal_variation(self):
+        gb = GameBoard(4, 4)
+        ai = TreeAI()
+        move = ai.get_next_move(gb, 1)
+        self.assertEqual(ai.completed_depth, 5)
+        self.assertEqual(ai.principal_variation[0], move)
+        self.assertLessEqual(len(ai.principal_variation), ai.completed_depth)
+        self.assertIsNotNone(ai.principal_variation_value)
+        # The moves of the principal variation can be played one after another
+        board = gb.clone_for_search()
+        for m in ai.principal_variation:
+            self.assertEqual(m.player, board.current_player)
+            ai.gb = board
+            ai.make_ai_move(board.get_edge(m.x, m.y, m.horizontal))
+
+    def test_search_stats(self):
+        published = []
+        gb = GameBoard(4, 4)
+        ai = TreeAI(stats_callback=published.append)
+        # Only the publications at the start, after every iteration and at the end
+        ai.stats_interval = 1000
+        ai.get_next_move(gb, 1)
+        stats = ai.published_stats
+        self.assertIs(published[-1], stats)
+        self.assertTrue(stats.finished)
+        self.assertEqual(stats.completed_depth, ai.completed_depth)
+        self.assertEqual(stats.depth, ai.completed_depth)
+        self.assertEqual(stats.principal_variation, ai.principal_variation)
+        self.assertEqual(stats.principal_variation_value, ai.principal_variation_value)
+        self.assertGreater(stats.nodes, 0)
+        self.assertGreater(stats.nodes_per_second, 0)
+        self.assertGreater(stats.tt_hits, 0)
+        self.assertGreater(stats.beta_cutoffs, 0)
+        self.assertEqual(stats.cnt_move_nr, stats.cnt_valid_moves)
+        # The first publication is at the start of the search, the published copies are not changed afterwards
+        self.assertFalse(published[0].finished)
+        self.assertEqual(published[0].nodes, 0)
+        self.assertEqual([s.completed_depth for s in published[1:-1]], list(range(1, ai.completed_depth + 1)))
+
+        # The statistics of the worker processes are added
+        parallel_ai = TreeAI(workers=2)
+        parallel_ai.get_next_move(gb, 1)
+        self.assertEqual(parallel_ai.published_stats.completed_depth, ai.completed_depth)
+        self.assertGreater(parallel_ai.published_stats.nodes, 0)
+
+    def test_parallel_search(self):
+        for seed in range(3):
+            random.seed(seed)
+            gb = GameBoard(3, 4)
+            while gb.moves_made < 2:
+                # No capturable boxes and not in the loony endgame, the position has to be searched
+                edge = random.choice(gb.free_lines)
+                gb.apply(edge)
+                if gb.capturable_boxes:
+                    gb.undo()
+            serial_ai = TreeAI()
+            serial_ai.get_next_move(gb, gb.current_player)
+            parallel_ai = TreeAI(workers=2)
+            move = parallel_ai.get_next_move(gb, gb.current_player)
+            self.assertEqual(parallel_ai.completed_depth, serial_ai.completed_depth)
+            self.assertEqual(parallel_ai.principal_variation_value, serial_ai.principal_variation_value)
+            self.assertEqual(parallel_ai.principal_variation[0], move)
+            board = gb.clone_for_search()
+            for m in parallel_ai.principal_variation:
+                self.assertEqual(m.player, board.current_player)
+                parallel_ai.gb = board
+                parallel_ai.make_ai_move(board.get_edge(m.x, m.y, m.horizontal))
+
+        # The workers stop at the deadline
+        ai = TreeAI(max_moves=100, time_budget=0.5, workers=2)
+        start = time.monotonic()
+        move = ai.get_next_move(GameBoard(5, 5), 1)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(ai.timed_out)
+        self.assertTrue(GameBoard(5, 5).is_valid_move(move, ignore_current_selected_player=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
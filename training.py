@@ -73,8 +73,12 @@ def main():
                         help="Very verbose output (Default: False)")
     parser.add_argument("-vvv", "--very-very-verbose", action="store_true",
                         help="Very very verbose output (Default: False)")
-    parser.add_argument("-m", "--moves", type=int, default=20,
-                        help="Max moves for tree AI (Default: 20)")
+    parser.add_argument("-m", "--moves", type=int, default=40,
+                        help="Max moves for tree AI (Default: 40)")
+    parser.add_argument("-b", "--time-budget", type=float, default=0.0,
+                        help="Time budget per move in seconds for tree AI, 0 for a fixed search depth (Default: 0)")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="Number of processes for the tree AI search, 0 to search in the GUI process (Default: 0)")
 
     args = parser.parse_args()
 
@@ -146,7 +150,9 @@ def main():
                 player1=args.player1 if args.player1 is not None else "Human",
                 player2=args.player2 if args.player2 is not None else "Human",
                 tree_ai_max_moves=args.moves,
-                verbose=verbose
+                verbose=verbose,
+                tree_ai_time_budget=args.time_budget if args.time_budget > 0 else None,
+                tree_ai_workers=max(0, args.workers)
             )
 
         # Load save-game if requested